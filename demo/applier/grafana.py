@@ -9,7 +9,7 @@ from binds.grafana.client.alert_queries.classic_conditions import (
 from binds.grafana.client.alert_queries.classic_conditions import dictify_condition as d
 from binds.grafana.client.alerting import AlertQuery, PostableGrafanaRule
 from binds.grafana.client.types import Duration, RelativeTimeRange
-from binds.grafana.objects import Alert, Folder, GrafanaObject
+from binds.grafana.objects import Alert, AlertTemplate, Folder, GrafanaObject
 
 
 def get_checks(datasource_uid: str) -> list[GrafanaObject]:
@@ -63,8 +63,7 @@ def get_checks(datasource_uid: str) -> list[GrafanaObject]:
         ),
     )
 
-    another_demo_alert = demo_alert.copy(deep=True)
-    another_demo_alert.grafana_alert.title = "Different_alert"
+    another_demo_alert = AlertTemplate(demo_alert).variant(title="Different_alert")
 
     return [
         demo_folder,
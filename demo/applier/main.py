@@ -1,35 +1,24 @@
 from pathlib import Path
-from urllib.parse import urljoin
 
+from binds.grafana.client.session import GrafanaSession
 from binds.grafana.grafana_provider import GrafanaProvider
 from controller.monitor import Monitor
 from controller.states import FileState
 from grafana_modelled_conds import get_checks as get_demo_checks
 from loguru import logger
-from requests import HTTPError, Response, Session
+from requests import HTTPError
 
 from demo.applier.grafana_minimalistic import green_fruits_bundle
 
-GRAFANA_API_URL = "http://localhost:3000/api/"
+GRAFANA_URL = "http://localhost:3000"
 
 USERNAME = "admin"
 PASSWORD = "admin"
 DATASOURCE_UID = "PrometheusUID"
 
 
-class BaseUrlSession(Session):
-    def __init__(self, prefix_url=None):
-        super().__init__()
-        self.prefix_url = prefix_url
-
-    def request(self, method, url, *args, **kwargs) -> Response:
-        url = urljoin(self.prefix_url, url)
-        return super().request(method, url, *args, **kwargs)
-
-
 def main():
-    grafana_session = BaseUrlSession(prefix_url=GRAFANA_API_URL)
-    grafana_session.auth = (USERNAME, PASSWORD)
+    grafana_session = GrafanaSession(GRAFANA_URL, auth=(USERNAME, PASSWORD))
 
     grafana_provider = GrafanaProvider(grafana_session)
 
@@ -0,0 +1,433 @@
+"""
+Reproducible scaling benchmark of Monitor.apply_monitoring_state.
+
+Every target is taken through four phases for every object count:
+    create  - apply N objects to an empty remote
+    noop    - apply the same objects again, nothing changes
+    update  - apply with a small share of objects changed
+    cleanup - apply an empty list, everything is deleted
+
+Targets:
+    inmemory - tests.inmemory.InmemoryProvider with InmemoryState
+    grafana  - GrafanaProvider against the in-process FakeGrafana
+               with FileState in a temporary directory
+
+Wall time, CPU time and API calls are measured in one pass.
+Peak memory is measured with tracemalloc in a separate pass,
+so tracing does not slow down the timed one.
+Logging is limited to warnings, diffs are not rendered.
+
+Run from the repository root:
+    python docs/performance_tests/monitor_benchmark.py run \
+        --sizes 10 100 1000 --output results/current.json
+    python docs/performance_tests/monitor_benchmark.py compare \
+        docs/performance_tests/results/monitor_benchmark_baseline.json \
+        results/current.json
+"""
+from typing import Any, Callable, Iterable, Optional
+
+import argparse
+import json
+import math
+import platform
+import sys
+import tempfile
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter, process_time
+
+REPOSITORY_ROOT = Path(__file__).parents[2]
+# inmemory objects import the controller from the package,
+# Grafana binds import it as a top-level package
+sys.path.insert(0, str(REPOSITORY_ROOT))
+sys.path.insert(0, str(REPOSITORY_ROOT / "monitoring_as_code"))
+
+from loguru import logger  # noqa: E402
+
+PHASES = ("create", "noop", "update", "cleanup")
+TARGETS = ("inmemory", "grafana")
+GRAFANA_OPTIONS = ("bulk_read", "group_alerts", "optimistic_writes", "verify_writes")
+DEFAULT_SIZES = (10, 100, 1000, 10_000)
+DEFAULT_BASELINE = Path(__file__).parent / "results" / "monitor_benchmark_baseline.json"
+
+# share of objects changed by the update phase, at least one object changes
+UPDATE_SHARE = 0.01
+ALERTS_PER_FOLDER = 100
+
+# lower bounds of a difference to be reported, smaller ones are noise
+MIN_TIME_DIFFERENCE = 0.01
+MIN_MEMORY_DIFFERENCE = 64 * 1024
+
+METRICS = ("wall_time", "cpu_time", "peak_memory", "api_calls")
+
+
+@dataclass
+class Measurement:
+    target: str
+    size: int
+    phase: str
+    wall_time: float
+    cpu_time: float
+    api_calls: int
+    # bytes allocated on top of the memory in use when the phase started
+    peak_memory: Optional[int] = None
+
+    @property
+    def key(self) -> tuple[str, int, str]:
+        return self.target, self.size, self.phase
+
+
+@dataclass
+class Scenario:
+    """
+    A Monitor with objects to apply in every phase
+    """
+
+    apply: Callable[[list[Any]], None]
+    objects: list[Any]
+    updated_objects: list[Any]
+    api_calls: Callable[[], int]
+    cleanup: Callable[[], None] = lambda: None
+
+
+@dataclass
+class BenchmarkOptions:
+    sizes: list[int]
+    targets: list[str]
+    grafana_options: list[str] = field(default_factory=list)
+    latency: float = 0.0
+    fast_plan: bool = False
+    memory: bool = True
+
+
+def updated_count(size: int) -> int:
+    return max(1, math.ceil(size * UPDATE_SHARE))
+
+
+def inmemory_scenario(size: int, options: BenchmarkOptions) -> Scenario:
+    from monitoring_as_code.controller.monitor import Monitor
+    from tests.inmemory.InmemoryObject import PrimitiveInmemoryObject
+    from tests.inmemory.InmemoryProvider import InmemoryProvider
+    from tests.inmemory.InmemoryState import InmemoryState
+
+    class CountingInmemoryProvider(InmemoryProvider):
+        """
+        Counts a call per object read or written,
+        as an API without bulk endpoints would be called
+        """
+
+        calls = 0
+
+        def sync_resources(self, mapped_resources):
+            mapped_resources = list(mapped_resources)
+            self.calls += len(mapped_resources)
+            return super().sync_resources(mapped_resources)
+
+        def apply_actions(self, to_create, to_update, to_remove):
+            to_create, to_update, to_remove = (
+                list(to_create),
+                list(to_update),
+                list(to_remove),
+            )
+            self.calls += len(to_create) + len(to_update) + len(to_remove)
+            return super().apply_actions(to_create, to_update, to_remove)
+
+    provider = CountingInmemoryProvider([])
+    monitor = Monitor(
+        providers=[provider],
+        state=InmemoryState({}, save_state=True, persist_untracked=False),
+    )
+    objects = [
+        PrimitiveInmemoryObject(key=f"object{idx}", name="initial")
+        for idx in range(size)
+    ]
+    updated_objects = [
+        obj.copy(update={"name": "updated"}) if idx < updated_count(size) else obj
+        for idx, obj in enumerate(objects)
+    ]
+
+    return Scenario(
+        apply=lambda objs: monitor.apply_monitoring_state(
+            objs, dry_run=False, fast_plan=options.fast_plan
+        ),
+        objects=objects,
+        updated_objects=updated_objects,
+        api_calls=lambda: provider.calls,
+    )
+
+
+def grafana_scenario(size: int, options: BenchmarkOptions) -> Scenario:
+    from binds.grafana.fake import FakeGrafana, FakeGrafanaOptions, FakeGrafanaSession
+    from binds.grafana.grafana_provider import GrafanaProvider
+    from binds.grafana.objects import Folder
+    from controller.monitor import Monitor
+    from controller.states import FileState
+
+    from tests.grafana.objects import make_alert
+
+    grafana = FakeGrafana(FakeGrafanaOptions(latency=options.latency, seed=0))
+    provider = GrafanaProvider(
+        FakeGrafanaSession(grafana),
+        **{option: True for option in options.grafana_options},
+    )
+    state_dir = tempfile.TemporaryDirectory()
+    monitor = Monitor(
+        providers=[provider],
+        state=FileState(
+            Path(state_dir.name) / "state.json",
+            save_state=True,
+            persist_untracked=False,
+        ),
+    )
+
+    # size is the number of alerts, folders are added on top
+    folders = [
+        Folder(title=f"folder{idx}")
+        for idx in range(math.ceil(size / ALERTS_PER_FOLDER))
+    ]
+    alerts = [
+        make_alert(folders[idx // ALERTS_PER_FOLDER].title, f"alert{idx}")
+        for idx in range(size)
+    ]
+    updated_alerts = [
+        make_alert(alert.folder_title, alert.grafana_alert.title, expr="up == 0")
+        if idx < updated_count(size)
+        else alert
+        for idx, alert in enumerate(alerts)
+    ]
+
+    return Scenario(
+        apply=lambda objs: monitor.apply_monitoring_state(
+            objs, dry_run=False, fast_plan=options.fast_plan
+        ),
+        objects=[*folders, *alerts],
+        updated_objects=[*folders, *updated_alerts],
+        api_calls=lambda: sum(grafana.requests.values()),
+        cleanup=state_dir.cleanup,
+    )
+
+
+SCENARIOS: dict[str, Callable[[int, BenchmarkOptions], Scenario]] = {
+    "inmemory": inmemory_scenario,
+    "grafana": grafana_scenario,
+}
+
+
+def phase_objects(scenario: Scenario, phase: str) -> list[Any]:
+    return {
+        "create": scenario.objects,
+        "noop": scenario.objects,
+        "update": scenario.updated_objects,
+        "cleanup": [],
+    }[phase]
+
+
+def run_timed(target: str, size: int, options: BenchmarkOptions) -> list[Measurement]:
+    scenario = SCENARIOS[target](size, options)
+    measurements = []
+    try:
+        for phase in PHASES:
+            objects = phase_objects(scenario, phase)
+            calls_before = scenario.api_calls()
+            clock_before, cpu_before = perf_counter(), process_time()
+
+            scenario.apply(objects)
+
+            measurements.append(
+                Measurement(
+                    target=target,
+                    size=size,
+                    phase=phase,
+                    wall_time=perf_counter() - clock_before,
+                    cpu_time=process_time() - cpu_before,
+                    api_calls=scenario.api_calls() - calls_before,
+                )
+            )
+    finally:
+        scenario.cleanup()
+    return measurements
+
+
+def run_traced(target: str, size: int, options: BenchmarkOptions) -> list[int]:
+    """
+    :return: peak memory of every phase
+    """
+    tracemalloc.start()
+    scenario = SCENARIOS[target](size, options)
+    peaks = []
+    try:
+        for phase in PHASES:
+            objects = phase_objects(scenario, phase)
+            tracemalloc.reset_peak()
+            memory_before, _ = tracemalloc.get_traced_memory()
+
+            scenario.apply(objects)
+
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - memory_before)
+    finally:
+        scenario.cleanup()
+        tracemalloc.stop()
+    return peaks
+
+
+def run_benchmark(options: BenchmarkOptions) -> dict[str, Any]:
+    measurements: list[Measurement] = []
+    for target in options.targets:
+        for size in options.sizes:
+            logger.warning(f"Benchmarking {target} with {size} objects")
+            target_measurements = run_timed(target, size, options)
+            if options.memory:
+                peaks = run_traced(target, size, options)
+                for measurement, peak in zip(target_measurements, peaks):
+                    measurement.peak_memory = peak
+            measurements.extend(target_measurements)
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "options": asdict(options),
+        },
+        "measurements": [asdict(measurement) for measurement in measurements],
+    }
+
+
+def load_measurements(path: Path) -> dict[tuple[str, int, str], Measurement]:
+    report = json.loads(path.read_text())
+    measurements = (Measurement(**data) for data in report["measurements"])
+    return {measurement.key: measurement for measurement in measurements}
+
+
+def is_regression(
+    metric: str, baseline: float, current: float, threshold: float
+) -> bool:
+    if metric == "api_calls":
+        # calls are deterministic, any extra call is a regression
+        return current > baseline
+
+    min_difference = (
+        MIN_MEMORY_DIFFERENCE if metric == "peak_memory" else MIN_TIME_DIFFERENCE
+    )
+    return current - baseline > min_difference and current > baseline * (1 + threshold)
+
+
+def compare(
+    baseline: dict[tuple[str, int, str], Measurement],
+    current: dict[tuple[str, int, str], Measurement],
+    threshold: float,
+    metrics: Iterable[str] = METRICS,
+) -> list[str]:
+    """
+    :return: descriptions of regressions
+    """
+    regressions = []
+    for key, measurement in current.items():
+        baseline_measurement = baseline.get(key)
+        if baseline_measurement is None:
+            logger.warning(f"{key} is not in the baseline")
+            continue
+
+        for metric in metrics:
+            baseline_value = getattr(baseline_measurement, metric)
+            current_value = getattr(measurement, metric)
+            if baseline_value is None or current_value is None:
+                continue
+
+            if is_regression(metric, baseline_value, current_value, threshold):
+                target, size, phase = key
+                regressions.append(
+                    f"{target} {phase} of {size} objects: "
+                    f"{metric} {baseline_value:g} -> {current_value:g}"
+                )
+    return regressions
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the benchmark and write a json report")
+    run.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    run.add_argument(
+        "--target",
+        dest="targets",
+        action="append",
+        choices=TARGETS,
+        help="may be repeated, all targets by default",
+    )
+    run.add_argument(
+        "--grafana-option",
+        dest="grafana_options",
+        action="append",
+        choices=GRAFANA_OPTIONS,
+        default=[],
+        help="GrafanaProvider flag to enable, may be repeated",
+    )
+    run.add_argument(
+        "--latency", type=float, default=0.0, help="fake Grafana latency, seconds"
+    )
+    run.add_argument("--fast-plan", action="store_true")
+    run.add_argument(
+        "--no-memory", dest="memory", action="store_false", help="skip traced pass"
+    )
+    run.add_argument("--output", type=Path, help="stdout by default")
+
+    compare_parser = commands.add_parser(
+        "compare", help="exit with 1, if the report regressed against the baseline"
+    )
+    compare_parser.add_argument(
+        "baseline", type=Path, nargs="?", default=DEFAULT_BASELINE
+    )
+    compare_parser.add_argument("current", type=Path)
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="relative growth of time or memory to be reported",
+    )
+    compare_parser.add_argument(
+        "--metric", dest="metrics", action="append", choices=METRICS
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(argv)
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    if args.command == "run":
+        options = BenchmarkOptions(
+            sizes=args.sizes,
+            targets=args.targets or list(TARGETS),
+            grafana_options=args.grafana_options,
+            latency=args.latency,
+            fast_plan=args.fast_plan,
+            memory=args.memory,
+        )
+        report = json.dumps(run_benchmark(options), indent=2)
+        if args.output:
+            args.output.parent.mkdir(parents=True, exist_ok=True)
+            args.output.write_text(report + "\n")
+        else:
+            print(report)
+        return 0
+
+    regressions = compare(
+        load_measurements(args.baseline),
+        load_measurements(args.current),
+        args.threshold,
+        args.metrics or METRICS,
+    )
+    for regression in regressions:
+        print(regression)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,7 +4,6 @@ from dataclasses import dataclass
 from datetime import timedelta
 from pathlib import Path
 from time import perf_counter, process_time
-from urllib.parse import urljoin
 
 from binds.grafana.client.alert_queries import ClassicExpression, PrometheusQuery
 from binds.grafana.client.alert_queries.classic_conditions import (
@@ -14,13 +13,13 @@ from binds.grafana.client.alert_queries.classic_conditions import (
 )
 from binds.grafana.client.alert_queries.classic_conditions import dictify_condition as d
 from binds.grafana.client.alerting import AlertQuery, PostableGrafanaRule
+from binds.grafana.client.session import GrafanaSession
 from binds.grafana.client.types import Duration, RelativeTimeRange
 from binds.grafana.grafana_provider import GrafanaProvider
-from binds.grafana.objects import Alert, Folder
+from binds.grafana.objects import Alert, AlertTemplate, Folder
 from controller.monitor import Monitor
 from controller.states import FileState
 from loguru import logger
-from requests import Response, Session
 
 USERNAME = "admin"
 PASSWORD = "admin"
@@ -46,16 +45,6 @@ class Timer(ContextManager):
         self.processor_time = process_time() - self._start_processor
 
 
-class BaseUrlSession(Session):
-    def __init__(self, prefix_url=None):
-        super().__init__()
-        self.prefix_url = prefix_url
-
-    def request(self, method, url, *args, **kwargs) -> Response:
-        url = urljoin(self.prefix_url, url)
-        return super().request(method, url, *args, **kwargs)
-
-
 def run(
     monitor: Monitor,
     alert_count: int,
@@ -117,12 +106,13 @@ def run(
         ),
     )
 
-    monitored_objects = [folder, reference_alert]
-    for idx in range(alert_count - 1):
-        copied_alert = reference_alert.copy(deep=True)
-        copied_alert.grafana_alert.title = f"copy{idx}"
-
-        monitored_objects.append(copied_alert)
+    monitored_objects = [
+        folder,
+        reference_alert,
+        *AlertTemplate(reference_alert).expand(
+            {"idx": range(alert_count - 1)}, title="copy$idx"
+        ),
+    ]
 
     with Timer() as t:
         monitor.apply_monitoring_state(
@@ -181,8 +171,7 @@ def main():
     results_file = Path("results/monitor_measurements.csv")
     setup_results_file(results_file)
 
-    grafana_session = BaseUrlSession(prefix_url="http://localhost:3000/api/")
-    grafana_session.auth = (USERNAME, PASSWORD)
+    grafana_session = GrafanaSession("http://localhost:3000", auth=(USERNAME, PASSWORD))
 
     grafana_provider = GrafanaProvider(grafana_session)
 
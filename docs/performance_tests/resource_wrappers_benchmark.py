@@ -0,0 +1,118 @@
+"""
+Compares the slotted resource containers with the pydantic models
+they replaced, on the wrapping a Monitor run does per object:
+wrap -> map -> sync, reading local_id at every phase
+
+Run from the `monitoring_as_code` directory:
+    PYTHONPATH=. python ../docs/performance_tests/resource_wrappers_benchmark.py
+"""
+from typing import Callable, Generic, TypeVar
+
+import tracemalloc
+from abc import ABC
+from time import process_time
+
+from controller.obj import MonitoringObject
+from controller.resource import LocalResource, MappedResource, SyncedResource
+from pydantic import BaseModel
+
+RESOURCE_COUNT = 10_000
+LOCAL_ID_READS = 3  # fill_provider_id, get_untracked_resources, grouping
+
+T = TypeVar("T", bound=MonitoringObject)
+
+
+class BenchmarkObject(MonitoringObject):
+    key: str
+    name: str
+
+    @property
+    def local_id(self) -> str:
+        return self.key
+
+
+# Resource models as they were defined before the slotted containers
+class PydanticResource(BaseModel, Generic[T], ABC):
+    pass
+
+
+class PydanticLocalResource(PydanticResource[T]):
+    local_object: T
+
+    @property
+    def local_id(self) -> str:
+        return f"{type(self.local_object).__name__}.{self.local_object.local_id}"
+
+
+class PydanticMappedResource(PydanticLocalResource[T]):
+    remote_id: str
+
+
+class PydanticSyncedResource(PydanticMappedResource[T]):
+    remote_object: T
+
+
+def run_pydantic(objects: list[BenchmarkObject]) -> list[object]:
+    synced = []
+    for obj in objects:
+        local = PydanticLocalResource(local_object=obj)
+        mapped = PydanticMappedResource(local_object=obj, remote_id=local.local_id)
+        for _ in range(LOCAL_ID_READS):
+            mapped.local_id
+        synced.append(
+            PydanticSyncedResource(
+                local_object=obj,
+                remote_id=mapped.remote_id,
+                remote_object=obj,
+            )
+        )
+    return synced
+
+
+def run_slotted(objects: list[BenchmarkObject]) -> list[object]:
+    synced = []
+    for obj in objects:
+        local = LocalResource(local_object=obj)
+        mapped = MappedResource.from_local(local, local.local_id)
+        for _ in range(LOCAL_ID_READS):
+            mapped.local_id
+        synced.append(SyncedResource.from_mapped(mapped, obj))
+    return synced
+
+
+def measure(name: str, func: Callable[[list[BenchmarkObject]], list[object]]) -> None:
+    objects = [
+        BenchmarkObject(key=f"key{idx}", name=f"name{idx}")
+        for idx in range(RESOURCE_COUNT)
+    ]
+
+    start = process_time()
+    func(objects)
+    cpu_time = process_time() - start
+
+    tracemalloc.start()
+    result = func(objects)
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = snapshot.statistics("filename")
+    blocks = sum(stat.count for stat in stats)
+    retained = sum(stat.size for stat in stats)
+    del result
+
+    print(
+        f"{name:>9}: cpu {cpu_time * 1000:8.1f} ms, "
+        f"retained {retained / 1024:8.1f} KiB in {blocks} blocks, "
+        f"peak {peak / 1024:8.1f} KiB"
+    )
+
+
+def main() -> None:
+    print(f"{RESOURCE_COUNT} resources")
+    measure("pydantic", run_pydantic)
+    measure("slotted", run_slotted)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import typing
+from typing import Any, Awaitable, Callable, Iterable, Optional, TypeVar
+
+from itertools import chain
+
+from binds.grafana.grafana_provider import GrafanaProviderBase
+from binds.grafana.handlers.alert import AsyncAlertHandler
+from binds.grafana.handlers.folder import AsyncFolderHandler
+from binds.grafana.handlers.rule_group import AsyncGroupedAlertHandler
+from binds.grafana.objects import Folder, GrafanaObject
+from binds.grafana.objects.alert import Alert
+from controller.handler import AsyncResourceHandler
+from controller.http_stats import HttpStats
+from controller.provider import AsyncProvider
+from controller.resource import (
+    LocalResource,
+    MappedResource,
+    ObsoleteResource,
+    SyncedResource,
+)
+from controller.scheduler import run_graph_async
+from controller.throttle import AsyncThrottle
+from controller.utils import gather_bounded
+
+if typing.TYPE_CHECKING:
+    from httpx import AsyncClient
+
+A = TypeVar("A")
+R = TypeVar("R")
+
+
+class AsyncGrafanaProvider(
+    GrafanaProviderBase[AsyncResourceHandler[Any]],
+    AsyncProvider[GrafanaObject],
+):
+    """
+    GrafanaProvider counterpart built on an httpx.AsyncClient.
+    Requires the `async` extra to be installed
+    """
+
+    def __init__(
+        self,
+        client: "AsyncClient",
+        *,
+        bulk_read: bool = False,
+        group_alerts: bool = False,
+        optimistic_writes: bool = False,
+        verify_writes: bool = False,
+        max_concurrency: int = 10,
+        throttle: Optional[AsyncThrottle] = None,
+    ):
+        """
+        :param bulk_read: read remote objects of a type with as few requests
+            as possible (e.g. one request per folder for alerts)
+            instead of a request per object
+        :param group_alerts: pack alerts of a folder with the same evaluation
+            interval into one rule group; implies bulk_read, see GrafanaProvider
+        :param optimistic_writes: do not read an alert back after it is written,
+            see GrafanaProvider
+        :param verify_writes: with optimistic_writes, read back every written
+            alert, not only the created ones
+        :param max_concurrency: number of handler calls awaited at once.
+            Folders are still created before alerts and deleted after them
+        :param throttle: retries requests failed due to overload and
+            adapts the number of writes in flight, see async_grafana_throttle
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be a positive number")
+
+        self.client = client
+        # grouped alerts are looked up among all groups of their folder
+        self.bulk_read = bulk_read or group_alerts
+        self.group_alerts = group_alerts
+        self.optimistic_writes = optimistic_writes
+        self.verify_writes = verify_writes
+        self.max_concurrency = max_concurrency
+        self.throttle = throttle
+        self.client.headers["Content-type"] = "application/json"
+
+        self.http_stats = HttpStats()
+        self.handlers = {
+            Folder: AsyncFolderHandler(client, self.http_stats, throttle),
+            Alert: (
+                AsyncGroupedAlertHandler(client, self.http_stats, throttle)
+                if group_alerts
+                else AsyncAlertHandler(client, self.http_stats, throttle)
+            ),
+        }
+
+    def _checkpointed(
+        self,
+        call: Callable[[], Any],
+        removed: Iterable[ObsoleteResource[GrafanaObject]] = (),
+    ) -> Callable[[], Any]:
+        async def run() -> Any:
+            result = await call()
+            self.report_applied(self._collect_synced([result]), removed)
+            return result
+
+        return run
+
+    async def _map(
+        self,
+        func: Callable[[A], Awaitable[R]],
+        items: Iterable[A],
+    ) -> list[R]:
+        return await gather_bounded(
+            self.max_concurrency,
+            (func(item) for item in items),
+        )
+
+    async def sync_resources(
+        self, mapped_resources: Iterable[MappedResource[GrafanaObject]]
+    ) -> Iterable[SyncedResource[GrafanaObject] | LocalResource[GrafanaObject]]:
+        if not self.bulk_read:
+            return await self._map(
+                lambda r: self.handlers[type(r.local_object)].read(r),
+                mapped_resources,
+            )
+
+        synced: list[SyncedResource[GrafanaObject] | LocalResource[GrafanaObject]] = []
+        for batch_result in await self._map(
+            lambda batch: self.handlers[batch[0]].read_many(batch[1]),
+            self._read_batches(mapped_resources),
+        ):
+            synced.extend(batch_result)
+        return synced
+
+    async def apply_actions(
+        self,
+        to_create: Iterable[LocalResource[GrafanaObject]],
+        to_update: Iterable[SyncedResource[GrafanaObject]],
+        to_remove: Iterable[ObsoleteResource[GrafanaObject]],
+    ) -> list[SyncedResource[GrafanaObject]]:
+        to_create = list(to_create)
+        to_update = list(to_update)
+
+        # Every object is awaited as soon as objects it depends on are done,
+        # e.g. alerts of a folder do not wait for other folders
+        results = await run_graph_async(
+            *self._action_graph(to_create, to_update, to_remove),
+            limit=self.max_concurrency,
+        )
+        synced = self._collect_synced(results.values())
+        if not self.optimistic_writes:
+            return synced
+
+        verified: list[
+            SyncedResource[GrafanaObject] | LocalResource[GrafanaObject]
+        ] = []
+        for batch_result in await self._map(
+            lambda batch: self.handlers[batch[0]].read_many(batch[1]),
+            self._read_batches(self._unverified(chain(to_create, to_update), synced)),
+        ):
+            verified.extend(batch_result)
+        return self._replace_verified(synced, verified)
@@ -3,7 +3,7 @@ from typing import Any
 from abc import ABC
 from enum import Enum
 
-from binds.grafana.client.base import BaseModel
+from binds.grafana.client.intern import InternedModel
 from pydantic import Field, root_validator
 
 __all__ = [
@@ -53,7 +53,7 @@ class Evaluators(str, Enum):
     NO_VALUE = "no_value"  # takes 0 params
 
 
-class Evaluator(BaseModel, ABC):
+class Evaluator(InternedModel, ABC):
     evaluator: Evaluators
 
 
@@ -110,7 +110,7 @@ class ClassicConditionTypes(str, Enum):
     QUERY = "query"
 
 
-class ClassicCondition(BaseModel):
+class ClassicCondition(InternedModel):
     operator: Operators = Operators.AND
     reducer: Reducers
     query: str = Field(..., description="Query ref id")
@@ -2,7 +2,7 @@ from typing import Any, Literal, Optional
 
 from abc import ABC
 
-from binds.grafana.client.base import BaseModel
+from binds.grafana.client.intern import InternedModel
 from pydantic import Field
 
 from ..types import Duration
@@ -29,7 +29,7 @@ Modelling Expressions requires not yet implemented features in Pydantic:
 """
 
 
-class QueryModel(BaseModel, ABC):
+class QueryModel(InternedModel, ABC):
     refId: str
 
 
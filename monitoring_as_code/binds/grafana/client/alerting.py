@@ -8,10 +8,11 @@ from .alert_queries import Expression, QueryModel
 from .alert_queries.classic_conditions import EXPRESSION_DATASOURCE_UID
 from .alert_queries.queries import QUERY_MODEL_UNION
 from .base import BaseModel
+from .intern import InternedModel, intern_mapping
 from .types import Duration, RelativeTimeRange
 
 
-class AlertQuery(BaseModel):
+class AlertQuery(InternedModel):
     # purpose unknown
     queryType: str = Field(
         "",
@@ -123,6 +124,10 @@ class PostableExtendedRuleNode(BaseModel):
     # can be empty in grafana, but does not make sense to be optional for us
     grafana_alert: PostableGrafanaRule
 
+    _intern_labels = validator("labels", "annotations", allow_reuse=True)(
+        intern_mapping
+    )
+
     # Purpose unknown
     record: Optional[str] = None  # ???
     expr: str = ""  # ???
@@ -0,0 +1,124 @@
+from typing import Any, Hashable, Mapping, Optional, TypeVar
+
+import threading
+from enum import Enum
+from weakref import WeakValueDictionary
+
+from binds.grafana.client.base import BaseModel
+from pydantic import BaseModel as pyBase
+
+__all__ = [
+    "InternPool",
+    "InternedDict",
+    "InternedModel",
+    "POOL",
+    "intern_mapping",
+]
+
+T = TypeVar("T")
+
+
+def _key(value: Any) -> Hashable:
+    """
+    Hashable key, equal for equal values of the same types
+    """
+    if isinstance(value, pyBase):
+        return type(value), tuple(
+            (name, _key(item)) for name, item in value.__dict__.items()
+        )
+    if isinstance(value, Mapping):
+        return dict, frozenset((key, _key(item)) for key, item in value.items())
+    if isinstance(value, list | tuple):
+        return type(value), tuple(_key(item) for item in value)
+    if isinstance(value, Enum):
+        return type(value), value.value
+    # the type tells apart equal values like 1, 1.0 and True, that are dumped differently
+    return type(value), value
+
+
+class InternPool:
+    """
+    Canonical instances of equal immutable values, so a value repeated
+    across many objects (e.g. the same query of thousands of alerts) is stored once.
+
+    Instances are held weakly: a value is kept only while something uses it
+    """
+
+    def __init__(self) -> None:
+        self._instances: WeakValueDictionary[Hashable, Any] = WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def intern(self, value: T) -> T:
+        """
+        :return: an instance equal to the value,
+            the value itself if it is the first one
+        """
+        key = _key(value)
+        with self._lock:
+            instance: Optional[T] = self._instances.get(key)
+            if instance is None:
+                self._instances[key] = instance = value
+        return instance
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+
+POOL = InternPool()
+
+
+class InternedDict(dict[str, Any]):
+    """
+    Read-only dict, shared by models with equal values
+    """
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError(
+            "Interned dict is shared between models and can not be modified, "
+            "assign a new dict instead"
+        )
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly  # type: ignore
+
+    def __copy__(self) -> "InternedDict":
+        return self
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> "InternedDict":
+        return self
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return InternedDict, (dict(self),)
+
+
+def intern_mapping(cls: Any, value: Optional[Mapping[str, Any]]) -> Any:
+    """
+    Validator, that interns a dict field, e.g. labels
+    """
+    if value is None:
+        return None
+    return POOL.intern(InternedDict(value))
+
+
+class InternedModel(BaseModel):
+    """
+    Immutable model, that is interned in POOL when validated as a field
+    of another model. So equal sub-models of models, both built locally
+    and parsed from responses, are stored once.
+
+    Assignment to a field raises TypeError, as the instance may be shared
+    with other models: build a changed one with copy(update=...) and assign
+    it to the parent. Validation does not copy instances
+    (copy_on_model_validation), which requires pydantic 1.10
+    """
+
+    __slots__ = ("__weakref__",)
+
+    class Config:
+        allow_mutation = False
+        # shared instances are immutable, there is no need to copy them
+        copy_on_model_validation = "none"
+
+    @classmethod
+    def validate(cls: Any, value: Any) -> Any:
+        return POOL.intern(super().validate(value))
@@ -0,0 +1,122 @@
+import typing
+from typing import Any, Optional
+
+from urllib.parse import urljoin
+
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+
+if typing.TYPE_CHECKING:
+    from httpx import AsyncClient
+
+# seconds to connect and to wait for a response
+DEFAULT_TIMEOUT = (3.05, 30.0)
+DEFAULT_POOL_SIZE = 10
+
+AUTH = tuple[str, str]
+
+
+def api_url(url: str) -> str:
+    """
+    Grafana api root for the url of a Grafana instance,
+    e.g. http://localhost:3000 -> http://localhost:3000/api/
+    """
+    url = url.rstrip("/")
+    if not url.endswith("/api"):
+        url += "/api"
+    return url + "/"
+
+
+def default_headers(token: Optional[str]) -> dict[str, str]:
+    headers = {
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+        # gzip and deflate, along with br when brotli is installed
+        **make_headers(accept_encoding=True, keep_alive=True),
+    }
+    if token is not None:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+class GrafanaSession(Session):
+    """
+    requests.Session for the Grafana HTTP API.
+    Urls are resolved relative to the api root, like handlers expect,
+    and every request gets a timeout unless given one.
+
+    Connections are kept alive in a pool of pool_size connections per host.
+    Requests over the limit wait for a free connection instead of opening
+    and dropping extra ones, so a session can be shared by pool_size threads
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        auth: Optional[AUTH] = None,
+        token: Optional[str] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: Optional[float | tuple[float, float]] = DEFAULT_TIMEOUT,
+    ):
+        """
+        :param url: url of the Grafana instance, e.g. http://localhost:3000
+        :param auth: basic auth username and password
+        :param token: service account token, used instead of basic auth
+        :param pool_size: number of connections kept alive,
+            should be at least the number of threads using the session
+        :param timeout: default timeout of a request, see requests.request
+        """
+        if pool_size < 1:
+            raise ValueError("pool_size must be a positive number")
+
+        super().__init__()
+        self.base_url = api_url(url)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.auth = auth
+        self.headers.update(default_headers(token))
+
+        adapter = HTTPAdapter(pool_maxsize=pool_size, pool_block=True)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+    def request(  # type: ignore[override]
+        self, method: str, url: str, *args: Any, **kwargs: Any
+    ) -> Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, urljoin(self.base_url, url), *args, **kwargs)
+
+
+def async_grafana_client(
+    url: str,
+    *,
+    auth: Optional[AUTH] = None,
+    token: Optional[str] = None,
+    pool_size: int = DEFAULT_POOL_SIZE,
+    timeout: Optional[float | tuple[float, float]] = DEFAULT_TIMEOUT,
+    **kwargs: Any,
+) -> "AsyncClient":
+    """
+    httpx.AsyncClient configured like GrafanaSession,
+    pool_size should be at least max_concurrency of the provider.
+    Requires the `async` extra to be installed
+
+    :param kwargs: passed to httpx.AsyncClient, e.g. a transport
+    """
+    import httpx
+
+    connect_timeout, read_timeout = (
+        timeout if isinstance(timeout, tuple) else (timeout, timeout)
+    )
+    return httpx.AsyncClient(
+        base_url=api_url(url),
+        auth=auth,
+        headers=default_headers(token),
+        limits=httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size
+        ),
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+        **kwargs,
+    )
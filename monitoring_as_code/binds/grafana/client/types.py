@@ -2,7 +2,7 @@ import re
 from datetime import timedelta
 
 import durationpy
-from binds.grafana.client.base import BaseModel
+from binds.grafana.client.intern import InternedModel
 from pydantic import ConstrainedStr, Field
 
 
@@ -15,7 +15,7 @@ class Duration(ConstrainedStr):
         return cls(durationpy.to_str(delta))
 
 
-class RelativeTimeRange(BaseModel):
+class RelativeTimeRange(InternedModel):
     from_: int = Field(..., alias="from", description="From X seconds ago")
     to: int = Field(0, description="Until X seconds ago")
 
@@ -0,0 +1,9 @@
+from .server import FakeGrafana, FakeGrafanaOptions
+from .transport import FakeGrafanaAdapter, FakeGrafanaSession
+
+__all__ = [
+    "FakeGrafana",
+    "FakeGrafanaOptions",
+    "FakeGrafanaAdapter",
+    "FakeGrafanaSession",
+]
@@ -0,0 +1,74 @@
+import asyncio
+
+import httpx
+
+from .server import FAKE_RESPONSE, WRITE_METHODS, FakeGrafana
+from .transport import decode_body, encode_response, split_url
+
+
+def _to_httpx(request: httpx.Request, response: FAKE_RESPONSE) -> httpx.Response:
+    status, content, headers = encode_response(response)
+    return httpx.Response(status, headers=headers, content=content, request=request)
+
+
+class FakeGrafanaTransport(httpx.BaseTransport):
+    """
+    httpx transport, that serves requests by a FakeGrafana.
+    Requires the `async` extra to be installed
+    """
+
+    def __init__(self, grafana: FakeGrafana):
+        self.grafana = grafana
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        path, params = split_url(str(request.url))
+        return _to_httpx(
+            request,
+            self.grafana.serve(
+                request.method, path, params, decode_body(request.read())
+            ),
+        )
+
+
+class AsyncFakeGrafanaTransport(httpx.AsyncBaseTransport):
+    """
+    Asynchronous FakeGrafanaTransport: delays do not block the event loop.
+    Writes through the transport are serialized by its own lock
+    """
+
+    def __init__(self, grafana: FakeGrafana):
+        self.grafana = grafana
+        self._write_locks: dict[asyncio.AbstractEventLoop, asyncio.Lock] = {}
+
+    def _write_lock(self) -> asyncio.Lock:
+        # a lock is bound to the event loop it is first used in
+        loop = asyncio.get_running_loop()
+        if loop not in self._write_locks:
+            self._write_locks = {loop: asyncio.Lock()}
+        return self._write_locks[loop]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        path, params = split_url(str(request.url))
+        body = decode_body(await request.aread())
+        options = self.grafana.options
+
+        await asyncio.sleep(self.grafana.request_delay())
+        if error := self.grafana.injected_error():
+            return _to_httpx(request, error)
+        if request.method not in WRITE_METHODS:
+            return _to_httpx(
+                request, self.grafana.handle(request.method, path, params, body)
+            )
+
+        write_lock = self._write_lock()
+        try:
+            await asyncio.wait_for(write_lock.acquire(), options.lock_timeout)
+        except asyncio.TimeoutError:
+            return _to_httpx(request, self.grafana.locked_response())
+        try:
+            await asyncio.sleep(options.write_duration)
+            return _to_httpx(
+                request, self.grafana.handle(request.method, path, params, body)
+            )
+        finally:
+            write_lock.release()
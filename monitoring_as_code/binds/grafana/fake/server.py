@@ -0,0 +1,342 @@
+from typing import Any, Callable, Optional
+
+import itertools
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http import HTTPStatus as Status
+from urllib.parse import unquote
+
+import durationpy
+
+JSON = Any
+FAKE_RESPONSE = tuple[int, JSON, dict[str, str]]
+
+WRITE_METHODS = frozenset({"POST", "PUT", "DELETE"})
+
+
+@dataclass(frozen=True)
+class FakeGrafanaOptions:
+    """
+    How the fake imitates a real Grafana under load.
+    Delays are in seconds
+    """
+
+    # added to every request
+    latency: float = 0.0
+    # random extra delay from 0 to jitter
+    jitter: float = 0.0
+    # share of requests failing with error_status before they are handled
+    error_rate: float = 0.0
+    error_status: int = Status.SERVICE_UNAVAILABLE
+    # Retry-After of injected errors, seconds
+    retry_after: Optional[float] = None
+    # writes are serialized by a single database lock, each holds it that long
+    write_duration: float = 0.0
+    # a write waiting for the lock longer than that fails as "database is locked";
+    # None waits forever
+    lock_timeout: Optional[float] = None
+    seed: Optional[int] = None
+
+
+class Route:
+    def __init__(
+        self, method: str, template: str, handler: Callable[..., FAKE_RESPONSE]
+    ):
+        self.method = method
+        self.template = template
+        self.handler = handler
+        self.pattern = re.compile(
+            "^" + re.sub(r"{(\w+)}", r"(?P<\1>[^/]+)", template) + "$"
+        )
+
+
+class FakeGrafana:
+    """
+    In-process stand-in for the Grafana folder and ruler APIs used by
+    the Grafana handlers. Requests reach it through FakeGrafanaAdapter
+    (requests) or the httpx transports, no network is involved.
+
+    State is kept in dicts of json, as Grafana would return it.
+    `requests` counts served requests by route, e.g.
+    `POST ruler/grafana/api/v1/rules/{namespace}`
+    """
+
+    def __init__(self, options: FakeGrafanaOptions = FakeGrafanaOptions()):
+        self.options = options
+        self.requests: Counter[str] = Counter()
+
+        self.folders: dict[str, dict[str, JSON]] = {}
+        self.folder_uids: dict[str, str] = {}
+        # rule groups by folder uid and group name
+        self.namespaces: dict[str, dict[str, dict[str, JSON]]] = {}
+        # folder uid and group name of every rule
+        self.rule_locations: dict[str, tuple[str, str]] = {}
+        # group name of every rule title by folder uid
+        self.rule_titles: dict[str, dict[str, str]] = {}
+
+        self._ids = itertools.count(1)
+        self._random = random.Random(options.seed)
+        self._state_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+        self._routes = [
+            Route("GET", "folders/{uid}", self._get_folder),
+            Route("POST", "folders", self._create_folder),
+            Route("PUT", "folders/{uid}", self._update_folder),
+            Route("DELETE", "folders/{uid}", self._delete_folder),
+            Route("GET", "ruler/grafana/api/v1/rules/{namespace}", self._get_namespace),
+            Route("POST", "ruler/grafana/api/v1/rules/{namespace}", self._post_group),
+            Route(
+                "GET", "ruler/grafana/api/v1/rules/{namespace}/{group}", self._get_group
+            ),
+            Route(
+                "DELETE",
+                "ruler/grafana/api/v1/rules/{namespace}/{group}",
+                self._delete_group,
+            ),
+        ]
+
+    # simulation
+
+    def request_delay(self) -> float:
+        return self.options.latency + self._random.uniform(0, self.options.jitter)
+
+    def injected_error(self) -> Optional[FAKE_RESPONSE]:
+        if self.options.error_rate and self._random.random() < self.options.error_rate:
+            status = self.options.error_status
+            headers = (
+                {}
+                if self.options.retry_after is None
+                else {"Retry-After": f"{self.options.retry_after:g}"}
+            )
+            return status, {"message": Status(status).phrase}, headers
+        return None
+
+    @staticmethod
+    def locked_response() -> FAKE_RESPONSE:
+        return (
+            Status.INTERNAL_SERVER_ERROR,
+            {"message": "database is locked"},
+            {},
+        )
+
+    def serve(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, str],
+        body: JSON,
+    ) -> FAKE_RESPONSE:
+        """
+        Handle a request with configured delays, errors and write contention
+        """
+        time.sleep(self.request_delay())
+        if error := self.injected_error():
+            return error
+        if method not in WRITE_METHODS:
+            return self.handle(method, path, params, body)
+
+        timeout = self.options.lock_timeout
+        if not self._write_lock.acquire(timeout=-1 if timeout is None else timeout):
+            return self.locked_response()
+        try:
+            time.sleep(self.options.write_duration)
+            return self.handle(method, path, params, body)
+        finally:
+            self._write_lock.release()
+
+    def handle(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, str],
+        body: JSON,
+    ) -> FAKE_RESPONSE:
+        """
+        Apply a request to the state instantly
+        """
+        path = path.strip("/")
+        for route in self._routes:
+            if route.method != method:
+                continue
+            if match := route.pattern.match(path):
+                self.requests[f"{method} {route.template}"] += 1
+                path_params = {k: unquote(v) for k, v in match.groupdict().items()}
+                with self._state_lock:
+                    return route.handler(params=params, body=body, **path_params)
+
+        self.requests[f"{method} {path}"] += 1
+        return Status.NOT_FOUND, {"message": "Not found"}, {}
+
+    # folders
+
+    def _folder_by_title(self, title: str) -> Optional[dict[str, JSON]]:
+        uid = self.folder_uids.get(title)
+        return self.folders[uid] if uid is not None else None
+
+    def _forget_rules(self, folder_uid: str, rules: list[JSON]) -> None:
+        for rule in rules:
+            del self.rule_locations[rule["grafana_alert"]["uid"]]
+            del self.rule_titles[folder_uid][rule["grafana_alert"]["title"]]
+
+    def _get_folder(self, uid: str, **_: Any) -> FAKE_RESPONSE:
+        if uid not in self.folders:
+            return Status.NOT_FOUND, {"message": "folder not found"}, {}
+        return Status.OK, self.folders[uid], {}
+
+    def _create_folder(self, body: JSON, **_: Any) -> FAKE_RESPONSE:
+        title = body["title"]
+        if self._folder_by_title(title):
+            return (
+                Status.CONFLICT,
+                {"message": "a folder with the same name already exists"},
+                {},
+            )
+
+        folder_id = next(self._ids)
+        uid = body.get("uid") or f"folder{folder_id}"
+        self.folders[uid] = {
+            "id": folder_id,
+            "uid": uid,
+            "title": title,
+            "url": f"/dashboards/f/{uid}/",
+            "version": 1,
+        }
+        self.folder_uids[title] = uid
+        self.namespaces[uid] = {}
+        self.rule_titles[uid] = {}
+        return Status.OK, self.folders[uid], {}
+
+    def _update_folder(self, uid: str, body: JSON, **_: Any) -> FAKE_RESPONSE:
+        if uid not in self.folders:
+            return Status.NOT_FOUND, {"message": "folder not found"}, {}
+
+        folder = self.folders[uid]
+        del self.folder_uids[folder["title"]]
+        self.folder_uids[body["title"]] = uid
+        folder["title"] = body["title"]
+        folder["version"] += 1
+        return Status.OK, folder, {}
+
+    def _delete_folder(
+        self, uid: str, params: dict[str, str], body: JSON, **_: Any
+    ) -> FAKE_RESPONSE:
+        if uid not in self.folders:
+            return Status.NOT_FOUND, {"message": "folder not found"}, {}
+
+        force = str(
+            (body or {}).get("forceDeleteRules", params.get("forceDeleteRules"))
+        )
+        if self.namespaces[uid] and force.lower() != "true":
+            return (
+                Status.BAD_REQUEST,
+                {"message": "folder cannot be deleted: folder contains alert rules"},
+                {},
+            )
+
+        for group in self.namespaces.pop(uid).values():
+            self._forget_rules(uid, group["rules"])
+        del self.rule_titles[uid]
+        folder = self.folders.pop(uid)
+        del self.folder_uids[folder["title"]]
+        return Status.OK, {"message": "Folder deleted", "id": folder["id"]}, {}
+
+    # ruler
+
+    def _get_namespace(self, namespace: str, **_: Any) -> FAKE_RESPONSE:
+        folder = self._folder_by_title(namespace)
+        if folder is None:
+            return Status.NOT_FOUND, {"message": "folder not found"}, {}
+
+        groups = list(self.namespaces[folder["uid"]].values())
+        return Status.ACCEPTED, {namespace: groups} if groups else {}, {}
+
+    def _get_group(self, namespace: str, group: str, **_: Any) -> FAKE_RESPONSE:
+        folder = self._folder_by_title(namespace)
+        if folder is None or group not in self.namespaces[folder["uid"]]:
+            return Status.NOT_FOUND, {"message": "rule group does not exist"}, {}
+        return Status.ACCEPTED, self.namespaces[folder["uid"]][group], {}
+
+    def _post_group(self, namespace: str, body: JSON, **_: Any) -> FAKE_RESPONSE:
+        folder = self._folder_by_title(namespace)
+        if folder is None:
+            return Status.NOT_FOUND, {"message": "folder not found"}, {}
+
+        folder_uid = folder["uid"]
+        group_name = body["name"]
+        groups = self.namespaces[folder_uid]
+        rules = body.get("rules") or []
+
+        titles = [rule["grafana_alert"]["title"] for rule in rules]
+        rule_titles = self.rule_titles[folder_uid]
+        if len(set(titles)) != len(titles) or any(
+            rule_titles.get(title, group_name) != group_name for title in titles
+        ):
+            return (
+                Status.CONFLICT,
+                {"message": "alert rule title must be unique within a folder"},
+                {},
+            )
+
+        for rule in rules:
+            uid = rule["grafana_alert"].get("uid")
+            if uid and self.rule_locations.get(uid) != (folder_uid, group_name):
+                return (
+                    Status.BAD_REQUEST,
+                    {"message": f"failed to update rule with UID {uid}"},
+                    {},
+                )
+
+        previous = groups.pop(group_name, {"rules": []})
+        previous_versions = {
+            rule["grafana_alert"]["uid"]: rule["grafana_alert"]["version"]
+            for rule in previous["rules"]
+        }
+        self._forget_rules(folder_uid, previous["rules"])
+        if not rules:
+            return Status.ACCEPTED, {"message": "rule group deleted successfully"}, {}
+
+        interval_seconds = int(durationpy.from_str(body["interval"]).total_seconds())
+        updated = datetime.now(timezone.utc).isoformat()
+        stored_rules = []
+        for rule in rules:
+            alert = rule["grafana_alert"]
+            uid = alert.get("uid") or f"rule{next(self._ids)}"
+            stored_rules.append(
+                {
+                    **rule,
+                    "grafana_alert": {
+                        **alert,
+                        "uid": uid,
+                        "namespace_uid": folder_uid,
+                        "rule_group": group_name,
+                        "intervalSeconds": interval_seconds,
+                        "version": previous_versions.get(uid, 0) + 1,
+                        "updated": updated,
+                    },
+                }
+            )
+            self.rule_locations[uid] = (folder_uid, group_name)
+            rule_titles[alert["title"]] = group_name
+
+        groups[group_name] = {
+            "name": group_name,
+            "interval": body["interval"],
+            "rules": stored_rules,
+        }
+        return Status.ACCEPTED, {"message": "rule group updated successfully"}, {}
+
+    def _delete_group(self, namespace: str, group: str, **_: Any) -> FAKE_RESPONSE:
+        folder = self._folder_by_title(namespace)
+        if folder is None or group not in self.namespaces[folder["uid"]]:
+            return Status.NOT_FOUND, {"message": "rule group does not exist"}, {}
+
+        self._forget_rules(
+            folder["uid"], self.namespaces[folder["uid"]].pop(group)["rules"]
+        )
+        return Status.ACCEPTED, {"message": "rules deleted"}, {}
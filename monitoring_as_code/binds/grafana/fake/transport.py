@@ -0,0 +1,91 @@
+from typing import Any
+
+import json
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+from binds.grafana.client.session import DEFAULT_POOL_SIZE, GrafanaSession
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from .server import FAKE_RESPONSE, JSON, FakeGrafana
+
+FAKE_GRAFANA_URL = "http://grafana.fake/"
+API_PREFIX = "/api/"
+
+
+def decode_body(body: Any) -> JSON:
+    """
+    Handlers send json, but form data (e.g. of DELETE requests) is accepted too.
+    Handlers never stream bodies, so anything but bytes and str is no body
+    """
+    if not body or not isinstance(body, bytes | str):
+        return None
+    if isinstance(body, bytes):
+        body = body.decode()
+    try:
+        return json.loads(body)
+    except ValueError:
+        return dict(parse_qsl(body))
+
+
+def split_url(url: str) -> tuple[str, dict[str, str]]:
+    """
+    Path relative to the api root and query parameters of a request url
+    """
+    parts = urlsplit(url)
+    return parts.path.removeprefix(API_PREFIX), dict(parse_qsl(parts.query))
+
+
+def encode_response(response: FAKE_RESPONSE) -> tuple[int, bytes, dict[str, str]]:
+    status, payload, headers = response
+    return (
+        status,
+        json.dumps(payload).encode(),
+        {"Content-Type": "application/json", **headers},
+    )
+
+
+class FakeGrafanaAdapter(BaseAdapter):
+    """
+    requests transport adapter, that serves requests by a FakeGrafana
+    """
+
+    def __init__(self, grafana: FakeGrafana):
+        super().__init__()
+        self.grafana = grafana
+
+    def send(  # type: ignore[override]
+        self, request: PreparedRequest, **kwargs: Any
+    ) -> Response:
+        path, params = split_url(request.url or "")
+        status, content, headers = encode_response(
+            self.grafana.serve(
+                request.method or "GET", path, params, decode_body(request.body)
+            )
+        )
+
+        response = Response()
+        response.status_code = status
+        response.reason = HTTPStatus(status).phrase
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = content
+        response.encoding = "utf-8"
+        response.url = request.url or ""
+        response.request = request
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+class FakeGrafanaSession(GrafanaSession):
+    """
+    GrafanaSession with a FakeGrafana mounted instead of a connection pool
+    """
+
+    def __init__(self, grafana: FakeGrafana, pool_size: int = DEFAULT_POOL_SIZE):
+        super().__init__(FAKE_GRAFANA_URL, pool_size=pool_size)
+        self.grafana = grafana
+        self.mount(FAKE_GRAFANA_URL, FakeGrafanaAdapter(grafana))
@@ -1,47 +1,270 @@
-from typing import Collection, Iterable, Type, TypeVar
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Generic,
+    Hashable,
+    Iterable,
+    Optional,
+    Type,
+    TypeVar,
+)
+
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import chain
 
-from binds.grafana.handlers.alert import AlertHandler
+from binds.grafana.client.session import GrafanaSession
+from binds.grafana.handlers.alert import AlertHandler, ensure_synced
 from binds.grafana.handlers.folder import FolderHandler
+from binds.grafana.handlers.rule_group import GroupedAlertHandler, folder_of
 from binds.grafana.objects import Folder, GrafanaObject
 from binds.grafana.objects.alert import Alert
 from binds.grafana.utils import group_resources
-from controller.diff_utils import RESOURCE_DIFF, calculate_diff
-from controller.handler import ResourceHandler
+from controller.diff_utils import ResourceDiff, calculate_diff
+from controller.handler import AsyncResourceHandler, ResourceHandler
+from controller.http_stats import HttpStats
+from controller.obj import MonitoringObject
 from controller.provider import Provider
 from controller.resource import (
+    IdType,
     LocalResource,
     MappedResource,
     ObsoleteResource,
+    Resource,
     SyncedResource,
 )
+from controller.scheduler import run_graph
+from controller.throttle import Throttle
 from requests import Session
 
 T = TypeVar("T", bound=GrafanaObject)
+A = TypeVar("A")
+R = TypeVar("R")
+RS = TypeVar("RS", bound=Resource[Any])
+H = TypeVar("H", ResourceHandler[Any], AsyncResourceHandler[Any])
 
+HANDLERS_MAPPING = dict[Type[GrafanaObject], ResourceHandler[Any]]
 
-class GrafanaProvider(Provider[GrafanaObject]):
-    def __init__(
-        self,
-        http_session: Session,
-    ):
-        self.http_session = http_session
-        self.http_session.headers["Content-type"] = "application/json"
 
-        self.handlers = {
-            Folder: FolderHandler(http_session),
-            Alert: AlertHandler(http_session),
-        }
+class GrafanaProviderBase(Generic[H]):
+    """
+    Logic shared by the synchronous and the asynchronous Grafana providers
+    """
+
+    handlers: dict[Type[GrafanaObject], H]
+    # shared by all handlers, including ones of worker threads
+    http_stats: HttpStats
+    bulk_read: bool
+    group_alerts: bool
+    optimistic_writes: bool
+    verify_writes: bool
+    # see CheckpointReporter
+    report_applied: Callable[..., None]
+    # see TypeLookup
+    group_by_type: Callable[..., dict[str, list[Any]]]
 
     @property
     def operating_objects(self) -> Collection[Type[GrafanaObject]]:
         return set(GrafanaObject.__subclasses__())
 
-    def sync_resources(
-        self, mapped_resources: Iterable[MappedResource[GrafanaObject]]
-    ) -> Iterable[SyncedResource[GrafanaObject] | LocalResource[GrafanaObject]]:
-        return [self.handlers[type(r.local_object)].read(r) for r in mapped_resources]
+    def take_http_stats(self) -> Optional[HttpStats]:
+        return self.http_stats.take()
+
+    def _group_by_type(
+        self, resources: Iterable[RS]
+    ) -> dict[type[MonitoringObject], list[RS]]:
+        type_names_to_types: dict[str, type[MonitoringObject]] = {
+            type_class.__name__: type_class for type_class in self.handlers.keys()
+        }
+        return group_resources(self.group_by_type(resources), type_names_to_types)
+
+    def _read_batches(
+        self,
+        mapped_resources: Iterable[MappedResource[GrafanaObject]],
+    ) -> list[tuple[Type[GrafanaObject], list[MappedResource[Any]]]]:
+        """
+        Split resources into batches that are passed to handler.read_many
+        """
+        mapped_grouped = self._group_by_type(mapped_resources)
+
+        # Alerts are fetched by folder, so a batch is a folder.
+        # Other objects have no bulk endpoint and are read one by one
+        batches: list[tuple[Type[GrafanaObject], list[MappedResource[Any]]]] = []
+        for obj_type in self.handlers:
+            resources = mapped_grouped.get(obj_type, [])
+            if obj_type is Alert:
+                by_folder: dict[str, list[MappedResource[Any]]] = {}
+                for r in resources:
+                    by_folder.setdefault(r.local_object.folder_title, []).append(r)
+                batches.extend((obj_type, batch) for batch in by_folder.values())
+            else:
+                batches.extend((obj_type, [r]) for r in resources)
+        return batches
+
+    def _call_handler(
+        self,
+        obj_type: Type[GrafanaObject],
+        action: str,
+        *args: Any,
+    ) -> Any:
+        return getattr(self.handlers[obj_type], action)(*args)
+
+    def _checkpointed(
+        self,
+        call: Callable[[], Any],
+        removed: Iterable[ObsoleteResource[GrafanaObject]] = (),
+    ) -> Callable[[], Any]:
+        """
+        Report the result of a handler call as soon as it is done
+        """
+
+        def run() -> Any:
+            result = call()
+            self.report_applied(self._collect_synced([result]), removed)
+            return result
+
+        return run
+
+    def _action_graph(
+        self,
+        to_create: Iterable[LocalResource[GrafanaObject]],
+        to_update: Iterable[SyncedResource[GrafanaObject]],
+        to_remove: Iterable[ObsoleteResource[GrafanaObject]],
+    ) -> tuple[dict[Hashable, Optional[Callable[[], Any]]], dict[Hashable, list[Any]]]:
+        """
+        Build handler calls and dependencies between them for the scheduler.
+        Creates and updates wait only for objects they depend on
+        (e.g. alerts of a folder wait for that folder).
+        Obsolete resources carry no objects, so deletes keep the type order:
+        every object of a type is deleted after objects of the types
+        registered after it.
+        With group_alerts, all changes of alerts in a folder are a single call.
+        With optimistic_writes, alerts are written without reading them back
+        """
+        tasks: dict[Hashable, Optional[Callable[[], Any]]] = {}
+        dependencies: dict[Hashable, list[Any]] = {}
+        alert_folders: dict[str, tuple[list[Any], list[Any], list[Any]]] = defaultdict(
+            lambda: ([], [], [])
+        )
+
+        for obj_type, resources in self._group_by_type(
+            chain(to_create, to_update)
+        ).items():
+            for r in resources:
+                is_update = isinstance(r, SyncedResource)
+                if obj_type is Alert and self.group_alerts:
+                    alert_folders[r.local_object.folder_title][is_update].append(r)
+                    continue
+
+                if obj_type is Alert and self.optimistic_writes:
+                    action = "write"
+                else:
+                    action = "update" if is_update else "create"
+                tasks[r.local_id] = self._checkpointed(
+                    partial(self._call_handler, obj_type, action, r)
+                )
+                dependencies[r.local_id] = list(r.local_object.dependencies)
 
-    def diff(self, resource: SyncedResource[GrafanaObject]) -> RESOURCE_DIFF:
+        to_remove_grouped = self._group_by_type(to_remove)
+        if self.group_alerts:
+            for r in to_remove_grouped.pop(Alert, []):
+                alert_folders[folder_of(r)][2].append(r)
+
+        for folder_title, folder_changes in alert_folders.items():
+            key = ("alerts", folder_title)
+            created, updated, removed = folder_changes
+            tasks[key] = self._checkpointed(
+                partial(
+                    self._call_handler,
+                    Alert,
+                    "apply_folder",
+                    folder_title,
+                    *folder_changes,
+                    not self.optimistic_writes,
+                ),
+                removed,
+            )
+            # the folder itself may be among the deletes, that wait for this call
+            dependencies[key] = (
+                [f"{Folder.__name__}.{folder_title}"] if created or updated else []
+            )
+
+        previous_barrier: list[Any] = []
+        for obj_type in reversed(self.handlers):
+            # A no-op node, that is done when all objects of the type are deleted
+            barrier = ("deleted", obj_type)
+            tasks[barrier] = None
+            dependencies[barrier] = list(previous_barrier)
+            if obj_type is Alert and self.group_alerts:
+                dependencies[barrier].extend(
+                    ("alerts", folder_title)
+                    for folder_title, (_, _, removed) in alert_folders.items()
+                    if removed
+                )
+
+            for r in to_remove_grouped.get(obj_type, []):
+                tasks[r.local_id] = self._checkpointed(
+                    partial(self._call_handler, obj_type, "delete", r), [r]
+                )
+                dependencies[r.local_id] = list(previous_barrier)
+                dependencies[barrier].append(r.local_id)
+
+            previous_barrier = [barrier]
+
+        return tasks, dependencies
+
+    @staticmethod
+    def _collect_synced(results: Iterable[Any]) -> list[SyncedResource[GrafanaObject]]:
+        """
+        Gather synced resources from results of the action graph
+        """
+        synced: list[SyncedResource[GrafanaObject]] = []
+        for result in results:
+            match result:
+                case SyncedResource():
+                    synced.append(result)
+                case list():
+                    synced.extend(result)
+        return synced
+
+    def _unverified(
+        self,
+        written: Iterable[LocalResource[GrafanaObject]],
+        synced: Iterable[SyncedResource[GrafanaObject]],
+    ) -> list[MappedResource[GrafanaObject]]:
+        """
+        Alerts to read after optimistic writes: created alerts have no uids
+        until Grafana assigns them. With verify_writes, every written alert is read
+        """
+        resolved_ids = set() if self.verify_writes else {r.local_id for r in synced}
+        return [
+            MappedResource.from_local(
+                r, r.remote_id if isinstance(r, MappedResource) else ""
+            )
+            for r in written
+            if isinstance(r.local_object, Alert) and r.local_id not in resolved_ids
+        ]
+
+    @staticmethod
+    def _replace_verified(
+        synced: Iterable[SyncedResource[GrafanaObject]],
+        verified: Iterable[
+            SyncedResource[GrafanaObject] | LocalResource[GrafanaObject]
+        ],
+    ) -> list[SyncedResource[GrafanaObject]]:
+        verified_synced: list[SyncedResource[GrafanaObject]] = [
+            ensure_synced(r) for r in verified
+        ]
+        verified_ids: set[IdType] = {r.local_id for r in verified_synced}
+        return [
+            *(r for r in synced if r.local_id not in verified_ids),
+            *verified_synced,
+        ]
+
+    def diff(self, resource: SyncedResource[GrafanaObject]) -> ResourceDiff:
         exclude = dict()
         if isinstance(resource.local_object, Alert):
             exclude = {"grafana_alert": {"uid"}}
@@ -52,43 +275,186 @@ class GrafanaProvider(Provider[GrafanaObject]):
             exclude,
         )
 
+
+class GrafanaProvider(
+    GrafanaProviderBase[ResourceHandler[Any]], Provider[GrafanaObject]
+):
+    def __init__(
+        self,
+        http_session: Session,
+        *,
+        bulk_read: bool = False,
+        group_alerts: bool = False,
+        optimistic_writes: bool = False,
+        verify_writes: bool = False,
+        max_workers: int = 1,
+        session_factory: Optional[Callable[[], Session]] = None,
+        throttle: Optional[Throttle] = None,
+    ):
+        """
+        :param bulk_read: read remote objects of a type with as few requests
+            as possible (e.g. one request per folder for alerts)
+            instead of a request per object
+        :param group_alerts: pack alerts of a folder with the same evaluation
+            interval into one rule group, so a single request creates or updates
+            many alerts. Otherwise, every alert gets a rule group of its own.
+            Alerts are looked up among all groups of their folder,
+            so it implies bulk_read
+        :param optimistic_writes: do not read an alert back after it is written.
+            Updated alerts are assumed to be the same as the local objects,
+            uids of created alerts are read with a request per folder
+            after all writes
+        :param verify_writes: with optimistic_writes, read back every written
+            alert in that final pass, not only the created ones
+        :param max_workers: number of handler calls to run concurrently.
+            Folders are still created before alerts and deleted after them
+        :param session_factory: creates a session for each worker thread,
+            since a plain session is not safe to share between threads.
+            Required when max_workers > 1, unless http_session is
+            a GrafanaSession, which workers share, with pool_size
+            of at least max_workers
+        :param throttle: retries requests failed due to overload and
+            adapts the number of writes in flight, see grafana_throttle
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be a positive number")
+        if max_workers > 1 and session_factory is None:
+            if not isinstance(http_session, GrafanaSession):
+                raise ValueError(
+                    "session_factory is required when max_workers > 1, "
+                    "unless http_session is a GrafanaSession"
+                )
+            if http_session.pool_size < max_workers:
+                raise ValueError(
+                    "pool_size of the shared GrafanaSession must be "
+                    "at least max_workers"
+                )
+
+        self.http_session = http_session
+        # grouped alerts are looked up among all groups of their folder
+        self.bulk_read = bulk_read or group_alerts
+        self.group_alerts = group_alerts
+        self.optimistic_writes = optimistic_writes
+        self.verify_writes = verify_writes
+        self.max_workers = max_workers
+        self.session_factory = session_factory
+        self.throttle = throttle
+
+        self.http_stats = HttpStats()
+        self.handlers = self._create_handlers(http_session)
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread_local = threading.local()
+        self._thread_sessions: list[Session] = []
+        self._thread_sessions_lock = threading.Lock()
+
+    def _create_handlers(self, session: Session) -> HANDLERS_MAPPING:
+        session.headers["Content-type"] = "application/json"
+        return {
+            Folder: FolderHandler(session, self.http_stats, self.throttle),
+            Alert: (
+                GroupedAlertHandler(session, self.http_stats, self.throttle)
+                if self.group_alerts
+                else AlertHandler(session, self.http_stats, self.throttle)
+            ),
+        }
+
+    def _get_handler(self, obj_type: Type[GrafanaObject]) -> ResourceHandler[Any]:
+        """
+        Return a handler that is safe to use from the current thread
+        """
+        if self._executor is None or self.session_factory is None:
+            return self.handlers[obj_type]
+
+        handlers: Optional[HANDLERS_MAPPING] = getattr(
+            self._thread_local, "handlers", None
+        )
+        if handlers is None:
+            assert self.session_factory is not None
+            session = self.session_factory()
+            with self._thread_sessions_lock:
+                self._thread_sessions.append(session)
+            handlers = self._create_handlers(session)
+            self._thread_local.handlers = handlers
+
+        return handlers[obj_type]
+
+    def _call_handler(
+        self,
+        obj_type: Type[GrafanaObject],
+        action: str,
+        *args: Any,
+    ) -> Any:
+        return getattr(self._get_handler(obj_type), action)(*args)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="grafana-provider",
+            )
+        return self._executor
+
+    def _map(self, func: Callable[[A], R], items: Iterable[A]) -> list[R]:
+        items = list(items)
+        if self.max_workers == 1 or len(items) <= 1:
+            return [func(item) for item in items]
+
+        return list(self._get_executor().map(func, items))
+
+    def sync_resources(
+        self, mapped_resources: Iterable[MappedResource[GrafanaObject]]
+    ) -> Iterable[SyncedResource[GrafanaObject] | LocalResource[GrafanaObject]]:
+        if not self.bulk_read:
+            return self._map(
+                lambda r: self._get_handler(type(r.local_object)).read(r),
+                mapped_resources,
+            )
+
+        synced: list[SyncedResource[GrafanaObject] | LocalResource[GrafanaObject]] = []
+        for batch_result in self._map(
+            lambda batch: self._get_handler(batch[0]).read_many(batch[1]),
+            self._read_batches(mapped_resources),
+        ):
+            synced.extend(batch_result)
+        return synced
+
     def apply_actions(
         self,
         to_create: Iterable[LocalResource[GrafanaObject]],
         to_update: Iterable[SyncedResource[GrafanaObject]],
         to_remove: Iterable[ObsoleteResource[GrafanaObject]],
     ) -> list[SyncedResource[GrafanaObject]]:
-        type_names_to_types = {
-            type_class.__name__: type_class for type_class in self.handlers.keys()
-        }
-        synced: list[SyncedResource[GrafanaObject]] = []
+        to_create = list(to_create)
+        to_update = list(to_update)
 
-        to_create_grouped = group_resources(to_create, type_names_to_types)
-        to_update_grouped = group_resources(
-            to_update,
-            type_names_to_types,
+        # Every object runs as soon as objects it depends on are done,
+        # e.g. alerts of a folder do not wait for other folders
+        results = run_graph(
+            *self._action_graph(to_create, to_update, to_remove),
+            executor=self._get_executor() if self.max_workers > 1 else None,
         )
-        to_remove_grouped = group_resources(to_remove, type_names_to_types)
-
-        obj_type: T
-        handler: ResourceHandler[T]
-        for obj_type, handler in self.handlers.items():
-            synced.extend(
-                [
-                    self.handlers[obj_type].create(r_c)
-                    for r_c in to_create_grouped.get(obj_type, [])
-                ]
-            )
+        synced = self._collect_synced(results.values())
+        if not self.optimistic_writes:
+            return synced
 
-            synced.extend(
-                [
-                    self.handlers[obj_type].update(r_u)
-                    for r_u in to_update_grouped.get(obj_type, [])
-                ]
-            )
+        verified: list[
+            SyncedResource[GrafanaObject] | LocalResource[GrafanaObject]
+        ] = []
+        for batch_result in self._map(
+            lambda batch: self._get_handler(batch[0]).read_many(batch[1]),
+            self._read_batches(self._unverified(chain(to_create, to_update), synced)),
+        ):
+            verified.extend(batch_result)
+        return self._replace_verified(synced, verified)
 
-        for obj_type, handler in reversed(self.handlers.items()):
-            for r_d in to_remove_grouped.get(obj_type, []):
-                self.handlers[obj_type].delete(r_d)
+    def dispose(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
 
-        return synced
+        with self._thread_sessions_lock:
+            for session in self._thread_sessions:
+                session.close()
+            self._thread_sessions.clear()
+        self._thread_local = threading.local()
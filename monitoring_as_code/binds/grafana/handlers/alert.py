@@ -1,7 +1,15 @@
+from typing import Iterable, Optional
+
+from collections import defaultdict
 from http import HTTPStatus as Status
 
+from binds.grafana.client.alerting import PostableExtendedRuleNode
 from binds.grafana.objects.alert import Alert, AlertGroup
-from controller.handler import HttpApiResourceHandler
+from controller.handler import (
+    AsyncHttpApiResourceHandler,
+    HttpApiResourceHandler,
+    HttpResponse,
+)
 from controller.resource import (
     LocalResource,
     MappedResource,
@@ -9,16 +17,47 @@ from controller.resource import (
     SyncedResource,
 )
 
+NAMESPACE_ENDPOINT = "ruler/grafana/api/v1/rules/{folder}"
+GROUP_ENDPOINT = "ruler/grafana/api/v1/rules/{folder}/{group}"
+
 
-def alert_to_singleton_group(alert: Alert) -> AlertGroup:
+def group_path(remote_identifier: str) -> dict[str, str]:
+    folder_title, group_name = remote_identifier.split("/", 1)
+    return {"folder": folder_title, "group": group_name}
+
+
+def alert_to_rule(alert: Alert, uid: Optional[str] = None) -> PostableExtendedRuleNode:
+    """
+    Copy the alert into a rule of a group. The uid is set on the copy,
+    so the local object is left untouched
+    """
+    rule = PostableExtendedRuleNode.parse_obj(
+        alert.dict(by_alias=True, include=set(PostableExtendedRuleNode.__fields__))
+    )
+    rule.grafana_alert.uid = uid
+    return rule
+
+
+def alert_to_singleton_group(alert: Alert, uid: Optional[str] = None) -> AlertGroup:
     return AlertGroup(
-        # folder_title=alert.local_id,
         interval=alert.evaluation_interval,
         name=alert.grafana_alert.title,
-        rules=[alert],
+        rules=[alert_to_rule(alert, uid)],
     )
 
 
+def parse_group_rule(
+    group: AlertGroup,
+    rule: PostableExtendedRuleNode,
+    folder_title: str,
+) -> Alert:
+    return Alert(
+        evaluation_interval=group.interval,
+        folder_title=folder_title,
+        **rule.dict(),
+    ).freeze()
+
+
 def parse_singleton_group(group: AlertGroup, folder_title: str) -> Alert:
     if (rules_length := len(group.rules)) != 1:
         raise ValueError(
@@ -26,89 +65,299 @@ def parse_singleton_group(group: AlertGroup, folder_title: str) -> Alert:
             % (group.name, rules_length)
         )
 
-    return Alert(
-        evaluation_interval=group.interval,
-        folder_title=folder_title,
-        **group.rules[0].dict(),
+    return parse_group_rule(group, group.rules[0], folder_title)
+
+
+def find_group_rule(
+    group: AlertGroup,
+    alert: Alert,
+    remote_id: str,
+) -> PostableExtendedRuleNode:
+    rules = group.rules or []
+    for rule in rules:
+        if rule.grafana_alert.uid == remote_id:
+            return rule
+    for rule in rules:
+        if rule.grafana_alert.title == alert.grafana_alert.title:
+            return rule
+    raise ValueError(
+        f"AlertGroup {group.name} has no alert {alert.grafana_alert.title}"
     )
 
 
+class NamespaceIndex:
+    """
+    Rule groups of a single folder (rule namespace) indexed by rule uid and title
+    """
+
+    def __init__(self, groups: Iterable[AlertGroup]):
+        self.groups: dict[str, AlertGroup] = {}
+        self.by_uid: dict[str, AlertGroup] = {}
+        self.by_title: dict[str, AlertGroup] = {}
+
+        for group in groups:
+            self.groups[group.name] = group
+            for rule in group.rules or []:
+                if rule.grafana_alert.uid:
+                    self.by_uid[rule.grafana_alert.uid] = group
+                self.by_title[rule.grafana_alert.title] = group
+
+    def find(self, alert: Alert, remote_id: str) -> AlertGroup | None:
+        return self.by_uid.get(remote_id) or self.by_title.get(
+            alert.grafana_alert.title
+        )
+
+
+def parse_read_response(
+    resource: MappedResource[Alert],
+    response: HttpResponse,
+) -> SyncedResource[Alert] | LocalResource[Alert]:
+    if response.status_code == Status.NOT_FOUND:
+        return LocalResource(
+            local_object=resource.local_object,
+        )
+    elif response.status_code == Status.ACCEPTED:
+        json = response.json()
+        if not json["rules"]:
+            return LocalResource(local_object=resource.local_object)
+
+        alert_group = AlertGroup(**json)
+        alert_id = alert_group.rules[0].grafana_alert.uid
+        return SyncedResource(
+            local_object=resource.local_object,
+            remote_id=alert_id,
+            remote_object=parse_singleton_group(
+                alert_group, resource.local_object.folder_title
+            ),
+        )
+    else:
+        raise RuntimeError(f"Unexpected status: {response.status_code}")
+
+
+def parse_namespace_response(
+    folder_title: str,
+    response: HttpResponse,
+) -> NamespaceIndex:
+    if response.status_code == Status.NOT_FOUND:
+        return NamespaceIndex([])
+    elif response.status_code in (Status.OK, Status.ACCEPTED):
+        json = response.json()
+        return NamespaceIndex(
+            AlertGroup(**group) for group in json.get(folder_title, [])
+        )
+    else:
+        raise RuntimeError(f"Unexpected status: {response.status_code}")
+
+
+def resolve_from_namespace(
+    resources: Iterable[MappedResource[Alert]],
+    folder_title: str,
+    index: NamespaceIndex,
+) -> list[SyncedResource[Alert] | LocalResource[Alert]]:
+    read_resources: list[SyncedResource[Alert] | LocalResource[Alert]] = []
+    for resource in resources:
+        group = index.find(resource.local_object, resource.remote_id)
+        if group is None:
+            read_resources.append(LocalResource(local_object=resource.local_object))
+            continue
+
+        # a group holds a single alert, unless alerts are packed into groups
+        rule = find_group_rule(group, resource.local_object, resource.remote_id)
+        read_resources.append(
+            SyncedResource(
+                local_object=resource.local_object,
+                remote_id=rule.grafana_alert.uid,
+                remote_object=parse_group_rule(group, rule, folder_title),
+            )
+        )
+    return read_resources
+
+
+def group_by_folder(
+    resources: Iterable[MappedResource[Alert]],
+) -> dict[str, list[MappedResource[Alert]]]:
+    resources_by_folder: dict[str, list[MappedResource[Alert]]] = defaultdict(list)
+    for resource in resources:
+        resources_by_folder[resource.local_object.folder_title].append(resource)
+    return resources_by_folder
+
+
+def updated_group(resource: SyncedResource[Alert]) -> AlertGroup:
+    return alert_to_singleton_group(resource.local_object, resource.remote_id)
+
+
+def written_group(resource: LocalResource[Alert]) -> AlertGroup:
+    if isinstance(resource, SyncedResource):
+        return updated_group(resource)
+    return alert_to_singleton_group(resource.local_object)
+
+
+def optimistic_synced(resource: LocalResource[Alert]) -> SyncedResource[Alert] | None:
+    """
+    Result of a write, that is not read back: the remote object is assumed
+    to be the posted local one. Created alerts get their uids from Grafana,
+    so they can not be resolved without a read
+    """
+    if isinstance(resource, SyncedResource):
+        return SyncedResource.from_mapped(resource, resource.local_object)
+    return None
+
+
+def ensure_synced(
+    resource: SyncedResource[Alert] | LocalResource[Alert],
+) -> SyncedResource[Alert]:
+    if not isinstance(resource, SyncedResource):
+        raise RuntimeError("After creation, read must return Synced resource")
+    return resource
+
+
+def check_delete_response(response: HttpResponse) -> None:
+    if response.status_code == Status.NOT_FOUND:
+        return
+
+    response.raise_for_status()
+
+
 class AlertHandler(HttpApiResourceHandler[Alert]):
     def read(
         self, resource: MappedResource[Alert]
     ) -> SyncedResource[Alert] | LocalResource[Alert]:
         remote_identifier = Alert.get_remote_identifier(resource.local_id)
-        response = self.client.get(f"ruler/grafana/api/v1/rules/{remote_identifier}")
-        if response.status_code == Status.NOT_FOUND:
-            return LocalResource(
-                local_object=resource.local_object,
-            )
-        elif response.status_code == Status.ACCEPTED:
-            json = response.json()
-            if not json['rules']:
-                return LocalResource(local_object=resource.local_object)
-
-            alert_group = AlertGroup(**json)
-            alert_id = alert_group.rules[0].grafana_alert.uid
-            return SyncedResource(
-                local_object=resource.local_object,
-                remote_id=alert_id,
-                remote_object=parse_singleton_group(
-                    alert_group, resource.local_object.folder_title
-                ),
+        response = self.request("GET", GROUP_ENDPOINT, group_path(remote_identifier))
+        return parse_read_response(resource, response)
+
+    def read_many(
+        self, resources: Iterable[MappedResource[Alert]]
+    ) -> list[SyncedResource[Alert] | LocalResource[Alert]]:
+        """
+        Fetch every folder once and resolve all alerts in it from the response
+        """
+        read_resources: list[SyncedResource[Alert] | LocalResource[Alert]] = []
+        for folder_title, folder_resources in group_by_folder(resources).items():
+            index = self.read_namespace(folder_title)
+            read_resources.extend(
+                resolve_from_namespace(folder_resources, folder_title, index)
             )
-        else:
-            raise RuntimeError(f"Unexpected status: {response.status_code}")
 
-    def create(self, resource: LocalResource[Alert]) -> SyncedResource[Alert]:
-        folder_name = resource.local_object.folder_title
-        alert_group = alert_to_singleton_group(resource.local_object)
+        return read_resources
+
+    def read_namespace(self, folder_title: str) -> NamespaceIndex:
+        response = self.request("GET", NAMESPACE_ENDPOINT, {"folder": folder_title})
+        return parse_namespace_response(folder_title, response)
+
+    def write(self, resource: LocalResource[Alert]) -> SyncedResource[Alert] | None:
+        """
+        Post the alert without reading it back, see optimistic_synced
+        """
+        folder_title = resource.local_object.folder_title
 
-        response = self.client.post(
-            f"ruler/grafana/api/v1/rules/{folder_name}",
-            data=alert_group.json(),
+        response = self.request(
+            "POST",
+            NAMESPACE_ENDPOINT,
+            {"folder": folder_title},
+            data=written_group(resource).wire_json(),
         )
         response.raise_for_status()
 
-        created_resource = self.read(
-            MappedResource(local_object=resource.local_object, remote_id="unknown")
-        )
+        return optimistic_synced(resource)
 
-        if isinstance(created_resource, ObsoleteResource):
-            raise RuntimeError("After creation, read must return Synced resource")
+    def create(self, resource: LocalResource[Alert]) -> SyncedResource[Alert]:
+        self.write(resource)
 
-        return created_resource
+        return ensure_synced(
+            self.read(
+                MappedResource(local_object=resource.local_object, remote_id="unknown")
+            )
+        )
 
     def update(self, resource: SyncedResource[Alert]) -> SyncedResource[Alert]:
-        group = alert_to_singleton_group(resource.local_object)
-        group.rules[0].grafana_alert.uid = resource.remote_id
+        self.write(resource)
+
+        return ensure_synced(
+            self.read(
+                MappedResource(
+                    local_object=resource.local_object, remote_id=resource.remote_id
+                )
+            )
+        )
 
+    def delete(self, resource: ObsoleteResource[Alert]) -> None:
+        remote_identifier = Alert.get_remote_identifier(resource.local_id)
+
+        response = self.request("DELETE", GROUP_ENDPOINT, group_path(remote_identifier))
+        check_delete_response(response)
+
+
+class AsyncAlertHandler(AsyncHttpApiResourceHandler[Alert]):
+    async def read(
+        self, resource: MappedResource[Alert]
+    ) -> SyncedResource[Alert] | LocalResource[Alert]:
+        remote_identifier = Alert.get_remote_identifier(resource.local_id)
+        response = await self.request(
+            "GET", GROUP_ENDPOINT, group_path(remote_identifier)
+        )
+        return parse_read_response(resource, response)
+
+    async def read_many(
+        self, resources: Iterable[MappedResource[Alert]]
+    ) -> list[SyncedResource[Alert] | LocalResource[Alert]]:
+        """
+        Fetch every folder once and resolve all alerts in it from the response
+        """
+        read_resources: list[SyncedResource[Alert] | LocalResource[Alert]] = []
+        for folder_title, folder_resources in group_by_folder(resources).items():
+            index = await self.read_namespace(folder_title)
+            read_resources.extend(
+                resolve_from_namespace(folder_resources, folder_title, index)
+            )
+
+        return read_resources
+
+    async def read_namespace(self, folder_title: str) -> NamespaceIndex:
+        response = await self.request(
+            "GET", NAMESPACE_ENDPOINT, {"folder": folder_title}
+        )
+        return parse_namespace_response(folder_title, response)
+
+    async def write(
+        self, resource: LocalResource[Alert]
+    ) -> SyncedResource[Alert] | None:
         folder_title = resource.local_object.folder_title
 
-        response = self.client.post(
-            f"ruler/grafana/api/v1/rules/{folder_title}",
-            data=group.json(),
+        response = await self.request(
+            "POST",
+            NAMESPACE_ENDPOINT,
+            {"folder": folder_title},
+            content=written_group(resource).wire_json(),
         )
         response.raise_for_status()
 
-        updated_resource = self.read(
-            MappedResource(
-                local_object=resource.local_object, remote_id=resource.remote_id
+        return optimistic_synced(resource)
+
+    async def create(self, resource: LocalResource[Alert]) -> SyncedResource[Alert]:
+        await self.write(resource)
+
+        return ensure_synced(
+            await self.read(
+                MappedResource(local_object=resource.local_object, remote_id="unknown")
             )
         )
 
-        if isinstance(updated_resource, ObsoleteResource):
-            raise RuntimeError("After creation, read must return Synced resource")
+    async def update(self, resource: SyncedResource[Alert]) -> SyncedResource[Alert]:
+        await self.write(resource)
 
-        return updated_resource
+        return ensure_synced(
+            await self.read(
+                MappedResource(
+                    local_object=resource.local_object, remote_id=resource.remote_id
+                )
+            )
+        )
 
-    def delete(self, resource: ObsoleteResource[Alert]) -> None:
+    async def delete(self, resource: ObsoleteResource[Alert]) -> None:
         remote_identifier = Alert.get_remote_identifier(resource.local_id)
 
-        response = self.client.delete(
-            f"ruler/grafana/api/v1/rules/{remote_identifier}",
+        response = await self.request(
+            "DELETE", GROUP_ENDPOINT, group_path(remote_identifier)
         )
-        if response.status_code == Status.NOT_FOUND:
-            return
-
-        response.raise_for_status()
+        check_delete_response(response)
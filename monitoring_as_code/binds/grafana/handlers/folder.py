@@ -1,7 +1,11 @@
 from http import HTTPStatus as Status
 
 from binds.grafana.objects import Folder
-from controller.handler import HttpApiResourceHandler
+from controller.handler import (
+    AsyncHttpApiResourceHandler,
+    HttpApiResourceHandler,
+    HttpResponse,
+)
 from controller.resource import (
     LocalResource,
     MappedResource,
@@ -9,6 +13,67 @@ from controller.resource import (
     SyncedResource,
 )
 
+FOLDERS_ENDPOINT = "folders"
+FOLDER_ENDPOINT = "folders/{uid}"
+
+
+def parse_read_response(
+    resource: MappedResource[Folder],
+    response: HttpResponse,
+) -> SyncedResource[Folder] | LocalResource[Folder]:
+    if response.status_code == Status.NOT_FOUND:
+        return LocalResource(local_object=resource.local_object)
+    elif response.status_code == Status.OK:
+        json = response.json()
+        folder = Folder(**json).freeze()
+        return SyncedResource(
+            local_object=resource.local_object,
+            remote_id=resource.remote_id,
+            remote_object=folder,
+        )
+    else:
+        raise RuntimeError(f"Unexpected status: {response.status_code}")
+
+
+def parse_create_response(
+    resource: LocalResource[Folder],
+    response: HttpResponse,
+) -> SyncedResource[Folder]:
+    response.raise_for_status()
+
+    json = response.json()
+    remote_folder = Folder(**json).freeze()
+    remote_id = json["uid"]
+
+    return SyncedResource(
+        local_object=resource.local_object,
+        remote_object=remote_folder,
+        remote_id=remote_id,
+    )
+
+
+def parse_update_response(
+    resource: SyncedResource[Folder],
+    response: HttpResponse,
+) -> SyncedResource[Folder]:
+    response.raise_for_status()
+
+    json = response.json()
+    remote_folder = Folder(**json).freeze()
+
+    return SyncedResource(
+        local_object=resource.local_object,
+        remote_id=resource.remote_id,
+        remote_object=remote_folder,
+    )
+
+
+def check_delete_response(response: HttpResponse) -> None:
+    if response.status_code == Status.NOT_FOUND:
+        return
+
+    response.raise_for_status()
+
 
 class FolderHandler(HttpApiResourceHandler[Folder]):
     def read(
@@ -16,75 +81,96 @@ class FolderHandler(HttpApiResourceHandler[Folder]):
         resource: MappedResource[Folder],
     ) -> SyncedResource[Folder] | LocalResource[Folder]:
         # Get folder by uid
-        response = self.client.get(f"folders/{resource.remote_id}")
-
-        if response.status_code == Status.NOT_FOUND:
-            return LocalResource(
-                local_object=resource.local_object
-            )
-        elif response.status_code == Status.OK:
-            json = response.json()
-            folder = Folder(**json)
-            return SyncedResource(
-                local_object=resource.local_object,
-                remote_id=resource.remote_id,
-                remote_object=folder,
-            )
-        else:
-            raise RuntimeError(f"Unexpected status: {response.status_code}")
+        response = self.request("GET", FOLDER_ENDPOINT, {"uid": resource.remote_id})
+        return parse_read_response(resource, response)
 
     def create(
         self,
         resource: LocalResource[Folder],
     ) -> SyncedResource[Folder]:
-        response = self.client.post("folders", json=resource.local_object.dict())
-        response.raise_for_status()
-
-        json = response.json()
-        remote_folder = Folder(**json)
-        remote_id = json["uid"]
-
-        return SyncedResource(
-            local_object=resource.local_object,
-            remote_object=remote_folder,
-            remote_id=remote_id,
+        response = self.request(
+            "POST", FOLDERS_ENDPOINT, json=resource.local_object.dict()
         )
+        return parse_create_response(resource, response)
 
     def update(
         self,
         resource: SyncedResource[Folder],
     ) -> SyncedResource[Folder]:
-        response = self.client.put(
-            f"folders/{resource.remote_id}",
+        response = self.request(
+            "PUT",
+            FOLDER_ENDPOINT,
+            {"uid": resource.remote_id},
             json={
                 "overwrite": True,
                 **resource.local_object.dict(),
             },
         )
-
-        response.raise_for_status()
-
-        json = response.json()
-        remote_folder = Folder(**json)
-
-        updated_resource = resource.copy(deep=True)
-        updated_resource.remote_object = remote_folder
-
-        return updated_resource
+        return parse_update_response(resource, response)
 
     def delete(
         self,
         resource: ObsoleteResource[Folder],
     ) -> None:
-        response = self.client.delete(
-            f"folders/{resource.remote_id}",
+        response = self.request(
+            "DELETE",
+            FOLDER_ENDPOINT,
+            {"uid": resource.remote_id},
             data={
                 # fail deletion if folder contains Grafana 8 alerts
                 "forceDeleteRules": False,
             },
         )
+        check_delete_response(response)
+
+
+class AsyncFolderHandler(AsyncHttpApiResourceHandler[Folder]):
+    async def read(
+        self,
+        resource: MappedResource[Folder],
+    ) -> SyncedResource[Folder] | LocalResource[Folder]:
+        response = await self.request(
+            "GET", FOLDER_ENDPOINT, {"uid": resource.remote_id}
+        )
+        return parse_read_response(resource, response)
 
-        if response.status_code == Status.NOT_FOUND:
-            return
+    async def create(
+        self,
+        resource: LocalResource[Folder],
+    ) -> SyncedResource[Folder]:
+        response = await self.request(
+            "POST", FOLDERS_ENDPOINT, json=resource.local_object.dict()
+        )
+        return parse_create_response(resource, response)
 
-        response.raise_for_status()
+    async def update(
+        self,
+        resource: SyncedResource[Folder],
+    ) -> SyncedResource[Folder]:
+        response = await self.request(
+            "PUT",
+            FOLDER_ENDPOINT,
+            {"uid": resource.remote_id},
+            json={
+                "overwrite": True,
+                **resource.local_object.dict(),
+            },
+        )
+        return parse_update_response(resource, response)
+
+    async def delete(
+        self,
+        resource: ObsoleteResource[Folder],
+    ) -> None:
+        # httpx does not send a body with DELETE, Grafana reads the flag
+        # from the query string anyway
+        response = await self.request(
+            "DELETE",
+            FOLDER_ENDPOINT,
+            {"uid": resource.remote_id},
+            params={
+                # fail deletion if folder contains Grafana 8 alerts
+                "forceDeleteRules": "false",
+            },
+        )
+        check_delete_response(response)
@@ -1,7 +1,18 @@
-from http import HTTPStatus as Status
+from typing import Iterable, Optional
 
-from binds.grafana.objects.alert import AlertGroup
-from controller.handler import HttpApiResourceHandler
+from binds.grafana.client.alerting import PostableExtendedRuleNode
+from binds.grafana.handlers.alert import (
+    GROUP_ENDPOINT,
+    NAMESPACE_ENDPOINT,
+    AlertHandler,
+    AsyncAlertHandler,
+    NamespaceIndex,
+    alert_to_rule,
+    check_delete_response,
+    ensure_synced,
+    resolve_from_namespace,
+)
+from binds.grafana.objects.alert import Alert, AlertGroup
 from controller.resource import (
     LocalResource,
     MappedResource,
@@ -9,52 +20,294 @@ from controller.resource import (
     SyncedResource,
 )
 
+RULE_KEY = tuple[str, str]
 
-class AlertGroupHandler(HttpApiResourceHandler[AlertGroup]):
-    def read(
-        self, resource: MappedResource[AlertGroup]
-    ) -> SyncedResource[AlertGroup] | LocalResource[AlertGroup]:
-        response = self.client.get(f"ruler/grafana/api/v1/rules/{resource.remote_id}")
 
-        if response.status_code == Status.NOT_FOUND:
-            return LocalResource(
-                local_object=resource.local_object,
-            )
-        elif response.status_code == Status.ACCEPTED:
-            json = response.json()
-            if not json['rules']:
-                return LocalResource(
-                    local_object=resource.local_object,
+def rule_group_name(alert: Alert) -> str:
+    """
+    Alerts of a folder with the same evaluation interval share a rule group
+    """
+    return f"every {alert.evaluation_interval}"
+
+
+def _rule_key(rule: PostableExtendedRuleNode) -> RULE_KEY:
+    if rule.grafana_alert.uid:
+        return "uid", rule.grafana_alert.uid
+    return "title", rule.grafana_alert.title
+
+
+class FolderRuleGroups:
+    """
+    Rule groups of a folder, that are being changed.
+    Changes are made to copies of the groups read from Grafana
+    and only modified groups are written back
+    """
+
+    def __init__(self, index: NamespaceIndex):
+        self.intervals = {name: group.interval for name, group in index.groups.items()}
+        self.rules: dict[str, dict[RULE_KEY, PostableExtendedRuleNode]] = {
+            name: {_rule_key(rule): rule for rule in group.rules or []}
+            for name, group in index.groups.items()
+        }
+        self.group_by_uid: dict[str, str] = {
+            uid: group.name for uid, group in index.by_uid.items()
+        }
+        self.modified: set[str] = set()
+        self.with_removals: set[str] = set()
+
+    def remove(self, uid: str) -> None:
+        group_name = self.group_by_uid.pop(uid, None)
+        if group_name is None:
+            # already deleted
+            return
+
+        del self.rules[group_name][("uid", uid)]
+        self.modified.add(group_name)
+        self.with_removals.add(group_name)
+
+    def put(self, alert: Alert, uid: Optional[str] = None) -> None:
+        group_name = rule_group_name(alert)
+        if uid is not None and self.group_by_uid.get(uid) != group_name:
+            # The rule is in another group or was deleted: re-create it
+            self.remove(uid)
+            uid = None
+
+        rule = alert_to_rule(alert, uid)
+        self.intervals[group_name] = alert.evaluation_interval
+        self.rules.setdefault(group_name, {})[_rule_key(rule)] = rule
+        self.modified.add(group_name)
+
+    def writes(self) -> list[tuple[str, Optional[AlertGroup]]]:
+        """
+        Modified groups by name, None for groups left empty, that must be deleted.
+        Groups that lost rules go first, so a rule moved between groups
+        never exists twice
+        """
+        names = sorted(self.modified, key=lambda name: name not in self.with_removals)
+        return [
+            (
+                name,
+                AlertGroup(
+                    name=name,
+                    interval=self.intervals[name],
+                    rules=list(self.rules[name].values()),
                 )
-            alert_group = AlertGroup(**json)
-            return SyncedResource[AlertGroup](
-                local_object=resource.local_object,
-                remote_id=resource.remote_id,
-                remote_object=alert_group,
+                if self.rules[name]
+                else None,
             )
-        else:
-            raise RuntimeError(f"Unexpected status: {response.status_code}")
+            for name in names
+        ]
+
+
+def plan_folder_changes(
+    index: NamespaceIndex,
+    to_create: Iterable[LocalResource[Alert]],
+    to_update: Iterable[SyncedResource[Alert]],
+    to_remove: Iterable[ObsoleteResource[Alert]],
+) -> FolderRuleGroups:
+    groups = FolderRuleGroups(index)
+    for obsolete in to_remove:
+        groups.remove(obsolete.remote_id)
+    for synced in to_update:
+        groups.put(synced.local_object, synced.remote_id)
+    for local in to_create:
+        groups.put(local.local_object, _existing_uid(index, local.local_object))
+    return groups
+
+
+def _existing_uid(index: NamespaceIndex, alert: Alert) -> Optional[str]:
+    """
+    Uid of a rule with the title of a created alert.
+    Optimistic writes of an interrupted run are recorded without uids,
+    so the next run creates them again; titles are unique within a folder,
+    so such rules are taken over instead
+    """
+    title = alert.grafana_alert.title
+    group = index.by_title.get(title)
+    if group is None:
+        return None
+    return next(
+        (
+            rule.grafana_alert.uid
+            for rule in group.rules or []
+            if rule.grafana_alert.title == title
+        ),
+        None,
+    )
+
+
+def read_written(
+    resources: Iterable[LocalResource[Alert]],
+    folder_title: str,
+    index: NamespaceIndex,
+) -> list[SyncedResource[Alert]]:
+    """
+    Resolve written alerts with uids assigned by Grafana.
+    Created alerts and alerts moved between groups are found by title
+    """
+    mapped = [
+        MappedResource.from_local(
+            resource,
+            resource.remote_id if isinstance(resource, MappedResource) else "",
+        )
+        for resource in resources
+    ]
+    return [
+        ensure_synced(resource)
+        for resource in resolve_from_namespace(mapped, folder_title, index)
+    ]
+
+
+def optimistic_results(
+    groups: FolderRuleGroups,
+    to_update: Iterable[SyncedResource[Alert]],
+) -> list[SyncedResource[Alert]]:
+    """
+    Results of updates, that kept their uids.
+    Alerts moved between groups are re-created, so, like created alerts,
+    they are left for a read
+    """
+    return [
+        SyncedResource.from_mapped(resource, resource.local_object)
+        for resource in to_update
+        if resource.remote_id in groups.group_by_uid
+    ]
 
-    def create(self, resource: LocalResource[AlertGroup]) -> SyncedResource[AlertGroup]:
-        response = self.client.post(
-            f"ruler/grafana/api/v1/rules/{resource.local_object.folder_name}",
-            json=resource.local_object.dict(),
+
+def folder_of(resource: ObsoleteResource[Alert]) -> str:
+    folder_title, _ = Alert.get_remote_identifier(resource.local_id).split("/", 1)
+    return folder_title
+
+
+class GroupedAlertHandler(AlertHandler):
+    """
+    Packs alerts of a folder with the same evaluation interval
+    into a shared rule group, instead of a group per alert.
+    Changes of a folder are written with a request per modified group,
+    see apply_folder
+    """
+
+    def read(
+        self, resource: MappedResource[Alert]
+    ) -> SyncedResource[Alert] | LocalResource[Alert]:
+        # a group is named after the interval, not the alert,
+        # so the alert is looked up among all groups of the folder
+        return self.read_many([resource])[0]
+
+    def apply_folder(
+        self,
+        folder_title: str,
+        to_create: Iterable[LocalResource[Alert]],
+        to_update: Iterable[SyncedResource[Alert]],
+        to_remove: Iterable[ObsoleteResource[Alert]],
+        read_back: bool = True,
+    ) -> list[SyncedResource[Alert]]:
+        """
+        Apply all changes of alerts in a folder:
+        read the folder once, write every modified group and read uids back
+
+        :param read_back: without it, only updated alerts, that kept their uids,
+            are returned, see optimistic_results
+        """
+        to_create = list(to_create)
+        to_update = list(to_update)
+
+        groups = plan_folder_changes(
+            self.read_namespace(folder_title), to_create, to_update, to_remove
+        )
+        for group_name, group in groups.writes():
+            if group is None:
+                response = self.request(
+                    "DELETE",
+                    GROUP_ENDPOINT,
+                    {"folder": folder_title, "group": group_name},
+                )
+                check_delete_response(response)
+            else:
+                response = self.request(
+                    "POST",
+                    NAMESPACE_ENDPOINT,
+                    {"folder": folder_title},
+                    data=group.wire_json(),
+                )
+                response.raise_for_status()
+
+        if not read_back:
+            return optimistic_results(groups, to_update)
+        if not (to_create or to_update):
+            return []
+        return read_written(
+            [*to_create, *to_update],
+            folder_title,
+            self.read_namespace(folder_title),
         )
-        response.raise_for_status()
 
-        json = response.json()
-        alert_group = AlertGroup(**json)
+    def create(self, resource: LocalResource[Alert]) -> SyncedResource[Alert]:
+        folder_title = resource.local_object.folder_title
+        return self.apply_folder(folder_title, [resource], [], [])[0]
+
+    def update(self, resource: SyncedResource[Alert]) -> SyncedResource[Alert]:
+        folder_title = resource.local_object.folder_title
+        return self.apply_folder(folder_title, [], [resource], [])[0]
+
+    def delete(self, resource: ObsoleteResource[Alert]) -> None:
+        self.apply_folder(folder_of(resource), [], [], [resource])
+
+
+class AsyncGroupedAlertHandler(AsyncAlertHandler):
+    async def read(
+        self, resource: MappedResource[Alert]
+    ) -> SyncedResource[Alert] | LocalResource[Alert]:
+        return (await self.read_many([resource]))[0]
+
+    async def apply_folder(
+        self,
+        folder_title: str,
+        to_create: Iterable[LocalResource[Alert]],
+        to_update: Iterable[SyncedResource[Alert]],
+        to_remove: Iterable[ObsoleteResource[Alert]],
+        read_back: bool = True,
+    ) -> list[SyncedResource[Alert]]:
+        to_create = list(to_create)
+        to_update = list(to_update)
 
-        return SyncedResource[AlertGroup](
-            local_object=resource.local_object,
-            remote_id=resource.local_id,
-            remote_object=alert_group,
+        groups = plan_folder_changes(
+            await self.read_namespace(folder_title), to_create, to_update, to_remove
         )
+        for group_name, group in groups.writes():
+            if group is None:
+                response = await self.request(
+                    "DELETE",
+                    GROUP_ENDPOINT,
+                    {"folder": folder_title, "group": group_name},
+                )
+                check_delete_response(response)
+            else:
+                response = await self.request(
+                    "POST",
+                    NAMESPACE_ENDPOINT,
+                    {"folder": folder_title},
+                    content=group.wire_json(),
+                )
+                response.raise_for_status()
+
+        if not read_back:
+            return optimistic_results(groups, to_update)
+        if not (to_create or to_update):
+            return []
+        return read_written(
+            [*to_create, *to_update],
+            folder_title,
+            await self.read_namespace(folder_title),
+        )
+
+    async def create(self, resource: LocalResource[Alert]) -> SyncedResource[Alert]:
+        folder_title = resource.local_object.folder_title
+        return (await self.apply_folder(folder_title, [resource], [], []))[0]
 
-    def update(
-        self, resource: SyncedResource[AlertGroup]
-    ) -> SyncedResource[AlertGroup]:
-        raise NotImplementedError()
+    async def update(self, resource: SyncedResource[Alert]) -> SyncedResource[Alert]:
+        folder_title = resource.local_object.folder_title
+        return (await self.apply_folder(folder_title, [], [resource], []))[0]
 
-    def delete(self, resource: ObsoleteResource[AlertGroup]) -> None:
-        raise NotImplementedError()
+    async def delete(self, resource: ObsoleteResource[Alert]) -> None:
+        await self.apply_folder(folder_of(resource), [], [], [resource])
@@ -1,3 +1,4 @@
 from .alert import Alert
 from .base import GrafanaObject
 from .folder import Folder
+from .template import AlertTemplate
@@ -1,11 +1,15 @@
+from typing import Collection
+
 from binds.grafana.client.alerting import (
     PostableExtendedRuleNode,
     PostableRuleGroupConfig,
 )
 from binds.grafana.client.types import Duration
+from controller.wire import wire_json
 from pydantic import Field
 
 from .base import GrafanaObject
+from .folder import Folder
 
 __all__ = [
     "Alert",
@@ -27,11 +31,23 @@ class AlertGroup(PostableRuleGroupConfig):
             **kwargs,
         )
 
+    def wire_json(self) -> bytes:
+        """
+        Compact request body, with the same content as json()
+        """
+        return wire_json(self, by_alias=True, exclude_none=True)
+
 
 class Alert(GrafanaObject, PostableExtendedRuleNode):
     """
     fixme: for a moment I will just generate a single alertGroup per alert
         The reason is that I can't persist in state UIDs of all alerts inside a group
+
+    Queries, time ranges, conditions, labels and annotations are interned:
+    they are shared by alerts with equal values, so they can not be modified
+    in place (TypeError is raised). Assign a changed copy instead, e.g.
+    `alert.labels = {**alert.labels, "team": "core"}` or
+    `query.copy(update={"model": model})`
     """
 
     folder_title: str = Field(...)
@@ -47,3 +63,7 @@ class Alert(GrafanaObject, PostableExtendedRuleNode):
     @property
     def local_id(self) -> str:
         return f"{self.folder_title}/{self.grafana_alert.title}"
+
+    @property
+    def dependencies(self) -> Collection[str]:
+        return (f"{Folder.__name__}.{self.folder_title}",)
@@ -1,3 +1,5 @@
+from typing import Any, ClassVar
+
 from abc import ABC
 
 from controller.obj import MonitoringObject
@@ -8,15 +10,7 @@ __all__ = [
 
 
 class GrafanaObject(MonitoringObject, ABC):
-    def json(
-        self,
-        *,
-        by_alias: bool = True,
-        models_as_dict: bool = False,
-        **kwargs,
-    ) -> str:
-        return super(GrafanaObject, self).json(
-            by_alias=by_alias,
-            models_as_dict=models_as_dict,
-            **kwargs,
-        )
+    _json_defaults: ClassVar[dict[str, Any]] = {
+        "by_alias": True,
+        "models_as_dict": False,
+    }
@@ -0,0 +1,165 @@
+from typing import Any, Iterator, Mapping, Optional, Type
+
+from itertools import product
+from string import Template
+
+from binds.grafana.client.alert_queries.queries import PrometheusQuery
+from binds.grafana.client.alerting import AlertQuery, PostableGrafanaRule
+from pydantic import BaseModel, ValidationError
+
+from .alert import Alert
+
+__all__ = [
+    "AlertTemplate",
+]
+
+
+def _validate_field(model: Type[BaseModel], name: str, value: Any) -> Any:
+    """
+    Validate a single field of a model, as if the model was created with it
+    """
+    field = model.__fields__[name]
+    value, errors = field.validate(value, {}, loc=field.alias, cls=model)
+    if errors:
+        raise ValidationError([errors], model)
+    return value
+
+
+def _substitute(
+    templates: Mapping[str, Template], params: Mapping[str, Any]
+) -> dict[str, str]:
+    return {key: template.substitute(params) for key, template in templates.items()}
+
+
+class AlertTemplate:
+    """
+    Variants of a reference alert, that differ in title, folder, labels,
+    annotations and parameters of a PromQL expression.
+
+    A variant is a shallow copy of the reference: unchanged sub-models
+    (queries, time ranges, conditions, ...) are shared with the reference
+    instead of being deep copied, and only changed fields are validated.
+    So neither variants nor the reference may be modified in place
+    """
+
+    def __init__(
+        self,
+        alert: Alert,
+        expr: Optional[str] = None,
+        ref_id: Optional[str] = None,
+    ):
+        """
+        :param expr: PromQL expression with string.Template placeholders,
+            e.g. `up{job="$job"} == 0`, substituted with parameters of variants.
+            Placeholders are used instead of str.format, as PromQL has braces
+        :param ref_id: refId of the prometheus query, which expression is
+            replaced; the first prometheus query by default
+        """
+        self.alert = alert
+        self.expr = Template(expr) if expr is not None else None
+        self._query_idx: Optional[int] = None
+
+        if expr is not None:
+            queries = [
+                idx
+                for idx, query in enumerate(alert.grafana_alert.data)
+                if isinstance(query.model, PrometheusQuery)
+                and ref_id in (None, query.refId)
+            ]
+            if not queries:
+                raise ValueError(
+                    f"Alert {alert.grafana_alert.title!r} has no prometheus query"
+                    + (f" with refId {ref_id!r}" if ref_id is not None else "")
+                )
+            self._query_idx = queries[0]
+
+    def _data(self, expr_params: Mapping[str, Any]) -> list[AlertQuery]:
+        if self.expr is None or self._query_idx is None:
+            raise ValueError("expr_params are given, but the template has no expr")
+
+        data = list(self.alert.grafana_alert.data)
+        query = data[self._query_idx]
+        model = query.model
+        expr = _validate_field(type(model), "expr", self.expr.substitute(expr_params))
+        data[self._query_idx] = query.copy(
+            update={"model": model.copy(update={"expr": expr})}
+        )
+        return data
+
+    def variant(
+        self,
+        *,
+        title: Optional[str] = None,
+        folder_title: Optional[str] = None,
+        labels: Optional[Mapping[str, str]] = None,
+        annotations: Optional[Mapping[str, str]] = None,
+        expr_params: Optional[Mapping[str, Any]] = None,
+    ) -> Alert:
+        """
+        :param labels: added to labels of the reference, replacing ones
+            with the same names; same for annotations
+        :param expr_params: values of placeholders of expr
+        """
+        alert = self.alert
+
+        rule_update: dict[str, Any] = {}
+        if title is not None:
+            rule_update["title"] = _validate_field(PostableGrafanaRule, "title", title)
+        if expr_params is not None:
+            rule_update["data"] = self._data(expr_params)
+
+        update: dict[str, Any] = {}
+        if rule_update:
+            update["grafana_alert"] = alert.grafana_alert.copy(update=rule_update)
+        if folder_title is not None:
+            update["folder_title"] = _validate_field(
+                Alert, "folder_title", folder_title
+            )
+        if labels is not None:
+            update["labels"] = _validate_field(
+                Alert, "labels", {**(alert.labels or {}), **labels}
+            )
+        if annotations is not None:
+            update["annotations"] = _validate_field(
+                Alert, "annotations", {**(alert.annotations or {}), **annotations}
+            )
+        return alert.copy(update=update)
+
+    def expand(
+        self,
+        matrix: Mapping[str, Any],
+        *,
+        title: str,
+        folder_title: Optional[str] = None,
+        labels: Optional[Mapping[str, str]] = None,
+        annotations: Optional[Mapping[str, str]] = None,
+    ) -> Iterator[Alert]:
+        """
+        Lazily yield a variant for every combination of parameters.
+        Title, folder title, values of labels and annotations, as well as expr,
+        are string.Template strings, substituted with the parameters
+
+        :param matrix: iterables of values by parameter name,
+            e.g. {"job": ["api", "db"], "env": ["prod", "stage"]}
+        """
+        title_template = Template(title)
+        folder_template = Template(folder_title) if folder_title is not None else None
+        label_templates = {k: Template(v) for k, v in (labels or {}).items()}
+        annotation_templates = {k: Template(v) for k, v in (annotations or {}).items()}
+
+        names = list(matrix)
+        for values in product(*(matrix[name] for name in names)):
+            params = dict(zip(names, values))
+            yield self.variant(
+                title=title_template.substitute(params),
+                folder_title=(
+                    folder_template.substitute(params)
+                    if folder_template is not None
+                    else None
+                ),
+                labels=_substitute(label_templates, params) if labels else None,
+                annotations=(
+                    _substitute(annotation_templates, params) if annotations else None
+                ),
+                expr_params=params if self.expr is not None else None,
+            )
@@ -0,0 +1,68 @@
+from typing import Optional
+
+from http import HTTPStatus as Status
+
+from controller.handler import HttpResponse
+from controller.throttle import (
+    AdaptiveLimiter,
+    AimdLimit,
+    AsyncAdaptiveLimiter,
+    AsyncThrottle,
+    BackoffPolicy,
+    Throttle,
+    is_overloaded,
+    is_rejected,
+)
+
+# Grafana on sqlite fails writes, that wait for the database lock too long
+LOCKED_DATABASE_MESSAGE = "database is locked"
+
+
+def is_database_locked(response: HttpResponse) -> bool:
+    return (
+        response.status_code == Status.INTERNAL_SERVER_ERROR
+        and LOCKED_DATABASE_MESSAGE in getattr(response, "text", "")
+    )
+
+
+def is_grafana_overloaded(response: HttpResponse) -> bool:
+    return is_overloaded(response) or is_database_locked(response)
+
+
+def is_grafana_rejected(response: HttpResponse) -> bool:
+    # the transaction of a write, that waited for the lock, is rolled back
+    return is_rejected(response) or is_database_locked(response)
+
+
+def grafana_throttle(
+    backoff: BackoffPolicy = BackoffPolicy(),
+    limit: Optional[AimdLimit] = None,
+) -> Throttle:
+    """
+    Throttle for GrafanaProvider, that also treats a locked database as overload
+
+    :param limit: adaptive limit of writes in flight, not limited without it.
+        Its maximum is only reached with as many max_workers
+    """
+    return Throttle(
+        backoff=backoff,
+        limiter=AdaptiveLimiter(limit) if limit is not None else None,
+        overloaded=is_grafana_overloaded,
+        rejected=is_grafana_rejected,
+    )
+
+
+def async_grafana_throttle(
+    backoff: BackoffPolicy = BackoffPolicy(),
+    limit: Optional[AimdLimit] = None,
+) -> AsyncThrottle:
+    """
+    grafana_throttle for AsyncGrafanaProvider,
+    the limit maximum is only reached with as much max_concurrency
+    """
+    return AsyncThrottle(
+        backoff=backoff,
+        limiter=AsyncAdaptiveLimiter(limit) if limit is not None else None,
+        overloaded=is_grafana_overloaded,
+        rejected=is_grafana_rejected,
+    )
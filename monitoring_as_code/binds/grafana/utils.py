@@ -1,35 +1,29 @@
-from typing import Iterable, TypeVar
-
-from collections import defaultdict
+from typing import TypeVar
 
 from controller.exceptions import UnknownResourceHandlerException
 from controller.obj import MonitoringObject
-from controller.resource import LocalResource, ObsoleteResource, Resource
+from controller.resource import Resource
 
 R = TypeVar("R", bound=Resource[MonitoringObject])
 T = TypeVar("T")
 
 
-# fixme: подозрительно похожа на _group_resources_by_provider, мб генерализировать
 def group_resources(
-    resources: Iterable[R],
+    grouped_by_name: dict[str, list[R]],
     type_names_to_types: dict[str, type[MonitoringObject]],
 ) -> dict[type[MonitoringObject], list[R]]:
-    grouped_resources: dict[type[MonitoringObject], list[R]] = defaultdict(list)
+    """
+    :param grouped_by_name: resources by name of their object type
+    """
+    grouped_resources: dict[type[MonitoringObject], list[R]] = {}
     unhandled_resources: list[R] = []
 
-    for resource in resources:
-        match resource:
-            case LocalResource(local_object=local_obj):
-                obj_type = type(local_obj)
-            case ObsoleteResource(local_id=local_id):
-                obj_type_name = local_id.split(".", maxsplit=1)[0]
-                obj_type = type_names_to_types.get(obj_type_name, None)
-
+    for type_name, resources in grouped_by_name.items():
+        obj_type = type_names_to_types.get(type_name, None)
         if obj_type:
-            grouped_resources[obj_type].append(resource)
+            grouped_resources[obj_type] = resources
         else:
-            unhandled_resources.append(resource)
+            unhandled_resources.extend(resources)
 
     if unhandled_resources:
         raise UnknownResourceHandlerException(unhandled_resources)
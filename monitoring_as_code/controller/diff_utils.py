@@ -1,9 +1,11 @@
 import typing
-from typing import Iterable, Optional, TypeVar, Union
+from typing import Any, Iterable, Iterator, Mapping, Optional, TypeVar, Union
 
 from difflib import unified_diff
+from functools import cached_property
 
 from loguru import logger
+from pydantic import BaseModel
 
 from .obj import MonitoringObject
 
@@ -12,37 +14,202 @@ if typing.TYPE_CHECKING:
 
 
 RESOURCE_DIFF = Iterable[str]
+EXCLUDE_SPEC = Union["AbstractSetIntStr", "MappingIntStrAny", None]
 T = TypeVar("T", bound=MonitoringObject)
 
+# path reported when one of the compared objects is missing entirely
+ROOT_PATH = "<object>"
+
 
 def print_diff(diff_header: str, calculated_diff: RESOURCE_DIFF) -> None:
     # todo: add coloring for added, deleted or whatever
-    # todo: invalid logging
-    logger.info(diff_header + "\n" + "\n".join(calculated_diff))
+    # The text is built only if the message passes the logging level
+    logger.opt(lazy=True).info(
+        "{}", lambda: diff_header + "\n" + "\n".join(calculated_diff)
+    )
 
 
-def calculate_diff(
+def _nested_exclude(exclude: EXCLUDE_SPEC, key: int | str) -> tuple[bool, EXCLUDE_SPEC]:
+    """
+    Resolve pydantic-like exclude spec for a nested key
+
+    :return: whether the key is excluded entirely and the spec for its value
+    """
+    if not exclude:
+        return False, None
+
+    if not isinstance(exclude, Mapping):
+        return key in exclude, None
+
+    nested = exclude.get(key, exclude.get("__all__"))
+    if nested is None:
+        return False, None
+    if nested is True or nested is ...:
+        return True, None
+    return False, nested
+
+
+def _join_path(path: str, key: int | str) -> str:
+    if isinstance(key, int):
+        return f"{path}[{key}]"
+    return f"{path}.{key}" if path else key
+
+
+def _iter_value_differences(
+    original: Any,
+    changed: Any,
+    exclude: EXCLUDE_SPEC,
+    path: str,
+) -> Iterator[str]:
+    if original is changed:
+        return
+
+    if isinstance(original, BaseModel) and isinstance(changed, BaseModel):
+        fields: Iterable[str] = original.__fields__.keys()
+        if type(original) is not type(changed):
+            fields = sorted(fields | changed.__fields__.keys())
+
+        for field in fields:
+            excluded, nested_exclude = _nested_exclude(exclude, field)
+            if excluded:
+                continue
+            yield from _iter_value_differences(
+                getattr(original, field, None),
+                getattr(changed, field, None),
+                nested_exclude,
+                _join_path(path, field),
+            )
+    elif isinstance(original, Mapping) and isinstance(changed, Mapping):
+        keys = list(original.keys())
+        keys.extend(key for key in changed.keys() if key not in original)
+
+        for key in keys:
+            excluded, nested_exclude = _nested_exclude(exclude, key)
+            if excluded:
+                continue
+            if key not in original or key not in changed:
+                yield _join_path(path, key)
+                continue
+            yield from _iter_value_differences(
+                original[key],
+                changed[key],
+                nested_exclude,
+                _join_path(path, key),
+            )
+    elif isinstance(original, list | tuple) and isinstance(changed, list | tuple):
+        for idx in range(max(len(original), len(changed))):
+            excluded, nested_exclude = _nested_exclude(exclude, idx)
+            if excluded:
+                continue
+            if idx >= len(original) or idx >= len(changed):
+                yield _join_path(path, idx)
+                continue
+            yield from _iter_value_differences(
+                original[idx],
+                changed[idx],
+                nested_exclude,
+                _join_path(path, idx),
+            )
+    elif original != changed:
+        yield path or ROOT_PATH
+
+
+def find_differences(
     original: Optional[T],
     changed: Optional[T],
-    exclude: Union["AbstractSetIntStr", "MappingIntStrAny"] = None,
-) -> RESOURCE_DIFF:
-    exclude = exclude or dict()
+    exclude: EXCLUDE_SPEC = None,
+) -> Iterator[str]:
+    """
+    Lazily walk both objects and yield paths of fields that differ,
+    e.g. `grafana_alert.data[0].model.expr`.
+    `exclude` follows the pydantic `exclude` format
+    """
+    if original is None or changed is None:
+        if original is not changed:
+            yield ROOT_PATH
+        return
+    if original is changed or (
+        original.frozen and changed.frozen and original == changed
+    ):
+        # equal content has no differences under any exclude
+        return
 
-    original_lines: list[str] = (
-        original.json(exclude=exclude).splitlines() if original else []
-    )
-    changed_lines: list[str] = (
-        changed.json(exclude=exclude).splitlines() if changed else []
-    )
+    yield from _iter_value_differences(original, changed, exclude, "")
+
+
+def has_differences(
+    original: Optional[T],
+    changed: Optional[T],
+    exclude: EXCLUDE_SPEC = None,
+) -> bool:
+    """
+    Stops on the first difference, so it is as cheap as an equality check
+    """
+    return next(find_differences(original, changed, exclude), None) is not None
+
+
+def _json_lines(obj: Optional[T], exclude: EXCLUDE_SPEC) -> list[str]:
+    if obj is None:
+        return []
+    # canonical json of frozen objects is cached
+    return (obj.json(exclude=exclude) if exclude else obj.json()).splitlines()
+
+
+class ResourceDiff:
+    """
+    Difference between two versions of an object.
+    Truthiness is a cheap structural check, the classic text diff is rendered
+    only when lines are iterated
+
+    see: https://docs.python.org/3/library/difflib.html#difflib.unified_diff
+    """
+
+    def __init__(
+        self,
+        original: Optional[T],
+        changed: Optional[T],
+        exclude: EXCLUDE_SPEC = None,
+    ):
+        self.original = original
+        self.changed = changed
+        self.exclude = exclude
+
+    @cached_property
+    def has_changes(self) -> bool:
+        return has_differences(self.original, self.changed, self.exclude)
+
+    @cached_property
+    def changed_paths(self) -> list[str]:
+        return list(find_differences(self.original, self.changed, self.exclude))
 
-    diff = list(
-        unified_diff(
-            original_lines,
-            changed_lines,
-            fromfile="before",
-            tofile="after",
-            lineterm="",
+    @cached_property
+    def lines(self) -> list[str]:
+        if not self.has_changes:
+            return []
+
+        original_lines = _json_lines(self.original, self.exclude)
+        changed_lines = _json_lines(self.changed, self.exclude)
+
+        return list(
+            unified_diff(
+                original_lines,
+                changed_lines,
+                fromfile="before",
+                tofile="after",
+                lineterm="",
+            )
         )
-    )
 
-    return diff
+    def __bool__(self) -> bool:
+        return self.has_changes
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.lines)
+
+
+def calculate_diff(
+    original: Optional[T],
+    changed: Optional[T],
+    exclude: EXCLUDE_SPEC = None,
+) -> ResourceDiff:
+    return ResourceDiff(original, changed, exclude)
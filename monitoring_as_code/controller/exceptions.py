@@ -2,7 +2,6 @@ from typing import Iterable
 
 from .obj import MonitoringObject
 from .resource import Resource
-from .utils import get_resource_object_type_name
 
 
 class MonitorException(Exception):
@@ -12,20 +11,20 @@ class MonitorException(Exception):
 
 
 class UnknownResourceProviderException(MonitorException):
-    def __init__(self, resources: list[Resource]) -> None:
+    def __init__(self, resources: Iterable[Resource[MonitoringObject]]) -> None:
         message = (
             "No provider is registered for the following object types: {types}".format(
-                types={get_resource_object_type_name(r) for r in resources}
+                types={r.object_type_name for r in resources}
             )
         )
         super().__init__(message)
 
 
 class UnknownResourceHandlerException(MonitorException):
-    def __init__(self, resources: list[Resource]) -> None:
+    def __init__(self, resources: Iterable[Resource[MonitoringObject]]) -> None:
         message = (
             "No handler is registered for the following object types: {types}".format(
-                types={get_resource_object_type_name(r) for r in resources}
+                types={r.object_type_name for r in resources}
             )
         )
         super().__init__(message)
@@ -37,7 +36,32 @@ class DuplicatedProviderException(MonitorException):
         super(DuplicatedProviderException, self).__init__(message)
 
 
+class DuplicatedResourceException(MonitorException):
+    def __init__(self, local_ids: Iterable[str]) -> None:
+        message = "Multiple objects have the same local id: {ids}".format(
+            ids=sorted(set(local_ids))
+        )
+        super(DuplicatedResourceException, self).__init__(message)
+
+
+class AsyncProviderInSyncRunException(MonitorException):
+    def __init__(self) -> None:
+        message = (
+            "Some registered providers are asynchronous, "
+            "use Monitor.apply_monitoring_state_async to run them"
+        )
+        super(AsyncProviderInSyncRunException, self).__init__(message)
+
+
 class UnexpectedResourceStateException(MonitorException):
     def __init__(self, resources: Iterable[Resource[MonitoringObject]]) -> None:
         message = f"Some resources ended up in an unexpected state: {resources}"
         super(UnexpectedResourceStateException, self).__init__(message)
+
+
+class DependencyCycleException(MonitorException):
+    def __init__(self, cycle: Iterable[object]) -> None:
+        message = "Objects depend on each other in a cycle: {cycle}".format(
+            cycle=" -> ".join(str(node) for node in cycle)
+        )
+        super(DependencyCycleException, self).__init__(message)
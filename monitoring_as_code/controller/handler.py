@@ -1,15 +1,38 @@
-from typing import Generic, TypeVar
+import typing
+from typing import Any, Generic, Iterable, Mapping, Optional, Protocol, TypeVar
 
 from abc import ABC, abstractmethod
+from time import perf_counter
 
-from requests import Session
+from requests import Response, Session
 
+from .http_stats import HttpStats
 from .obj import MonitoringObject
 from .resource import LocalResource, MappedResource, ObsoleteResource, SyncedResource
 
+if typing.TYPE_CHECKING:
+    from httpx import AsyncClient
+    from httpx import Response as AsyncResponse
+
+    from .throttle import AsyncThrottle, Throttle
+
 T = TypeVar("T", bound=MonitoringObject)
 
 
+class HttpResponse(Protocol):
+    """
+    Common part of requests and httpx responses that handlers rely on
+    """
+
+    status_code: int
+
+    def json(self) -> Any:
+        ...
+
+    def raise_for_status(self) -> Any:
+        ...
+
+
 class ResourceHandler(Generic[T], ABC):
     @abstractmethod
     def read(
@@ -39,7 +62,138 @@ class ResourceHandler(Generic[T], ABC):
     ) -> None:
         pass
 
+    def read_many(
+        self,
+        resources: Iterable[MappedResource[T]],
+    ) -> list[SyncedResource[T] | LocalResource[T]]:
+        """
+        Read several resources at once.
+        Handlers that can fetch remote objects in bulk should override it
+        """
+        return [self.read(resource) for resource in resources]
+
 
 class HttpApiResourceHandler(ResourceHandler[T], ABC):
-    def __init__(self, client: Session):
+    def __init__(
+        self,
+        client: Session,
+        stats: Optional[HttpStats] = None,
+        throttle: Optional["Throttle"] = None,
+    ):
         self.client = client
+        self.stats = stats if stats is not None else HttpStats()
+        self.throttle = throttle
+
+    def request(
+        self,
+        method: str,
+        endpoint: str,
+        path: Optional[Mapping[str, str]] = None,
+        **kwargs: Any,
+    ) -> Response:
+        """
+        Make a request, recording it in stats by the endpoint template.
+        With a throttle, overloaded requests are retried,
+        every attempt is recorded
+
+        :param endpoint: url template, e.g. `folders/{uid}`
+        :param path: values of the template placeholders
+        :param kwargs: passed to the client as is
+        """
+        url = endpoint.format_map(path or {})
+
+        def send() -> Response:
+            started_at = perf_counter()
+            try:
+                response = self.client.request(method, url, **kwargs)
+            except Exception:
+                self.stats.record_error(method, endpoint, perf_counter() - started_at)
+                raise
+            self.stats.record(method, endpoint, response, perf_counter() - started_at)
+            return response
+
+        if self.throttle is None:
+            return send()
+        return self.throttle.send(method, send)
+
+
+class AsyncResourceHandler(Generic[T], ABC):
+    """
+    Asyncio counterpart of ResourceHandler
+    """
+
+    @abstractmethod
+    async def read(
+        self,
+        resource: MappedResource[T],
+    ) -> SyncedResource[T] | LocalResource[T]:
+        pass
+
+    @abstractmethod
+    async def create(
+        self,
+        resource: LocalResource[T],
+    ) -> SyncedResource[T]:
+        pass
+
+    @abstractmethod
+    async def update(
+        self,
+        resource: SyncedResource[T],
+    ) -> SyncedResource[T]:
+        pass
+
+    @abstractmethod
+    async def delete(
+        self,
+        resource: ObsoleteResource[T],
+    ) -> None:
+        pass
+
+    async def read_many(
+        self,
+        resources: Iterable[MappedResource[T]],
+    ) -> list[SyncedResource[T] | LocalResource[T]]:
+        """
+        Read several resources at once.
+        Handlers that can fetch remote objects in bulk should override it
+        """
+        return [await self.read(resource) for resource in resources]
+
+
+class AsyncHttpApiResourceHandler(AsyncResourceHandler[T], ABC):
+    def __init__(
+        self,
+        client: "AsyncClient",
+        stats: Optional[HttpStats] = None,
+        throttle: Optional["AsyncThrottle"] = None,
+    ):
+        self.client = client
+        self.stats = stats if stats is not None else HttpStats()
+        self.throttle = throttle
+
+    async def request(
+        self,
+        method: str,
+        endpoint: str,
+        path: Optional[Mapping[str, str]] = None,
+        **kwargs: Any,
+    ) -> "AsyncResponse":
+        """
+        Same as HttpApiResourceHandler.request
+        """
+        url = endpoint.format_map(path or {})
+
+        async def send() -> "AsyncResponse":
+            started_at = perf_counter()
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except Exception:
+                self.stats.record_error(method, endpoint, perf_counter() - started_at)
+                raise
+            self.stats.record(method, endpoint, response, perf_counter() - started_at)
+            return response
+
+        if self.throttle is None:
+            return await send()
+        return await self.throttle.send(method, send)
@@ -0,0 +1,189 @@
+from typing import Any, Counter, Iterator, Optional
+
+import bisect
+import threading
+from dataclasses import dataclass, field
+
+# upper bounds of latency histogram buckets, seconds; the last bucket is unbounded
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _body_size(body: Any) -> int:
+    if isinstance(body, str):
+        return len(body.encode())
+    if isinstance(body, bytes | bytearray):
+        return len(body)
+    # no body or a stream of unknown length
+    return 0
+
+
+def request_size(response: Any) -> int:
+    """
+    Size of the request body, that got the response.
+    requests keeps it in `body`, httpx in `content`
+    """
+    request = response.request
+    body = getattr(request, "body", None)
+    if body is None:
+        try:
+            body = request.content
+        except Exception:  # not read stream
+            return 0
+    return _body_size(body)
+
+
+def response_size(response: Any) -> int:
+    """
+    Size of the response body as it was received, i.e. before decompression.
+    httpx counts downloaded bytes, requests exposes the raw urllib3 response;
+    Content-Length and the decoded content are fallbacks
+    """
+    downloaded = getattr(response, "num_bytes_downloaded", None)
+    if isinstance(downloaded, int) and downloaded > 0:
+        return downloaded
+
+    try:
+        read = response.raw.tell()
+    except Exception:  # no raw response, e.g. a mocked one
+        read = None
+    if isinstance(read, int) and read > 0:
+        return read
+
+    length = getattr(response, "headers", {}).get("Content-Length")
+    if length is not None and length.isdigit():
+        return int(length)
+    return len(response.content)
+
+
+def server_time(response: Any) -> Optional[float]:
+    """
+    Time from sending the request until the response arrived,
+    as measured by the http client
+    """
+    try:
+        return response.elapsed.total_seconds()
+    except Exception:  # httpx sets it only after the response is closed
+        return None
+
+
+def _format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GiB"
+
+
+@dataclass
+class EndpointStats:
+    """
+    Requests to an endpoint template.
+    `latency` is measured around the client call, so it includes
+    client side overhead (e.g. serialization and connection pool waits)
+    on top of `server_time` reported by the client
+    """
+
+    count: int = 0
+    # requests, that failed without a response
+    errors: int = 0
+    status_codes: Counter[int] = field(default_factory=Counter)
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+    # count of requests in every LATENCY_BUCKETS bucket, not cumulative
+    latency_buckets: list[int] = field(
+        default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1)
+    )
+    server_time_total: float = 0.0
+    bytes_sent: int = 0
+    # response bodies as transferred, compressed ones are not decoded
+    bytes_received: int = 0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.latency_total / self.count if self.count else 0.0
+
+    @property
+    def mean_server_time(self) -> float:
+        return self.server_time_total / self.count if self.count else 0.0
+
+    def add_latency(self, latency: float) -> None:
+        self.count += 1
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+        self.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    def summary(self) -> str:
+        statuses = ", ".join(
+            f"{status}x{count}" for status, count in sorted(self.status_codes.items())
+        )
+        if self.errors:
+            statuses += f", errors x{self.errors}"
+        return (
+            f"{self.count} calls ({statuses}), "
+            f"mean {self.mean_latency * 1000:.1f}ms "
+            f"(server {self.mean_server_time * 1000:.1f}ms), "
+            f"max {self.latency_max * 1000:.1f}ms, "
+            f"sent {_format_bytes(self.bytes_sent)}, "
+            f"received {_format_bytes(self.bytes_received)}"
+        )
+
+
+class HttpStats:
+    """
+    Thread safe stats of http requests by method and endpoint template,
+    e.g. `GET ruler/grafana/api/v1/rules/{folder}`
+    """
+
+    def __init__(self) -> None:
+        self.endpoints: dict[str, EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def _endpoint(self, method: str, endpoint: str) -> EndpointStats:
+        key = f"{method.upper()} {endpoint}"
+        stats = self.endpoints.get(key)
+        if stats is None:
+            stats = self.endpoints[key] = EndpointStats()
+        return stats
+
+    def record(
+        self,
+        method: str,
+        endpoint: str,
+        response: Any,
+        latency: float,
+    ) -> None:
+        sent = request_size(response)
+        received = response_size(response)
+        elapsed = server_time(response)
+
+        with self._lock:
+            stats = self._endpoint(method, endpoint)
+            stats.add_latency(latency)
+            stats.status_codes[response.status_code] += 1
+            stats.server_time_total += latency if elapsed is None else elapsed
+            stats.bytes_sent += sent
+            stats.bytes_received += received
+
+    def record_error(self, method: str, endpoint: str, latency: float) -> None:
+        with self._lock:
+            stats = self._endpoint(method, endpoint)
+            stats.add_latency(latency)
+            stats.errors += 1
+
+    def take(self) -> "HttpStats":
+        """
+        Move recorded stats to a new object, e.g. at the end of a run
+        """
+        taken = HttpStats()
+        with self._lock:
+            taken.endpoints, self.endpoints = self.endpoints, {}
+        return taken
+
+    def __bool__(self) -> bool:
+        return bool(self.endpoints)
+
+    def __iter__(self) -> Iterator[tuple[str, EndpointStats]]:
+        return iter(sorted(self.endpoints.items()))
+
+    def summary(self) -> str:
+        return "\n".join(f"{endpoint}: {stats.summary()}" for endpoint, stats in self)
@@ -0,0 +1,151 @@
+from typing import Any, Collection, Iterable, NamedTuple, Optional, TypeVar
+
+from collections import defaultdict
+
+from .exceptions import DuplicatedResourceException, UnknownResourceProviderException
+from .obj import MonitoringObject
+from .provider import ANY_PROVIDER
+from .resource import IdType, LocalResource, ObsoleteResource, Resource
+from .state import State
+
+RS = TypeVar("RS", bound=Resource[Any])
+
+GROUPED_RESOURCES = dict[
+    ANY_PROVIDER[MonitoringObject], list[Resource[MonitoringObject]]
+]
+
+
+class IndexEntry(NamedTuple):
+    object_type: str
+    provider: ANY_PROVIDER[MonitoringObject]
+    # None for resources, that are not tracked in the state
+    remote_id: Optional[IdType]
+
+
+class ResourceIndex:
+    """
+    Identity of every resource of a run by local id: its object type, provider
+    and remote id in the state. It is filled in a single pass over monitoring
+    objects, and later phases look resources up instead of deriving that again.
+    Objects with the same local id are rejected while indexing
+    """
+
+    def __init__(self, providers: dict[str, ANY_PROVIDER[MonitoringObject]]):
+        """
+        :param providers: providers by name of object type
+        """
+        self._providers = providers
+        self._entries: dict[IdType, IndexEntry] = {}
+        # objects frozen by add_objects, to thaw them after the run
+        self._frozen_objects: list[MonitoringObject] = []
+
+    def __contains__(self, local_id: IdType) -> bool:
+        return local_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def local_ids(self) -> Collection[IdType]:
+        return self._entries.keys()
+
+    def __getitem__(self, local_id: IdType) -> IndexEntry:
+        return self._entries[local_id]
+
+    def add_objects(
+        self, state: State, monitoring_objects: Iterable[MonitoringObject]
+    ) -> list[LocalResource[MonitoringObject]]:
+        """
+        Index objects along with their remote ids in the state.
+        Objects are frozen until thaw_objects is called at the end of the run,
+        so their json and content hash are computed once per run
+        :return: local resources of untracked objects, then mapped ones
+        """
+        resources: list[LocalResource[MonitoringObject]] = []
+        duplicated: list[IdType] = []
+        unknown: list[LocalResource[MonitoringObject]] = []
+
+        for obj in monitoring_objects:
+            if not obj.frozen:
+                self._frozen_objects.append(obj.freeze())
+            resource = LocalResource(local_object=obj)
+            local_id = resource.local_id
+            if local_id in self._entries:
+                duplicated.append(local_id)
+                continue
+
+            object_type = resource.object_type_name
+            provider = self._providers.get(object_type)
+            if provider is None:
+                unknown.append(resource)
+                continue
+
+            self._entries[local_id] = IndexEntry(object_type, provider, None)
+            resources.append(resource)
+
+        if duplicated:
+            raise DuplicatedResourceException(duplicated)
+        if unknown:
+            raise UnknownResourceProviderException(unknown)
+
+        local_resources, mapped_resources = state.fill_provider_id(resources)
+        for mapped in mapped_resources:
+            entry = self._entries[mapped.local_id]
+            self._entries[mapped.local_id] = entry._replace(remote_id=mapped.remote_id)
+        return [*local_resources, *mapped_resources]
+
+    def thaw_objects(self) -> None:
+        """
+        Leave objects frozen by add_objects mutable again, with no cached content
+        """
+        for obj in self._frozen_objects:
+            obj.thaw()
+        self._frozen_objects.clear()
+
+    def add_untracked(self, state: State) -> list[ObsoleteResource[MonitoringObject]]:
+        """
+        Index resources of the state, that are not among indexed objects
+        """
+        untracked = state.get_untracked_resources_by_ids(self.local_ids)
+        unknown: list[ObsoleteResource[MonitoringObject]] = []
+
+        for resource in untracked:
+            object_type = resource.object_type_name
+            provider = self._providers.get(object_type)
+            if provider is None:
+                unknown.append(resource)
+                continue
+            self._entries[resource.local_id] = IndexEntry(
+                object_type, provider, resource.remote_id
+            )
+
+        if unknown:
+            raise UnknownResourceProviderException(unknown)
+        return untracked
+
+    def provider_of(self, local_id: IdType) -> Optional[ANY_PROVIDER[MonitoringObject]]:
+        """
+        Provider of any local id, including ones that are not indexed
+        (e.g. dependencies on objects of other chunks)
+        """
+        entry = self._entries.get(local_id)
+        if entry is not None:
+            return entry.provider
+        return self._providers.get(local_id.split(".", maxsplit=1)[0])
+
+    def group_by_provider(
+        self, resources: Iterable[Resource[MonitoringObject]]
+    ) -> GROUPED_RESOURCES:
+        grouped: GROUPED_RESOURCES = defaultdict(list)
+        for resource in resources:
+            grouped[self._entries[resource.local_id].provider].append(resource)
+        return grouped
+
+    def group_by_type(self, resources: Iterable[RS]) -> dict[str, list[RS]]:
+        """
+        Indexed resources grouped by name of their object type
+        """
+        grouped: dict[str, list[RS]] = defaultdict(list)
+        for resource in resources:
+            grouped[self._entries[resource.local_id].object_type].append(resource)
+        return grouped
@@ -1,13 +1,31 @@
-from typing import Dict, Iterable, Type, TypeVar, cast
+from typing import Dict, Iterable, Iterator, Optional, Type, TypeVar, cast
 
+import asyncio
 from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+from functools import partial
+from time import perf_counter
 
 from loguru import logger
 
 from .diff_utils import calculate_diff, print_diff
-from .exceptions import DuplicatedProviderException, UnknownResourceProviderException
+from .exceptions import AsyncProviderInSyncRunException, DuplicatedProviderException
+from .index import GROUPED_RESOURCES, ResourceIndex
 from .obj import MonitoringObject
-from .provider import Provider
+from .provider import ANY_PROVIDER, AsyncProvider, Provider
+from .report import (
+    APPLY,
+    DIFF,
+    PREPARE,
+    STATE_LOAD,
+    STATE_SAVE,
+    STATE_UPDATE,
+    SYNC,
+    TOTAL,
+    ProviderReport,
+    RunReport,
+)
 from .resource import (
     LocalResource,
     MappedResource,
@@ -16,7 +34,9 @@ from .resource import (
     ResourceOps,
     SyncedResource,
 )
+from .scheduler import run_graph, run_graph_async
 from .state import State
+from .utils import get_resource_object_type_name, iter_chunks
 
 T = TypeVar("T", bound=MonitoringObject)
 RESOURCE_ACTION_MAPPING = dict[Resource[T], ResourceOps]
@@ -25,19 +45,19 @@ RESOURCE_ACTION_MAPPING = dict[Resource[T], ResourceOps]
 class Monitor:
     def __init__(
         self,
-        providers: list[Provider[MonitoringObject]],
+        providers: list[ANY_PROVIDER[MonitoringObject]],
         state: State,
     ):
         self._state = state
         self._resource_provider_map: Dict[
-            Type[MonitoringObject], Provider[MonitoringObject]
+            Type[MonitoringObject], ANY_PROVIDER[MonitoringObject]
         ] = {}
-        self._resource_name_provider_map: Dict[str, Provider[MonitoringObject]] = {}
-        self._providers: list[Provider[MonitoringObject]] = []
+        self._resource_name_provider_map: Dict[str, ANY_PROVIDER[MonitoringObject]] = {}
+        self._providers: list[ANY_PROVIDER[MonitoringObject]] = []
 
         self._register_providers(*providers)
 
-    def _register_providers(self, *providers: Provider[MonitoringObject]) -> None:
+    def _register_providers(self, *providers: ANY_PROVIDER[MonitoringObject]) -> None:
         # todo: собрать все ошибки и показать их разом
         for provider in providers:
             for operating_object_type in provider.operating_objects:
@@ -48,102 +68,383 @@ class Monitor:
                 self._resource_name_provider_map[
                     operating_object_type.__name__
                 ] = provider
-                self._providers.append(provider)
+            self._providers.append(provider)
 
-    def _group_resources_by_provider(
-        self,
-        resources: Iterable[Resource[MonitoringObject]],
-    ) -> dict[Provider[MonitoringObject], list[Resource[MonitoringObject]]]:
-        resources_by_provider: dict[
-            Provider[MonitoringObject], list[Resource[MonitoringObject]]
-        ] = defaultdict(list)
-        unhandled_resources: list[Resource[MonitoringObject]] = []
-
-        for resource in resources:
-            # todo: check if mypy finds pattern matching exhaustive
-            # Since Resource class is ABC, this two cases cover everything
-            match resource:
-                case LocalResource(local_object=local_obj):
-                    provider = self._resource_provider_map.get(type(local_obj), None)
-                case ObsoleteResource(local_id=local_id):
-                    class_name = local_id.split(".", maxsplit=1)[0]
-                    provider = self._resource_name_provider_map.get(class_name, None)
-
-            if provider:
-                resources_by_provider[provider].append(resource)
+    @staticmethod
+    def _provider_dependencies(
+        index: ResourceIndex,
+        grouped_resources: GROUPED_RESOURCES,
+    ) -> dict[ANY_PROVIDER[MonitoringObject], set[ANY_PROVIDER[MonitoringObject]]]:
+        """
+        A provider depends on another one,
+        if any of its objects depends on an object of the other provider
+        """
+        dependencies: dict[
+            ANY_PROVIDER[MonitoringObject], set[ANY_PROVIDER[MonitoringObject]]
+        ] = defaultdict(set)
+
+        for provider, resources in grouped_resources.items():
+            for resource in resources:
+                if not isinstance(resource, LocalResource):
+                    continue
+                for dependency_id in resource.local_object.dependencies:
+                    dependency_provider = index.provider_of(dependency_id)
+                    if dependency_provider not in (None, provider):
+                        dependencies[provider].add(dependency_provider)
+
+        return dependencies
+
+    @staticmethod
+    def _split_resources_to_sync(
+        state: State,
+        resources: Iterable[Resource[T]],
+        fast_plan: bool,
+    ) -> tuple[
+        list[MappedResource[T]],
+        list[ObsoleteResource[T] | SyncedResource[T] | LocalResource[T]],
+    ]:
+        mapped_resources: list[MappedResource[T]] = []
+        processed_resources: list[
+            ObsoleteResource[T] | SyncedResource[T] | LocalResource[T]
+        ] = []
+
+        for r in resources:
+            if isinstance(r, MappedResource):
+                mapped_resources.append(r)
             else:
-                unhandled_resources.append(resource)
+                processed_resources.append(r)
+
+        if fast_plan:
+            mapped_resources, unchanged_resources = state.filter_unchanged(
+                mapped_resources
+            )
+            logger.debug(
+                f"Fast plan: skip reading {len(unchanged_resources)} "
+                f"resources unchanged since the last apply"
+            )
+            processed_resources.extend(unchanged_resources)
+
+        return mapped_resources, processed_resources
+
+    def _iter_resource_batches(
+        self,
+        state: State,
+        index: ResourceIndex,
+        monitoring_objects: Iterable[MonitoringObject],
+        chunk_size: Optional[int],
+        report: RunReport,
+    ) -> Iterator[GROUPED_RESOURCES]:
+        """
+        Yield resources grouped by provider, batch after batch.
+        Without chunk_size everything, including untracked resources,
+        is a single batch. Otherwise, objects are consumed chunk by chunk and
+        untracked resources come last, found by local ids in the index.
+        Batches are built lazily, so state updates of previous batches are visible.
+        Indexed objects are frozen while their batch is applied
+        """
+        if chunk_size is None:
+            with report.measure(PREPARE):
+                resources: list[Resource[MonitoringObject]] = [
+                    *index.add_objects(state, monitoring_objects),
+                    *index.add_untracked(state),
+                ]
+                grouped_resources = index.group_by_provider(resources)
+            yield grouped_resources
+            return
+
+        for chunk in iter_chunks(monitoring_objects, chunk_size):
+            with report.measure(PREPARE):
+                grouped_resources = index.group_by_provider(
+                    index.add_objects(state, chunk)
+                )
+            yield grouped_resources
+            # objects of an applied chunk are not kept frozen till the end of the run
+            index.thaw_objects()
 
-        if unhandled_resources:
-            raise UnknownResourceProviderException(unhandled_resources)
+        with report.measure(PREPARE):
+            grouped_resources = index.group_by_provider(index.add_untracked(state))
+        yield grouped_resources
 
-        return resources_by_provider
+    @contextmanager
+    def _open_state(self, report: RunReport, read_only: bool) -> Iterator[State]:
+        """
+        Same as `with self._state as state`, timing state load and save
+        :param read_only: do not save the state, e.g. for a dry run
+        """
+        self._state.read_only = read_only
+        try:
+            with report.measure(STATE_LOAD):
+                state = self._state.__enter__()
+            try:
+                yield state
+            except BaseException as exc:
+                with report.measure(STATE_SAVE):
+                    self._state.__exit__(type(exc), exc, exc.__traceback__)
+                raise
+            with report.measure(STATE_SAVE):
+                self._state.__exit__(None, None, None)
+        finally:
+            self._state.read_only = False
 
     def apply_monitoring_state(
         self,
-        monitoring_objects: list[MonitoringObject],
+        monitoring_objects: Iterable[MonitoringObject],
         dry_run: bool = True,
+        fast_plan: bool = False,
+        full_verify_interval: Optional[timedelta] = None,
+        chunk_size: Optional[int] = None,
+        report: Optional[RunReport] = None,
+    ) -> RunReport:
+        """
+        :param fast_plan: do not read remote objects for resources,
+            which local objects did not change since the last successful apply.
+            Changes made to such remote objects outside of the monitor are not
+            detected
+        :param full_verify_interval: ignore fast_plan, if the last full comparison
+            with remote objects happened longer than that ago
+        :param chunk_size: stream monitoring_objects (e.g. from a generator) and
+            sync, diff and apply them in chunks of that size, so only a chunk is
+            kept in memory. Objects must come after objects they depend on
+            (e.g. a folder before its alerts), untracked objects are removed
+            after all chunks are applied
+        :param report: report to fill, e.g. to inspect it after a failed run
+        :return: timings of run phases and counts of changed objects
+        """
+        if any(isinstance(p, AsyncProvider) for p in self._providers):
+            raise AsyncProviderInSyncRunException()
+
+        report = report if report is not None else RunReport()
+        try:
+            with report.measure(TOTAL), self._open_state(
+                report, read_only=dry_run
+            ) as state:
+                fast_plan = fast_plan and not state.full_verify_due(
+                    full_verify_interval
+                )
+
+                index = ResourceIndex(self._resource_name_provider_map)
+                self._set_index(index)
+                try:
+                    for grouped_resources in self._iter_resource_batches(
+                        state, index, monitoring_objects, chunk_size, report
+                    ):
+                        # A provider is applied after providers of objects
+                        # its objects depend on
+                        run_graph(
+                            {
+                                provider: partial(
+                                    self._apply_provider_state,
+                                    state,
+                                    cast(Provider[MonitoringObject], provider),
+                                    resources,
+                                    dry_run,
+                                    fast_plan,
+                                    report.provider(provider),
+                                )
+                                for provider, resources in grouped_resources.items()
+                            },
+                            self._provider_dependencies(index, grouped_resources),
+                        )
+                finally:
+                    self._set_index(None)
+                    index.thaw_objects()
+
+                if not (dry_run or fast_plan):
+                    state.mark_verified()
+
+        finally:
+            self._collect_http_stats(report)
+            for provider in self._providers:
+                provider.dispose()
+
+        logger.debug(f"Monitoring state applied: {report.summary()}")
+        return report
+
+    def _set_index(self, index: Optional[ResourceIndex]) -> None:
+        """
+        Providers look object types of resources up in the index of the run
+        """
+        for provider in self._providers:
+            provider.set_index(index)
+
+    def _collect_http_stats(self, report: RunReport) -> None:
+        for provider in self._providers:
+            http_stats = provider.take_http_stats()
+            if not http_stats:
+                continue
+
+            report.provider(provider).http_stats = http_stats
+            logger.info(
+                f"HTTP requests of {type(provider).__name__}:\n{http_stats.summary()}"
+            )
+
+    def _apply_provider_state(
+        self,
+        state: State,
+        provider: Provider[T],
+        resources: list[Resource[T]],
+        dry_run: bool,
+        fast_plan: bool,
+        report: ProviderReport,
     ) -> None:
+        with report.measure(SYNC):
+            mapped_resources, processed_resources = self._split_resources_to_sync(
+                state, resources, fast_plan
+            )
+
+            processed_resources.extend(provider.sync_resources(mapped_resources))
 
-        operating_resources: list[LocalResource[MonitoringObject]] = [
-            LocalResource(local_object=local_obj) for local_obj in monitoring_objects
-        ]
+        with report.measure(DIFF):
+            (
+                need_removal,
+                need_update,
+                need_create,
+                skip_update,
+            ) = self._print_diff_split_resources(provider, processed_resources, report)
+        if dry_run:
+            return
 
+        # completed operations are recorded, even if the provider fails later
+        provider.set_checkpoint(state.checkpoint)
         try:
-            with self._state as state:
-                local_resources, mapped_resources = state.fill_provider_id(
-                    operating_resources
+            with report.measure(APPLY):
+                synced_resources = provider.apply_actions(
+                    to_create=need_create,
+                    to_update=need_update,
+                    to_remove=need_removal,
                 )
-                untracked_resources = state.get_untracked_resources(operating_resources)
+        finally:
+            provider.set_checkpoint(None)
+        with report.measure(STATE_UPDATE):
+            state.update_state(
+                synced_resources=synced_resources + skip_update,
+                removed_resources=need_removal,
+            )
 
-                # fixme: научиться группировать ресурсы по разным спискам
-                grouped_resources = self._group_resources_by_provider(
-                    local_resources + mapped_resources + untracked_resources
+    async def apply_monitoring_state_async(
+        self,
+        monitoring_objects: Iterable[MonitoringObject],
+        dry_run: bool = True,
+        fast_plan: bool = False,
+        full_verify_interval: Optional[timedelta] = None,
+        chunk_size: Optional[int] = None,
+        report: Optional[RunReport] = None,
+    ) -> RunReport:
+        """
+        Same as apply_monitoring_state, but awaits AsyncProvider calls.
+        Providers are processed concurrently, once providers of objects
+        they depend on are done; synchronous providers are run in a worker thread
+        """
+        report = report if report is not None else RunReport()
+        try:
+            with report.measure(TOTAL), self._open_state(
+                report, read_only=dry_run
+            ) as state:
+                fast_plan = fast_plan and not state.full_verify_due(
+                    full_verify_interval
                 )
 
-                provider: Provider[T]
-                resources: list[Resource[T]]
-                for provider, resources in grouped_resources.items():
-                    mapped_resources: list[MappedResource[T]] = []
-                    processed_resources: list[
-                        ObsoleteResource[T] | SyncedResource[T] | LocalResource[T]
-                    ] = []
-
-                    for r in resources:
-                        if isinstance(r, MappedResource):
-                            mapped_resources.append(r)
-                        else:
-                            processed_resources.append(r)
-
-                    processed_resources.extend(
-                        provider.sync_resources(mapped_resources)
-                    )
-
-                    (
-                        need_removal,
-                        need_update,
-                        need_create,
-                        skip_update,
-                    ) = self._print_diff_split_resources(provider, processed_resources)
-                    if not dry_run:
-                        synced_resources = provider.apply_actions(
-                            to_create=need_create,
-                            to_update=need_update,
-                            to_remove=need_removal,
-                        )
-                        state.update_state(
-                            synced_resources=synced_resources + skip_update,
-                            removed_resources=need_removal,
+                index = ResourceIndex(self._resource_name_provider_map)
+                self._set_index(index)
+                try:
+                    for grouped_resources in self._iter_resource_batches(
+                        state, index, monitoring_objects, chunk_size, report
+                    ):
+                        await run_graph_async(
+                            {
+                                provider: partial(
+                                    self._apply_provider_state_async,
+                                    state,
+                                    provider,
+                                    resources,
+                                    dry_run,
+                                    fast_plan,
+                                    report.provider(provider),
+                                )
+                                for provider, resources in grouped_resources.items()
+                            },
+                            self._provider_dependencies(index, grouped_resources),
                         )
+                finally:
+                    self._set_index(None)
+                    index.thaw_objects()
+
+                if not (dry_run or fast_plan):
+                    state.mark_verified()
 
         finally:
+            self._collect_http_stats(report)
             for provider in self._providers:
-                provider.dispose()
+                if isinstance(provider, AsyncProvider):
+                    await provider.dispose()
+                else:
+                    provider.dispose()
+
+        logger.debug(f"Monitoring state applied: {report.summary()}")
+        return report
+
+    async def _apply_provider_state_async(
+        self,
+        state: State,
+        provider: ANY_PROVIDER[T],
+        resources: list[Resource[T]],
+        dry_run: bool,
+        fast_plan: bool,
+        report: ProviderReport,
+    ) -> None:
+        with report.measure(SYNC):
+            mapped_resources, processed_resources = self._split_resources_to_sync(
+                state, resources, fast_plan
+            )
+
+            if isinstance(provider, AsyncProvider):
+                processed_resources.extend(
+                    await provider.sync_resources(mapped_resources)
+                )
+            else:
+                processed_resources.extend(
+                    await asyncio.to_thread(provider.sync_resources, mapped_resources)
+                )
+
+        with report.measure(DIFF):
+            (
+                need_removal,
+                need_update,
+                need_create,
+                skip_update,
+            ) = self._print_diff_split_resources(provider, processed_resources, report)
+        if dry_run:
+            return
+
+        provider.set_checkpoint(state.checkpoint)
+        try:
+            with report.measure(APPLY):
+                if isinstance(provider, AsyncProvider):
+                    synced_resources = await provider.apply_actions(
+                        to_create=need_create,
+                        to_update=need_update,
+                        to_remove=need_removal,
+                    )
+                else:
+                    synced_resources = await asyncio.to_thread(
+                        provider.apply_actions,
+                        to_create=need_create,
+                        to_update=need_update,
+                        to_remove=need_removal,
+                    )
+        finally:
+            provider.set_checkpoint(None)
+        with report.measure(STATE_UPDATE):
+            state.update_state(
+                synced_resources=synced_resources + skip_update,
+                removed_resources=need_removal,
+            )
 
     def _print_diff_split_resources(
         self,
-        provider: Provider[T],
+        provider: ANY_PROVIDER[T],
         provider_resources: Iterable[Resource[T]],
+        report: ProviderReport,
     ) -> tuple[
         list[ObsoleteResource[T]],
         list[SyncedResource[T]],
@@ -156,23 +457,33 @@ class Monitor:
         skip_update: list[SyncedResource[T]] = []
 
         for resource in provider_resources:
-            diff_header = f"Diff for {resource.local_id}"  # type: ignore  # weird pydantic issue, that property does
-            # not override field class
+            started_at = perf_counter()
+            diff_header = f"Diff for {resource.local_id}"
 
             match resource:
                 case ObsoleteResource():
                     logger.info(diff_header + ": deleted")
                     need_removal.append(cast(ObsoleteResource[T], resource))
+                    op = ResourceOps.DELETE
                 case SyncedResource():
                     synced_res = cast(SyncedResource[T], resource)
                     diff = provider.diff(synced_res)
                     if diff:
                         print_diff(diff_header, diff)
                         need_update.append(synced_res)
+                        op = ResourceOps.UPDATE
                     else:
                         skip_update.append(synced_res)
+                        op = ResourceOps.SKIP
                 case LocalResource(local_object=obj):
                     print_diff(diff_header, calculate_diff(None, obj))
                     need_create.append(cast(LocalResource[T], resource))
+                    op = ResourceOps.CREATE
+
+            report.count(
+                get_resource_object_type_name(resource),
+                op,
+                perf_counter() - started_at,
+            )
 
         return need_removal, need_update, need_create, skip_update
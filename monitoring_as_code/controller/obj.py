@@ -1,16 +1,105 @@
+from typing import Any, ClassVar, Collection, Optional, TypeVar
+
+import hashlib
 import json
 from abc import ABC, abstractmethod
 from functools import partial
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
+
+Model = TypeVar("Model", bound="MonitoringObject")
 
 
 class MonitoringObject(BaseModel, ABC):
+    """
+    An object to monitor.
+
+    A frozen object (see freeze) can not be modified, so its canonical json
+    and content hash are computed once and cached; equality of frozen
+    objects is a comparison of hashes
+    """
+
+    # keyword arguments of json(), that make the canonical json
+    _json_defaults: ClassVar[dict[str, Any]] = {}
+
+    _frozen: bool = PrivateAttr(False)
+    _json: Optional[str] = PrivateAttr(None)
+    _content_hash: Optional[str] = PrivateAttr(None)
+
     @property
     @abstractmethod
     def local_id(self) -> str:
         pass
 
+    @property
+    def dependencies(self) -> Collection[str]:
+        """
+        Resource local ids of objects, that must exist before this one,
+        e.g. an alert requires its folder
+        """
+        return ()
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+
+    def freeze(self: Model) -> Model:
+        """
+        Forbid changes of the object to cache its json and content hash.
+        Sub-models are not checked, they must not be modified either
+        """
+        object.__setattr__(self, "_frozen", True)
+        return self
+
+    def thaw(self: Model) -> Model:
+        """
+        Allow changes of a frozen object again, dropping its cached json
+        and content hash
+        """
+        object.__setattr__(self, "_frozen", False)
+        object.__setattr__(self, "_json", None)
+        object.__setattr__(self, "_content_hash", None)
+        return self
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if self._frozen:
+            raise TypeError(
+                f'"{type(self).__name__}" is frozen and does not support '
+                f"item assignment, modify a copy instead"
+            )
+        super().__setattr__(name, value)
+
+    def __eq__(self, other: Any) -> bool:
+        if self._frozen and type(other) is type(self) and other._frozen:
+            return self.content_hash() == other.content_hash()
+        return super().__eq__(other)
+
+    def copy(self: Model, **kwargs: Any) -> Model:
+        """
+        Copies are not frozen, so they can be modified
+        """
+        return super().copy(**kwargs).thaw()
+
+    def json(self, **kwargs: Any) -> str:
+        if kwargs or not self._frozen:
+            return super().json(**{**self._json_defaults, **kwargs})
+
+        if self._json is None:
+            object.__setattr__(self, "_json", super().json(**self._json_defaults))
+        return self._json  # type: ignore[return-value]
+
+    def content_hash(self) -> str:
+        """
+        Stable hash of the object content, based on its canonical json
+        """
+        if self._content_hash is not None:
+            return self._content_hash
+
+        content_hash = hashlib.sha256(self.json().encode()).hexdigest()
+        if self._frozen:
+            object.__setattr__(self, "_content_hash", content_hash)
+        return content_hash
+
     class Config:
         json_dumps = partial(
             json.dumps,
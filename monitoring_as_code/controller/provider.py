@@ -1,15 +1,84 @@
-from typing import Collection, Generic, Iterable, Type, TypeVar
+import typing
+from typing import Any, Callable, Collection, Generic, Iterable, Optional, Type, TypeVar
 
 from abc import ABC, abstractmethod
+from collections import defaultdict
 
-from .diff_utils import RESOURCE_DIFF
+from .diff_utils import ResourceDiff
+from .http_stats import HttpStats
 from .obj import MonitoringObject
-from .resource import LocalResource, MappedResource, ObsoleteResource, SyncedResource
+from .resource import (
+    LocalResource,
+    MappedResource,
+    ObsoleteResource,
+    Resource,
+    SyncedResource,
+)
+
+if typing.TYPE_CHECKING:
+    from .index import ResourceIndex
 
 T = TypeVar("T", bound=MonitoringObject)
+RS = TypeVar("RS", bound=Resource[Any])
+
+# records operations completed so far: synced resources and removed ones
+CHECKPOINT = Callable[
+    [Iterable[SyncedResource[Any]], Iterable[ObsoleteResource[Any]]], None
+]
 
 
-class Provider(ABC, Generic[T]):
+class CheckpointReporter:
+    """
+    Lets a provider report operations as they complete during apply_actions,
+    so they are recorded in the state even if apply_actions fails later.
+    Reporting is optional, results of apply_actions are recorded anyway
+    """
+
+    _checkpoint: Optional[CHECKPOINT] = None
+
+    def set_checkpoint(self, checkpoint: Optional[CHECKPOINT]) -> None:
+        """
+        Set by Monitor for the time of apply_actions
+        """
+        self._checkpoint = checkpoint
+
+    def report_applied(
+        self,
+        synced: Iterable[SyncedResource[Any]] = (),
+        removed: Iterable[ObsoleteResource[Any]] = (),
+    ) -> None:
+        if self._checkpoint is not None:
+            self._checkpoint(synced, removed)
+
+
+class TypeLookup:
+    """
+    Lets a provider group resources by object type with the index of the run,
+    instead of deriving the type of every resource again.
+    Without the index (e.g. a provider used without Monitor) types are derived
+    """
+
+    _index: Optional["ResourceIndex"] = None
+
+    def set_index(self, index: Optional["ResourceIndex"]) -> None:
+        """
+        Set by Monitor for the time of a run
+        """
+        self._index = index
+
+    def group_by_type(self, resources: Iterable[RS]) -> dict[str, list[RS]]:
+        """
+        Resources grouped by name of their object type
+        """
+        if self._index is not None:
+            return self._index.group_by_type(resources)
+        grouped: dict[str, list[RS]] = defaultdict(list)
+        for resource in resources:
+            grouped[resource.object_type_name].append(resource)
+        return grouped
+
+
+class Provider(CheckpointReporter, TypeLookup, ABC, Generic[T]):
     """
     An abstract class that represents a service provider
     The class exposes types it operates with and responsible for CRUD operations
@@ -30,11 +99,10 @@ class Provider(ABC, Generic[T]):
         """
 
     @abstractmethod
-    def diff(self, resource: SyncedResource[T]) -> RESOURCE_DIFF:
+    def diff(self, resource: SyncedResource[T]) -> ResourceDiff:
         """
-        Diff in form of classic diff
-
-        see: https://docs.python.org/3/library/difflib.html#difflib.unified_diff
+        Lazy diff between the remote and the local object.
+        Usually built with diff_utils.calculate_diff
         """
 
     @abstractmethod
@@ -46,7 +114,66 @@ class Provider(ABC, Generic[T]):
     ) -> list[SyncedResource[T]]:
         pass
 
+    def take_http_stats(self) -> Optional[HttpStats]:
+        """
+        Stats of http requests made since the previous call, if the provider
+        makes any. Monitor takes them at the end of every run
+        """
+        return None
+
     def dispose(self) -> None:
         """
         In case needed, run any finalizing actions
         """
+
+
+class AsyncProvider(CheckpointReporter, TypeLookup, ABC, Generic[T]):
+    """
+    Asyncio counterpart of Provider.
+    Remote calls are coroutines, so a provider can keep many requests in flight
+    without a thread per request
+    """
+
+    @property
+    @abstractmethod
+    def operating_objects(self) -> Collection[Type[T]]:
+        pass
+
+    @abstractmethod
+    async def sync_resources(
+        self,
+        mapped_resources: Iterable[MappedResource[T]],
+    ) -> Iterable[SyncedResource[T] | LocalResource[T]]:
+        """
+        Get remote state for given resources, if any
+        """
+
+    @abstractmethod
+    def diff(self, resource: SyncedResource[T]) -> ResourceDiff:
+        """
+        Lazy diff between the remote and the local object.
+        Usually built with diff_utils.calculate_diff
+        """
+
+    @abstractmethod
+    async def apply_actions(
+        self,
+        to_create: Iterable[LocalResource[T]],
+        to_update: Iterable[SyncedResource[T]],
+        to_remove: Iterable[ObsoleteResource[T]],
+    ) -> list[SyncedResource[T]]:
+        pass
+
+    def take_http_stats(self) -> Optional[HttpStats]:
+        """
+        See Provider.take_http_stats
+        """
+        return None
+
+    async def dispose(self) -> None:
+        """
+        In case needed, run any finalizing actions
+        """
+
+
+ANY_PROVIDER = Provider[T] | AsyncProvider[T]
@@ -0,0 +1,133 @@
+import typing
+from typing import ContextManager, Counter, Iterable, Iterator, Optional
+
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from .http_stats import HttpStats
+from .resource import ResourceOps
+
+if typing.TYPE_CHECKING:
+    from .obj import MonitoringObject
+    from .provider import ANY_PROVIDER
+
+# Phases of a run, measured by Monitor
+STATE_LOAD = "state_load"
+# fill_provider_id, finding untracked resources and grouping by provider
+PREPARE = "prepare"
+STATE_SAVE = "state_save"
+TOTAL = "total"
+
+# Phases of a provider, measured by Monitor around provider calls
+SYNC = "sync"
+DIFF = "diff"
+APPLY = "apply"
+STATE_UPDATE = "state_update"
+
+
+def _timings() -> defaultdict[str, float]:
+    return defaultdict(float)
+
+
+def _sum_counts(counts: Iterable[Counter[ResourceOps]]) -> Counter[ResourceOps]:
+    total: Counter[ResourceOps] = Counter()
+    for item in counts:
+        total.update(item)
+    return total
+
+
+@contextmanager
+def _measure(timings: dict[str, float], phase: str) -> Iterator[None]:
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] += perf_counter() - start
+
+
+@dataclass
+class ObjectTypeReport:
+    # CREATE, UPDATE, SKIP and DELETE of objects of the type
+    counts: Counter[ResourceOps] = field(default_factory=Counter)
+    # time spent on diffs of objects of the type
+    diff_time: float = 0.0
+
+
+@dataclass
+class ProviderReport:
+    """
+    Time spent in calls of a provider by phase.
+    Provider calls handle objects of all types at once,
+    so only diffs are timed per object type
+    """
+
+    timings: dict[str, float] = field(default_factory=_timings)
+    object_types: dict[str, ObjectTypeReport] = field(
+        default_factory=lambda: defaultdict(ObjectTypeReport)
+    )
+    # requests made during the run, see Provider.take_http_stats
+    http_stats: Optional[HttpStats] = None
+
+    def measure(self, phase: str) -> ContextManager[None]:
+        return _measure(self.timings, phase)
+
+    def count(self, object_type: str, op: ResourceOps, diff_time: float) -> None:
+        object_type_report = self.object_types[object_type]
+        object_type_report.counts[op] += 1
+        object_type_report.diff_time += diff_time
+
+    @property
+    def counts(self) -> Counter[ResourceOps]:
+        return _sum_counts(report.counts for report in self.object_types.values())
+
+
+@dataclass
+class RunReport:
+    """
+    Timings and counters of a Monitor run.
+    Times are wall clock seconds summed over batches;
+    providers processed concurrently are timed separately,
+    so their sum may exceed the total
+    """
+
+    timings: dict[str, float] = field(default_factory=_timings)
+    # by provider instance, so providers of the same class are reported apart
+    providers: dict["ANY_PROVIDER[MonitoringObject]", ProviderReport] = field(
+        default_factory=lambda: defaultdict(ProviderReport)
+    )
+
+    def measure(self, phase: str) -> ContextManager[None]:
+        return _measure(self.timings, phase)
+
+    def provider(self, provider: "ANY_PROVIDER[MonitoringObject]") -> ProviderReport:
+        return self.providers[provider]
+
+    @property
+    def counts(self) -> Counter[ResourceOps]:
+        return _sum_counts(report.counts for report in self.providers.values())
+
+    @property
+    def phase_timings(self) -> dict[str, float]:
+        """
+        Run phases along with provider phases summed over providers
+        """
+        timings = _timings()
+        timings.update(self.timings)
+        for provider_report in self.providers.values():
+            for phase, spent in provider_report.timings.items():
+                timings[phase] += spent
+        return dict(timings)
+
+    def summary(self) -> str:
+        counts = self.counts
+        phases = ", ".join(
+            f"{phase} {spent:.3f}s" for phase, spent in self.phase_timings.items()
+        )
+        return (
+            f"{counts[ResourceOps.CREATE]} created, "
+            f"{counts[ResourceOps.UPDATE]} updated, "
+            f"{counts[ResourceOps.SKIP]} skipped, "
+            f"{counts[ResourceOps.DELETE]} deleted; {phases}"
+        )
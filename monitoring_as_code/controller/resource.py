@@ -1,10 +1,8 @@
-from typing import Generic, TypeVar
+from typing import Any, ClassVar, Generic, TypeVar
 
-from abc import ABC
+from abc import ABC, abstractmethod
 from enum import Enum, auto
 
-from pydantic import BaseModel
-
 from .obj import MonitoringObject
 
 IdType = str
@@ -38,35 +36,159 @@ def generate_resource_local_id(obj: MonitoringObject) -> str:
     return f"{type(obj).__name__}.{obj.local_id}"
 
 
-class Resource(BaseModel, Generic[T], ABC):
-    pass
+class Resource(Generic[T], ABC):
+    """
+    Immutable container around an object in processing.
+
+    Resources only wrap already validated objects, so they are plain slotted
+    classes instead of pydantic models: wrapping costs neither validation
+    nor a per-instance __dict__
+    """
+
+    __slots__ = ()
+
+    # fields in constructor order; used for equality, repr and pickling
+    _fields: ClassVar[tuple[str, ...]] = ()
+
+    @property
+    @abstractmethod
+    def local_id(self) -> IdType:
+        pass
+
+    @property
+    @abstractmethod
+    def object_type_name(self) -> str:
+        """
+        Name of the type of the object, also the prefix of local_id
+        """
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other: object) -> bool:
+        if type(self) is not type(other):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._fields)
+
+    __hash__ = None  # type: ignore  # mutable objects inside
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({fields})"
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in self._fields}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
 
 
 class LocalResource(Resource[T]):
+    __slots__ = ("local_object", "_local_id")
+    __match_args__ = ("local_object",)
+    _fields: ClassVar[tuple[str, ...]] = ("local_object",)
+
     local_object: T
+    # cached by local_id
+    _local_id: IdType
+
+    def __init__(self, *, local_object: T) -> None:
+        object.__setattr__(self, "local_object", local_object)
 
     @property
     def local_id(self) -> IdType:
-        return generate_resource_local_id(self.local_object)
+        try:
+            return self._local_id
+        except AttributeError:
+            local_id = generate_resource_local_id(self.local_object)
+            object.__setattr__(self, "_local_id", local_id)
+            return local_id
+
+    @property
+    def object_type_name(self) -> str:
+        return type(self.local_object).__name__
+
+    def _inherit_local_id(self, other: "LocalResource[T]") -> None:
+        """
+        Reuse local_id computed for another resource of the same object
+        """
+        try:
+            object.__setattr__(self, "_local_id", other._local_id)
+        except AttributeError:
+            pass
 
 
 class MappedResource(LocalResource[T]):
+    __slots__ = ("remote_id",)
+    __match_args__ = ("local_object", "remote_id")
+    _fields: ClassVar[tuple[str, ...]] = ("local_object", "remote_id")
+
     remote_id: IdType
 
+    def __init__(self, *, local_object: T, remote_id: IdType) -> None:
+        super().__init__(local_object=local_object)
+        object.__setattr__(self, "remote_id", remote_id)
+
     @classmethod
     def from_local(
         cls, local_resource: LocalResource[T], remote_id: IdType
     ) -> "MappedResource[T]":
-        return cls(
+        mapped = cls(
             local_object=local_resource.local_object,
             remote_id=remote_id,
         )
+        mapped._inherit_local_id(local_resource)
+        return mapped
 
 
 class SyncedResource(MappedResource[T]):
+    __slots__ = ("remote_object",)
+    __match_args__ = ("local_object", "remote_id", "remote_object")
+    _fields: ClassVar[tuple[str, ...]] = ("local_object", "remote_id", "remote_object")
+
     remote_object: T
 
+    def __init__(self, *, local_object: T, remote_id: IdType, remote_object: T) -> None:
+        super().__init__(local_object=local_object, remote_id=remote_id)
+        object.__setattr__(self, "remote_object", remote_object)
+
+    @classmethod
+    def from_mapped(
+        cls, mapped_resource: MappedResource[T], remote_object: T
+    ) -> "SyncedResource[T]":
+        synced = cls(
+            local_object=mapped_resource.local_object,
+            remote_id=mapped_resource.remote_id,
+            remote_object=remote_object,
+        )
+        synced._inherit_local_id(mapped_resource)
+        return synced
+
 
 class ObsoleteResource(Resource[T]):
+    __slots__ = ("local_id", "remote_id", "_object_type_name")
+    __match_args__ = ("local_id", "remote_id")
+    _fields: ClassVar[tuple[str, ...]] = ("local_id", "remote_id")
+
     local_id: IdType
     remote_id: IdType
+    # cached by object_type_name
+    _object_type_name: str
+
+    def __init__(self, *, local_id: IdType, remote_id: IdType) -> None:
+        object.__setattr__(self, "local_id", local_id)
+        object.__setattr__(self, "remote_id", remote_id)
+
+    @property
+    def object_type_name(self) -> str:
+        # there is no object, the type is known from local_id only
+        try:
+            return self._object_type_name
+        except AttributeError:
+            object_type_name = self.local_id.split(".", maxsplit=1)[0]
+            object.__setattr__(self, "_object_type_name", object_type_name)
+            return object_type_name
@@ -0,0 +1,127 @@
+from typing import Awaitable, Callable, Hashable, Iterable, Mapping, Optional, TypeVar
+
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from graphlib import CycleError, TopologicalSorter
+
+from .exceptions import DependencyCycleException
+
+K = TypeVar("K", bound=Hashable)
+R = TypeVar("R")
+
+# A task is called once all of its dependencies are done.
+# None marks a node, that only groups dependencies and does no work
+TASKS_MAPPING = Mapping[K, Optional[Callable[[], R]]]
+DEPENDENCIES_MAPPING = Mapping[K, Iterable[K]]
+
+
+def _prepare_sorter(
+    tasks: Mapping[K, object],
+    dependencies: DEPENDENCIES_MAPPING[K],
+) -> TopologicalSorter[K]:
+    """
+    Dependencies on keys that are not scheduled are considered satisfied:
+    e.g. an alert does not wait for a folder, that is not changed in this run
+    """
+    sorter: TopologicalSorter[K] = TopologicalSorter()
+    for key in tasks:
+        sorter.add(key, *(dep for dep in dependencies.get(key, ()) if dep in tasks))
+
+    try:
+        sorter.prepare()
+    except CycleError as e:
+        raise DependencyCycleException(e.args[1]) from e
+    return sorter
+
+
+def run_graph(
+    tasks: TASKS_MAPPING[K, R],
+    dependencies: DEPENDENCIES_MAPPING[K],
+    executor: Optional[Executor] = None,
+) -> dict[K, R]:
+    """
+    Run every task after the tasks it depends on.
+    With an executor all ready tasks are submitted at once, so independent
+    branches of the graph do not wait for each other.
+    On failure, already running tasks are waited for and the error is re-raised
+
+    :return: results of the tasks by their keys
+    """
+    sorter = _prepare_sorter(tasks, dependencies)
+    results: dict[K, R] = {}
+
+    if executor is None:
+        while sorter.is_active():
+            for key in sorter.get_ready():
+                task = tasks[key]
+                if task is not None:
+                    results[key] = task()
+                sorter.done(key)
+        return results
+
+    pending: dict[Future[R], K] = {}
+    try:
+        while sorter.is_active():
+            for key in sorter.get_ready():
+                task = tasks[key]
+                if task is None:
+                    sorter.done(key)
+                else:
+                    pending[executor.submit(task)] = key
+            if not pending:
+                continue
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = pending.pop(future)
+                results[key] = future.result()
+                sorter.done(key)
+    finally:
+        wait(pending)
+
+    return results
+
+
+async def run_graph_async(
+    tasks: TASKS_MAPPING[K, Awaitable[R]],
+    dependencies: DEPENDENCIES_MAPPING[K],
+    limit: Optional[int] = None,
+) -> dict[K, R]:
+    """
+    run_graph counterpart for coroutine functions.
+    All ready tasks are awaited concurrently, at most `limit` at once
+
+    :return: results of the tasks by their keys
+    """
+    sorter = _prepare_sorter(tasks, dependencies)
+    semaphore = asyncio.Semaphore(limit) if limit else None
+    results: dict[K, R] = {}
+
+    async def run(task: Callable[[], Awaitable[R]]) -> R:
+        if semaphore is None:
+            return await task()
+        async with semaphore:
+            return await task()
+
+    pending: dict[asyncio.Task[R], K] = {}
+    try:
+        while sorter.is_active():
+            for key in sorter.get_ready():
+                task = tasks[key]
+                if task is None:
+                    sorter.done(key)
+                else:
+                    pending[asyncio.ensure_future(run(task))] = key
+            if not pending:
+                continue
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                key = pending.pop(future)
+                results[key] = future.result()
+                sorter.done(key)
+    finally:
+        if pending:
+            await asyncio.wait(pending)
+
+    return results
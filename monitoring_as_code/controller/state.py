@@ -1,7 +1,10 @@
 from types import TracebackType
-from typing import Iterable, Optional, Type
+from typing import Collection, Iterable, Iterator, Optional, Type
 
+import threading
+import time
 from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
 
 from pydantic import BaseModel
 
@@ -15,10 +18,22 @@ from .resource import (
 )
 
 RESOURCE_ID_MAPPING = dict[IdType, IdType]  # local_id: remote_id
+RESOURCE_HASH_MAPPING = dict[IdType, str]  # local_id: content hash
+
+
+def object_type(local_id: IdType) -> str:
+    """
+    Object type of a local id, see generate_resource_local_id
+    """
+    return local_id.split(".", 1)[0]
 
 
 class StateData(BaseModel):
     resources: RESOURCE_ID_MAPPING = {}
+    # content hash of local objects as of the last successful apply
+    fingerprints: RESOURCE_HASH_MAPPING = {}
+    # last time every tracked resource was compared with its remote object
+    verified_at: Optional[datetime] = None
 
 
 class State(ABC):
@@ -27,10 +42,37 @@ class State(ABC):
         *,
         save_state: bool,
         persist_untracked: bool,
+        checkpoint_every: Optional[int] = None,
+        checkpoint_interval: Optional[timedelta] = None,
     ):
+        """
+        :param checkpoint_every: save the state during apply, once that many
+            operations are reported since the last save, see checkpoint
+        :param checkpoint_interval: save the state during apply, once that much
+            time passed since the last save and operations are reported
+        """
         self._data: StateData = StateData()
         self._persist_untracked = persist_untracked
         self._save_state = save_state
+        # set for dry runs, the state is loaded but not saved
+        self.read_only = False
+        self._checkpoint_every = checkpoint_every
+        self._checkpoint_interval = (
+            checkpoint_interval.total_seconds()
+            if checkpoint_interval is not None
+            else None
+        )
+        self._unsaved_operations = 0
+        self._saved_at = time.monotonic()
+        # providers may report operations from worker threads
+        self._update_lock = threading.RLock()
+
+    @property
+    def saves(self) -> bool:
+        """
+        Whether the state is saved on exit and on checkpoints
+        """
+        return self._save_state and not self.read_only
 
     @abstractmethod
     def _load(self) -> None:
@@ -42,7 +84,7 @@ class State(ABC):
     def _save(self) -> None:
         """
         Persist self._data
-        Do not consider self._save_stave; It is already handled in self.__exit__
+        Do not consider self.saves; It is already handled in self.__exit__
         """
 
     def fill_provider_id(
@@ -52,40 +94,102 @@ class State(ABC):
         list[LocalResource[MonitoringObject]], list[MappedResource[MonitoringObject]]
     ]:
 
+        local_resources = list(local_resources)
+        remote_ids = self._lookup_remote_ids(
+            [local_resource.local_id for local_resource in local_resources]
+        )
+
         remains_local: list[LocalResource[MonitoringObject]] = []
         mapped_resources: list[MappedResource[MonitoringObject]] = []
 
         for local_resource in local_resources:
-            if (local_id := local_resource.local_id) in self._data.resources:
+            if (local_id := local_resource.local_id) in remote_ids:
                 mapped_resources.append(
                     MappedResource.from_local(
                         local_resource,
-                        self._data.resources[local_id],
+                        remote_ids[local_id],
                     )
                 )
             else:
                 remains_local.append(local_resource)
         return remains_local, mapped_resources
 
+    def filter_unchanged(
+        self,
+        mapped_resources: Iterable[MappedResource[MonitoringObject]],
+    ) -> tuple[
+        list[MappedResource[MonitoringObject]], list[SyncedResource[MonitoringObject]]
+    ]:
+        """
+        Split resources into ones that changed since the last apply and ones that
+        did not. Unchanged resources are assumed to match their remote object,
+        so they are returned as synced without reading the remote
+        """
+        mapped_resources = list(mapped_resources)
+        fingerprints = self._lookup_fingerprints(
+            [resource.local_id for resource in mapped_resources]
+        )
+
+        changed: list[MappedResource[MonitoringObject]] = []
+        unchanged: list[SyncedResource[MonitoringObject]] = []
+
+        for resource in mapped_resources:
+            fingerprint = fingerprints.get(resource.local_id)
+            if fingerprint and fingerprint == resource.local_object.content_hash():
+                unchanged.append(
+                    SyncedResource.from_mapped(resource, resource.local_object)
+                )
+            else:
+                changed.append(resource)
+
+        return changed, unchanged
+
+    def full_verify_due(self, interval: Optional[timedelta]) -> bool:
+        """
+        Whether every tracked resource has to be read from remote
+        to detect changes made outside the state
+        """
+        if interval is None:
+            return False
+        if self._data.verified_at is None:
+            return True
+        return datetime.now(timezone.utc) - self._data.verified_at >= interval
+
+    def mark_verified(self) -> None:
+        self._data.verified_at = datetime.now(timezone.utc)
+
     def get_untracked_resources(
         self, resources: Iterable[LocalResource[MonitoringObject]]
     ) -> list[ObsoleteResource[MonitoringObject]]:
         """
         Return list of resources that are in state, but were not passed as parameters
         """
+        return self.get_untracked_resources_by_ids(
+            {tracked_resource.local_id for tracked_resource in resources}
+        )
+
+    def get_untracked_resources_by_ids(
+        self,
+        tracked_resource_local_ids: Collection[IdType],
+        object_types: Optional[Collection[str]] = None,
+    ) -> list[ObsoleteResource[MonitoringObject]]:
+        """
+        Return list of resources that are in state, but not among given local ids
+
+        :param object_types: only look among resources of these types,
+            e.g. ones of a provider
+        """
         if self._persist_untracked:
             return []
 
-        tracked_resource_local_ids = {
-            tracked_resource.local_id for tracked_resource in resources
-        }
         untracked_resources: list[ObsoleteResource[MonitoringObject]] = [
             ObsoleteResource(
                 local_id=local_id,
                 remote_id=remote_id,
             )
-            for local_id, remote_id in self._data.resources.items()
-            if local_id not in tracked_resource_local_ids
+            for local_id, remote_id in self._iter_untracked(
+                tracked_resource_local_ids, object_types
+            )
         ]
         return untracked_resources
 
@@ -94,11 +198,117 @@ class State(ABC):
         synced_resources: Iterable[SyncedResource[MonitoringObject]],
         removed_resources: Iterable[ObsoleteResource[MonitoringObject]],
     ) -> None:
-        for resource in synced_resources:
-            self._data.resources[resource.local_id] = resource.remote_id
+        with self._update_lock:
+            self._store(
+                [
+                    (
+                        resource.local_id,
+                        resource.remote_id,
+                        resource.local_object.content_hash(),
+                    )
+                    for resource in synced_resources
+                ],
+                [resource.local_id for resource in removed_resources],
+            )
+
+    # Access to the stored mapping. States, that do not keep it in self._data,
+    # e.g. in a database, override these
+
+    def _lookup_remote_ids(self, local_ids: Iterable[IdType]) -> RESOURCE_ID_MAPPING:
+        """
+        Remote ids of tracked resources among given ones
+        """
+        resources = self._data.resources
+        return {
+            local_id: resources[local_id]
+            for local_id in local_ids
+            if local_id in resources
+        }
+
+    def _lookup_fingerprints(
+        self, local_ids: Iterable[IdType]
+    ) -> RESOURCE_HASH_MAPPING:
+        fingerprints = self._data.fingerprints
+        return {
+            local_id: fingerprints[local_id]
+            for local_id in local_ids
+            if local_id in fingerprints
+        }
+
+    def _iter_untracked(
+        self,
+        tracked_local_ids: Collection[IdType],
+        object_types: Optional[Collection[str]],
+    ) -> Iterator[tuple[IdType, IdType]]:
+        """
+        Local and remote ids of resources, that are not among tracked ones
+        """
+        for local_id, remote_id in self._data.resources.items():
+            if local_id in tracked_local_ids:
+                continue
+            if object_types is not None and object_type(local_id) not in object_types:
+                continue
+            yield local_id, remote_id
+
+    def _store(
+        self,
+        synced: Iterable[tuple[IdType, IdType, str]],
+        removed: Iterable[IdType],
+    ) -> None:
+        """
+        :param synced: local id, remote id and content hash of synced resources
+        :param removed: local ids of removed resources
+        """
+        for local_id, remote_id, fingerprint in synced:
+            self._data.resources[local_id] = remote_id
+            self._data.fingerprints[local_id] = fingerprint
+
+        for local_id in removed:
+            self._data.resources.pop(local_id, None)
+            self._data.fingerprints.pop(local_id, None)
 
-        for resource in removed_resources:
-            self._data.resources.pop(resource.local_id, None)
+    def checkpoint(
+        self,
+        synced_resources: Iterable[SyncedResource[MonitoringObject]],
+        removed_resources: Iterable[ObsoleteResource[MonitoringObject]],
+    ) -> None:
+        """
+        Record operations completed during apply, before the provider is done.
+        The state is saved in batches, see checkpoint_every and
+        checkpoint_interval, so a run killed midway is resumed
+        from the last saved operation
+        """
+        synced_resources = list(synced_resources)
+        removed_resources = list(removed_resources)
+
+        with self._update_lock:
+            self.update_state(synced_resources, removed_resources)
+            self._unsaved_operations += len(synced_resources) + len(removed_resources)
+            if self._checkpoint_due():
+                self.flush()
+
+    def _checkpoint_due(self) -> bool:
+        if not self._unsaved_operations:
+            return False
+        if (
+            self._checkpoint_every is not None
+            and self._unsaved_operations >= self._checkpoint_every
+        ):
+            return True
+        return (
+            self._checkpoint_interval is not None
+            and time.monotonic() - self._saved_at >= self._checkpoint_interval
+        )
+
+    def flush(self) -> None:
+        """
+        Save the state now, if it is saved at all
+        """
+        with self._update_lock:
+            if self.saves:
+                self._save()
+            self._unsaved_operations = 0
+            self._saved_at = time.monotonic()
 
     def _lock(self) -> None:
         """
@@ -116,6 +326,8 @@ class State(ABC):
         """
         self._lock()
         self._load()
+        self._unsaved_operations = 0
+        self._saved_at = time.monotonic()
         return self
 
     def __exit__(
@@ -124,6 +336,6 @@ class State(ABC):
         exc: Optional[BaseException],
         traceback: Optional[TracebackType],
     ) -> None:
-        if self._save_state:
+        if self.saves:
             self._save()
         self._unlock()
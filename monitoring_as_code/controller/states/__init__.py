@@ -1 +1,3 @@
 from .file import FileState
+from .journal import JournaledFileState
+from .sqlite import SqliteState
@@ -1,3 +1,6 @@
+from typing import Optional
+
+from datetime import timedelta
 from pathlib import Path
 
 from controller.state import State, StateData
@@ -11,10 +14,14 @@ class FileState(State):
         *,
         save_state: bool,
         persist_untracked: bool,
+        checkpoint_every: Optional[int] = None,
+        checkpoint_interval: Optional[timedelta] = None,
     ):
         super(FileState, self).__init__(
             save_state=save_state,
             persist_untracked=persist_untracked,
+            checkpoint_every=checkpoint_every,
+            checkpoint_interval=checkpoint_interval,
         )
         self.file = file
 
@@ -0,0 +1,225 @@
+from typing import Any, BinaryIO, Iterable, Optional
+
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from controller.obj import MonitoringObject
+from controller.resource import ObsoleteResource, SyncedResource
+from controller.state import State, StateData
+from loguru import logger
+
+# compact the journal once it grows over that many bytes and the snapshot size
+DEFAULT_COMPACT_THRESHOLD = 1 << 20
+
+
+class JournaledFileState(State):
+    """
+    State kept as a compact snapshot and an append-only journal of changes.
+
+    A save appends records of changes made since the previous save
+    to the journal (`<file>.journal`), one json line per set or removed
+    resource, with a single fsync. So a checkpoint costs as much
+    as the changes it records, not as much as the whole state.
+    Loading reads the snapshot and replays the journal over it.
+
+    Once the journal outgrows both compact_threshold and the snapshot,
+    the state is written to a new snapshot and the journal is dropped.
+    Records are idempotent, so a journal left by a crash during compaction
+    is safely replayed over the new snapshot
+    """
+
+    def __init__(
+        self,
+        file: Path,
+        *,
+        save_state: bool,
+        persist_untracked: bool,
+        checkpoint_every: Optional[int] = None,
+        checkpoint_interval: Optional[timedelta] = None,
+        compact_threshold: int = DEFAULT_COMPACT_THRESHOLD,
+        fsync: bool = True,
+    ):
+        """
+        :param file: snapshot file, the journal is kept next to it
+        :param compact_threshold: minimal journal size in bytes to compact
+        :param fsync: flush saves to the disk,
+            otherwise they are left to the OS and may be lost on power failure
+        """
+        super().__init__(
+            save_state=save_state,
+            persist_untracked=persist_untracked,
+            checkpoint_every=checkpoint_every,
+            checkpoint_interval=checkpoint_interval,
+        )
+        self.file = file
+        self.journal = file.with_name(file.name + ".journal")
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        # records not written to the journal yet
+        self._pending: list[dict[str, Any]] = []
+        # end of the last complete record, if the journal has a broken tail,
+        # that is repaired before the next append
+        self._broken_tail_at: Optional[int] = None
+
+    def _load(self) -> None:
+        self._pending = []
+        self._broken_tail_at = None
+        if self.file.exists():
+            self._data = StateData.parse_file(self.file)
+        else:
+            logger.info(
+                f"State file {self.file.name} does not exists. "
+                f"Initializing with empty storage"
+            )
+            self._data = StateData()
+
+        if self.journal.exists():
+            self._replay()
+
+    def _replay(self) -> None:
+        with self.journal.open("rb") as f:
+            content = f.read()
+
+        # end of the last complete record
+        end = 0
+        for line in content.splitlines(keepends=True):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                if end + len(line) == len(content):
+                    # the last record was not written completely
+                    logger.warning(
+                        f"Skipping incomplete last record of {self.journal.name}"
+                    )
+                    break
+                raise
+            self._apply(record)
+            end += len(line)
+
+        # loading does not write, the tail is repaired by the next save
+        if end < len(content) or not content.endswith(b"\n"):
+            self._broken_tail_at = end
+
+    def _repair_tail(self, f: BinaryIO) -> None:
+        """
+        Drop an incomplete last record and terminate the last complete one,
+        so appended records are not glued to it
+        """
+        end = self._broken_tail_at
+        if end is None:
+            return
+        f.truncate(end)
+        if end:
+            f.seek(end - 1)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        self._broken_tail_at = None
+
+    def _apply(self, record: dict[str, Any]) -> None:
+        if record["op"] == "set":
+            self._data.resources[record["id"]] = record["remote_id"]
+            self._data.fingerprints[record["id"]] = record["hash"]
+        elif record["op"] == "delete":
+            self._data.resources.pop(record["id"], None)
+            self._data.fingerprints.pop(record["id"], None)
+        elif record["op"] == "verified":
+            self._data.verified_at = datetime.fromisoformat(record["at"])
+        else:
+            raise ValueError(f"Unknown journal record {record!r}")
+
+    def update_state(
+        self,
+        synced_resources: Iterable[SyncedResource[MonitoringObject]],
+        removed_resources: Iterable[ObsoleteResource[MonitoringObject]],
+    ) -> None:
+        synced_resources = list(synced_resources)
+        removed_resources = list(removed_resources)
+
+        with self._update_lock:
+            resources = self._data.resources
+            fingerprints = self._data.fingerprints
+            before = {
+                resource.local_id: (
+                    resources.get(resource.local_id),
+                    fingerprints.get(resource.local_id),
+                )
+                for resource in synced_resources
+            }
+            removed = [
+                resource.local_id
+                for resource in removed_resources
+                if resource.local_id in resources
+            ]
+
+            super().update_state(synced_resources, removed_resources)
+
+            # unchanged resources are passed on every run, they are not journaled
+            for local_id, old in before.items():
+                new = resources.get(local_id), fingerprints.get(local_id)
+                if new != old and local_id in resources:
+                    self._pending.append(
+                        {
+                            "op": "set",
+                            "id": local_id,
+                            "remote_id": new[0],
+                            "hash": new[1],
+                        }
+                    )
+            self._pending.extend(
+                {"op": "delete", "id": local_id} for local_id in removed
+            )
+
+    def mark_verified(self) -> None:
+        with self._update_lock:
+            super().mark_verified()
+            assert self._data.verified_at is not None
+            self._pending.append(
+                {"op": "verified", "at": self._data.verified_at.isoformat()}
+            )
+
+    def _journal_size(self) -> int:
+        return self.journal.stat().st_size if self.journal.exists() else 0
+
+    def _compaction_due(self) -> bool:
+        if not self.file.exists():
+            return True
+        journal_size = self._journal_size()
+        return (
+            journal_size >= self.compact_threshold
+            and journal_size >= self.file.stat().st_size
+        )
+
+    def _save(self) -> None:
+        if self._compaction_due():
+            self._compact()
+        elif self._pending:
+            self._append()
+        self._pending = []
+
+    def _append(self) -> None:
+        logger.debug(f"Appending {len(self._pending)} records to {self.journal.name}")
+        # in append mode, writes go to the end of the file wherever it is read
+        with self.journal.open("a+b") as f:
+            self._repair_tail(f)
+            f.writelines(
+                json.dumps(record, separators=(",", ":")).encode() + b"\n"
+                for record in self._pending
+            )
+            self._sync(f)
+
+    def _compact(self) -> None:
+        logger.debug(f"Compacting state to {self.file.name}")
+        tmp = self.file.with_name(self.file.name + ".tmp")
+        with tmp.open("w") as f:
+            f.write(self._data.json(separators=(",", ":")))
+            self._sync(f)
+        os.replace(tmp, self.file)
+        self.journal.unlink(missing_ok=True)
+        self._broken_tail_at = None
+
+    def _sync(self, f: Any) -> None:
+        if self.fsync:
+            f.flush()
+            os.fsync(f.fileno())
@@ -0,0 +1,197 @@
+from typing import Any, Collection, Iterable, Iterator, Optional
+
+import sqlite3
+from datetime import datetime, timedelta
+from itertools import islice
+from pathlib import Path
+
+from controller.resource import IdType
+from controller.state import (
+    RESOURCE_HASH_MAPPING,
+    RESOURCE_ID_MAPPING,
+    State,
+    StateData,
+    object_type,
+)
+from loguru import logger
+
+# sqlite limits the number of parameters of a statement
+LOOKUP_BATCH_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    local_id TEXT PRIMARY KEY,
+    object_type TEXT NOT NULL,
+    remote_id TEXT NOT NULL,
+    fingerprint TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS resources_object_type ON resources (object_type);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+"""
+
+
+def _batches(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class SqliteState(State):
+    """
+    State kept in a sqlite database, that is queried instead of being loaded.
+    Resources are looked up by the local_id primary key, and untracked ones
+    are found by a query against a temporary table of tracked ids,
+    so the state scales to millions of resources.
+
+    A state, that is saved, locks the database for writes from entering it
+    until exiting it. Changes are made in a transaction, that is committed
+    on saves, so checkpoints are durable and an unsaved run leaves no changes.
+    Dry runs and states with save_state=False only read in a deferred
+    transaction, so they do not wait for, nor block, other runs
+    """
+
+    def __init__(
+        self,
+        file: Path,
+        *,
+        save_state: bool,
+        persist_untracked: bool,
+        checkpoint_every: Optional[int] = None,
+        checkpoint_interval: Optional[timedelta] = None,
+        timeout: float = 5.0,
+    ):
+        """
+        :param timeout: seconds to wait for another process holding the database
+        """
+        super().__init__(
+            save_state=save_state,
+            persist_untracked=persist_untracked,
+            checkpoint_every=checkpoint_every,
+            checkpoint_interval=checkpoint_interval,
+        )
+        self.file = file
+        self.timeout = timeout
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            raise RuntimeError("SqliteState is used outside of `with` block")
+        return self._connection
+
+    def _lock(self) -> None:
+        # transactions are managed explicitly; checkpoints come from worker threads,
+        # which are serialized by _update_lock
+        self._connection = sqlite3.connect(
+            self.file,
+            timeout=self.timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self.connection.executescript(SCHEMA)
+        self.connection.execute("BEGIN IMMEDIATE" if self.saves else "BEGIN")
+        self.connection.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS tracked (local_id TEXT PRIMARY KEY)"
+        )
+
+    def _unlock(self) -> None:
+        if self._connection is None:
+            return
+        if self._connection.in_transaction:
+            # changes, that were not saved
+            self._connection.execute("ROLLBACK")
+        self._connection.close()
+        self._connection = None
+
+    def _load(self) -> None:
+        row = self.connection.execute(
+            "SELECT value FROM meta WHERE key = 'verified_at'"
+        ).fetchone()
+        self._data = StateData(
+            verified_at=datetime.fromisoformat(row[0]) if row and row[0] else None
+        )
+
+    def _save(self) -> None:
+        logger.debug(f"Committing state to {self.file.name}")
+        verified_at = self._data.verified_at
+        self.connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('verified_at', ?)",
+            (verified_at.isoformat() if verified_at else None,),
+        )
+        self.connection.execute("COMMIT")
+        self.connection.execute("BEGIN IMMEDIATE")
+
+    def _lookup(self, column: str, local_ids: Iterable[IdType]) -> dict[IdType, Any]:
+        found: dict[IdType, Any] = {}
+        with self._update_lock:
+            for batch in _batches(local_ids, LOOKUP_BATCH_SIZE):
+                placeholders = ", ".join("?" * len(batch))
+                found.update(
+                    self.connection.execute(
+                        f"SELECT local_id, {column} FROM resources "
+                        f"WHERE local_id IN ({placeholders})",
+                        batch,
+                    )
+                )
+        return found
+
+    def _lookup_remote_ids(self, local_ids: Iterable[IdType]) -> RESOURCE_ID_MAPPING:
+        return self._lookup("remote_id", local_ids)
+
+    def _lookup_fingerprints(
+        self, local_ids: Iterable[IdType]
+    ) -> RESOURCE_HASH_MAPPING:
+        return {
+            local_id: fingerprint
+            for local_id, fingerprint in self._lookup("fingerprint", local_ids).items()
+            if fingerprint is not None
+        }
+
+    def _iter_untracked(
+        self,
+        tracked_local_ids: Collection[IdType],
+        object_types: Optional[Collection[str]],
+    ) -> Iterator[tuple[IdType, IdType]]:
+        query = (
+            "SELECT local_id, remote_id FROM resources AS r "
+            "WHERE NOT EXISTS "
+            "(SELECT 1 FROM temp.tracked AS t WHERE t.local_id = r.local_id)"
+        )
+        parameters: list[str] = []
+        if object_types is not None:
+            parameters = list(object_types)
+            query += f" AND object_type IN ({', '.join('?' * len(parameters))})"
+
+        with self._update_lock:
+            self.connection.execute("DELETE FROM temp.tracked")
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO temp.tracked (local_id) VALUES (?)",
+                ((local_id,) for local_id in tracked_local_ids),
+            )
+            untracked = self.connection.execute(query, parameters).fetchall()
+            self.connection.execute("DELETE FROM temp.tracked")
+        yield from untracked
+
+    def _store(
+        self,
+        synced: Iterable[tuple[IdType, IdType, str]],
+        removed: Iterable[IdType],
+    ) -> None:
+        with self._update_lock:
+            self.connection.executemany(
+                "INSERT INTO resources (local_id, object_type, remote_id, fingerprint) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (local_id) DO UPDATE "
+                "SET remote_id = excluded.remote_id, fingerprint = excluded.fingerprint",
+                (
+                    (local_id, object_type(local_id), remote_id, fingerprint)
+                    for local_id, remote_id, fingerprint in synced
+                ),
+            )
+            self.connection.executemany(
+                "DELETE FROM resources WHERE local_id = ?",
+                ((local_id,) for local_id in removed),
+            )
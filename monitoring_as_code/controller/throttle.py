@@ -0,0 +1,292 @@
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus as Status
+
+from .handler import HttpResponse
+
+R = TypeVar("R", bound=HttpResponse)
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+# requests, that have the same effect when repeated
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+OVERLOAD_STATUSES = frozenset(
+    {
+        Status.TOO_MANY_REQUESTS,
+        Status.BAD_GATEWAY,
+        Status.SERVICE_UNAVAILABLE,
+        Status.GATEWAY_TIMEOUT,
+    }
+)
+
+
+# overloads, that the server answers without processing the request
+REJECTED_STATUSES = frozenset({Status.TOO_MANY_REQUESTS, Status.SERVICE_UNAVAILABLE})
+
+
+def is_overloaded(response: HttpResponse) -> bool:
+    return response.status_code in OVERLOAD_STATUSES
+
+
+def is_rejected(response: HttpResponse) -> bool:
+    return response.status_code in REJECTED_STATUSES
+
+
+def retry_after(response: Any) -> Optional[float]:
+    """
+    Seconds to wait according to the Retry-After header, if any
+    """
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+@dataclass(frozen=True)
+class BackoffPolicy:
+    """
+    Retries of overloaded requests with exponential backoff and full jitter.
+    Retry-After of a response is honoured instead of the backoff,
+    up to max_delay
+    """
+
+    retries: int = 5
+    base_delay: float = 0.1
+    max_delay: float = 10.0
+    multiplier: float = 2.0
+
+    def delay(self, attempt: int, response: Any) -> float:
+        """
+        :param attempt: number of the failed attempt, starting from 0
+        """
+        requested = retry_after(response)
+        if requested is not None:
+            return min(requested, self.max_delay)
+        ceiling = min(self.max_delay, self.base_delay * self.multiplier**attempt)
+        return random.uniform(0, ceiling)
+
+
+class AimdLimit:
+    """
+    Limit of requests in flight, adjusted by additive increase and
+    multiplicative decrease: it grows by one for every `limit` requests
+    served fine and is cut by `decrease` on overload.
+
+    Requests that started before a cut saw the old limit, so their overloads
+    do not cut it again; a burst of errors is a single cut
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 64,
+        decrease: float = 0.5,
+        latency_threshold: Optional[float] = None,
+    ):
+        """
+        :param latency_threshold: responses slower than that, seconds,
+            do not grow the limit
+        """
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError("limits must satisfy 1 <= minimum <= initial <= maximum")
+
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.latency_threshold = latency_threshold
+        self.in_flight = 0
+        # incremented on every cut
+        self.generation = 0
+
+    def can_start(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def start(self) -> int:
+        self.in_flight += 1
+        return self.generation
+
+    def finish(self, generation: int, overloaded: bool, latency: float) -> None:
+        self.in_flight -= 1
+        if overloaded:
+            if generation == self.generation:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+                self.generation += 1
+        elif self.latency_threshold is None or latency <= self.latency_threshold:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+
+class AdaptiveLimiter:
+    """
+    Thread safe AimdLimit, that blocks requests over the limit
+    """
+
+    def __init__(self, limit: AimdLimit):
+        self.limit = limit
+        self._condition = threading.Condition()
+
+    def acquire(self) -> int:
+        with self._condition:
+            self._condition.wait_for(self.limit.can_start)
+            return self.limit.start()
+
+    def release(self, generation: int, overloaded: bool, latency: float) -> None:
+        with self._condition:
+            self.limit.finish(generation, overloaded, latency)
+            self._condition.notify_all()
+
+
+class AsyncAdaptiveLimiter:
+    """
+    AdaptiveLimiter counterpart for coroutines of a single event loop
+    """
+
+    def __init__(self, limit: AimdLimit):
+        self.limit = limit
+        self._conditions: dict[asyncio.AbstractEventLoop, asyncio.Condition] = {}
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        # a condition is bound to the event loop it is first used in
+        loop = asyncio.get_running_loop()
+        if loop not in self._conditions:
+            self._conditions = {loop: asyncio.Condition()}
+        return self._conditions[loop]
+
+    async def acquire(self) -> int:
+        async with self.condition:
+            await self.condition.wait_for(self.limit.can_start)
+            return self.limit.start()
+
+    async def release(self, generation: int, overloaded: bool, latency: float) -> None:
+        async with self.condition:
+            self.limit.finish(generation, overloaded, latency)
+            self.condition.notify_all()
+
+
+class RetryPolicy:
+    """
+    Overloaded requests are retried, if repeating them is safe:
+    idempotent ones always, others only when the server rejected them
+    without processing, e.g. a POST that got a gateway timeout
+    may have created an object already
+    """
+
+    def __init__(
+        self,
+        overloaded: Callable[[HttpResponse], bool] = is_overloaded,
+        rejected: Callable[[HttpResponse], bool] = is_rejected,
+    ):
+        self.overloaded = overloaded
+        self.rejected = rejected
+
+    def retryable(self, method: str, response: HttpResponse) -> bool:
+        if not self.overloaded(response):
+            return False
+        return method.upper() in IDEMPOTENT_METHODS or self.rejected(response)
+
+
+class Throttle(RetryPolicy):
+    """
+    Sends requests, retrying overloaded ones with backoff, see RetryPolicy.
+    With a limiter, writes in flight are limited adaptively
+    """
+
+    def __init__(
+        self,
+        backoff: BackoffPolicy = BackoffPolicy(),
+        limiter: Optional[AdaptiveLimiter] = None,
+        overloaded: Callable[[HttpResponse], bool] = is_overloaded,
+        rejected: Callable[[HttpResponse], bool] = is_rejected,
+    ):
+        super().__init__(overloaded, rejected)
+        self.backoff = backoff
+        self.limiter = limiter
+
+    def _attempt(self, method: str, send: Callable[[], R]) -> R:
+        if self.limiter is None or method.upper() not in WRITE_METHODS:
+            return send()
+
+        generation = self.limiter.acquire()
+        started_at = time.perf_counter()
+        # a request failed without a response counts as overloaded
+        overloaded = True
+        try:
+            response = send()
+            overloaded = self.overloaded(response)
+            return response
+        finally:
+            self.limiter.release(
+                generation, overloaded, time.perf_counter() - started_at
+            )
+
+    def send(self, method: str, send: Callable[[], R]) -> R:
+        """
+        :param send: makes an attempt of the request
+        :return: the first response, that is not retryable,
+            or the last one, once retries are exhausted
+        """
+        attempt = 0
+        while True:
+            response = self._attempt(method, send)
+            if attempt >= self.backoff.retries or not self.retryable(method, response):
+                return response
+            time.sleep(self.backoff.delay(attempt, response))
+            attempt += 1
+
+
+class AsyncThrottle(RetryPolicy):
+    """
+    Throttle counterpart for coroutines
+    """
+
+    def __init__(
+        self,
+        backoff: BackoffPolicy = BackoffPolicy(),
+        limiter: Optional[AsyncAdaptiveLimiter] = None,
+        overloaded: Callable[[HttpResponse], bool] = is_overloaded,
+        rejected: Callable[[HttpResponse], bool] = is_rejected,
+    ):
+        super().__init__(overloaded, rejected)
+        self.backoff = backoff
+        self.limiter = limiter
+
+    async def _attempt(self, method: str, send: Callable[[], Awaitable[R]]) -> R:
+        if self.limiter is None or method.upper() not in WRITE_METHODS:
+            return await send()
+
+        generation = await self.limiter.acquire()
+        started_at = time.perf_counter()
+        overloaded = True
+        try:
+            response = await send()
+            overloaded = self.overloaded(response)
+            return response
+        finally:
+            await self.limiter.release(
+                generation, overloaded, time.perf_counter() - started_at
+            )
+
+    async def send(self, method: str, send: Callable[[], Awaitable[R]]) -> R:
+        attempt = 0
+        while True:
+            response = await self._attempt(method, send)
+            if attempt >= self.backoff.retries or not self.retryable(method, response):
+                return response
+            await asyncio.sleep(self.backoff.delay(attempt, response))
+            attempt += 1
@@ -1,12 +1,40 @@
+from typing import Awaitable, Iterable, Iterator, TypeVar
+
+import asyncio
+from itertools import islice
+
 from .obj import MonitoringObject
 from .resource import LocalResource, ObsoleteResource
 
+R = TypeVar("R")
+
 
 def get_resource_object_type_name(
     r: LocalResource[MonitoringObject] | ObsoleteResource[MonitoringObject],
 ) -> str:
-    match r:
-        case LocalResource(local_object=obj):
-            return type(obj).__name__
-        case ObsoleteResource(local_id=local_id):
-            return local_id.split(".", maxsplit=1)[0]
+    return r.object_type_name
+
+
+async def gather_bounded(limit: int, awaitables: Iterable[Awaitable[R]]) -> list[R]:
+    """
+    asyncio.gather, that keeps at most `limit` awaitables running at once
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(awaitable: Awaitable[R]) -> R:
+        async with semaphore:
+            return await awaitable
+
+    return list(await asyncio.gather(*(run(aw) for aw in awaitables)))
+
+
+def iter_chunks(items: Iterable[R], chunk_size: int) -> Iterator[list[R]]:
+    """
+    Consume any iterable lazily in lists of at most chunk_size items
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive number")
+
+    iterator = iter(items)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
@@ -0,0 +1,44 @@
+from types import ModuleType
+from typing import Any, Callable, Optional, cast
+
+import importlib
+import json
+
+from pydantic import BaseModel
+from pydantic.json import pydantic_encoder
+
+# installed with the `orjson` extra
+try:
+    orjson: Optional[ModuleType] = importlib.import_module("orjson")
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+__all__ = [
+    "wire_dumps",
+    "wire_json",
+]
+
+
+def wire_dumps(data: Any, default: Callable[[Any], Any] = pydantic_encoder) -> bytes:
+    """
+    Compact json of a request body: no indentation, spaces and key sorting,
+    unlike the canonical json of MonitoringObject, that is made for diffs.
+    orjson is used, if it is installed (the `orjson` extra)
+
+    :param default: serializes values, that json does not support
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=default)
+    return json.dumps(
+        data, default=default, separators=(",", ":"), ensure_ascii=False
+    ).encode()
+
+
+def wire_json(model: BaseModel, **kwargs: Any) -> bytes:
+    """
+    Compact json of a model, same content as model.json(**kwargs)
+
+    :param kwargs: passed to model.dict, e.g. by_alias
+    """
+    encoder = cast(Callable[[Any], Any], model.__json_encoder__)
+    return wire_dumps(model.dict(**kwargs), default=encoder)
@@ -0,0 +1,36 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Grafana binds import the controller as a top-level package
+sys.path.insert(0, str(Path(__file__).parents[2] / "monitoring_as_code"))
+
+from binds.grafana.fake import FakeGrafana, FakeGrafanaSession  # noqa: E402
+from controller.state import State  # noqa: E402
+from controller.states import FileState, JournaledFileState, SqliteState  # noqa: E402
+
+
+@pytest.fixture
+def grafana() -> FakeGrafana:
+    return FakeGrafana()
+
+
+@pytest.fixture
+def session(grafana) -> FakeGrafanaSession:
+    return FakeGrafanaSession(grafana)
+
+
+@pytest.fixture(
+    params=[
+        pytest.param(FileState, id="file state"),
+        pytest.param(JournaledFileState, id="journaled state"),
+        pytest.param(SqliteState, id="sqlite state"),
+    ]
+)
+def state(request, tmp_path) -> State:
+    return request.param(
+        tmp_path / "state",
+        save_state=True,
+        persist_untracked=False,
+    )
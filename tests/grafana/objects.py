@@ -0,0 +1,42 @@
+from binds.grafana.client.alert_queries import PrometheusQuery
+from binds.grafana.client.alerting import AlertQuery, PostableGrafanaRule
+from binds.grafana.client.types import Duration, RelativeTimeRange
+from binds.grafana.objects import Alert, Folder
+
+
+def make_alert(
+    folder_title: str,
+    title: str,
+    interval: str = "1m",
+    expr: str = "up",
+) -> Alert:
+    query = AlertQuery(
+        datasourceUid="PrometheusUID",
+        relativeTimeRange=RelativeTimeRange(from_=600),
+        model=PrometheusQuery(refId="A", expr=expr),
+    )
+    return Alert(
+        folder_title=folder_title,
+        evaluation_interval=Duration(interval),
+        grafana_alert=PostableGrafanaRule(
+            condition=query.refId,
+            title=title,
+            data=[query],
+        ),
+    )
+
+
+def make_objects(
+    folder_count: int,
+    alerts_per_folder: int,
+    **alert_kwargs: str,
+) -> list[Folder | Alert]:
+    objects: list[Folder | Alert] = []
+    for folder_idx in range(folder_count):
+        folder = Folder(title=f"folder{folder_idx}")
+        objects.append(folder)
+        objects.extend(
+            make_alert(folder.title, f"alert{alert_idx}", **alert_kwargs)
+            for alert_idx in range(alerts_per_folder)
+        )
+    return objects
@@ -0,0 +1,114 @@
+import pytest
+from binds.grafana.handlers.alert import (
+    AlertHandler,
+    NamespaceIndex,
+    alert_to_singleton_group,
+)
+from controller.resource import LocalResource, MappedResource, SyncedResource
+
+from tests.grafana.objects import make_alert
+
+# route of the fake Grafana, that serves read_namespace
+NAMESPACE_READS = "GET ruler/grafana/api/v1/rules/{namespace}"
+
+
+def mapped(folder_title: str, title: str, remote_id: str) -> MappedResource:
+    return MappedResource(
+        local_object=make_alert(folder_title, title), remote_id=remote_id
+    )
+
+
+class TestNamespaceIndex:
+    @pytest.fixture
+    def index(self) -> NamespaceIndex:
+        return NamespaceIndex(
+            [
+                alert_to_singleton_group(make_alert("folder", "first"), uid="uid1"),
+                alert_to_singleton_group(make_alert("folder", "second"), uid="uid2"),
+            ]
+        )
+
+    def test_groups(self, index):
+        assert index.groups.keys() == {"first", "second"}
+        assert index.by_uid.keys() == {"uid1", "uid2"}
+        assert index.by_title.keys() == {"first", "second"}
+
+    def test_found_by_uid(self, index):
+        # the rule was renamed remotely, its uid is still known
+        group = index.find(make_alert("folder", "renamed"), "uid2")
+
+        assert group is index.groups["second"]
+
+    def test_found_by_title(self, index):
+        group = index.find(make_alert("folder", "first"), "unknown")
+
+        assert group is index.groups["first"]
+
+    def test_missing(self, index):
+        assert index.find(make_alert("folder", "third"), "unknown") is None
+        assert NamespaceIndex([]).find(make_alert("folder", "first"), "uid1") is None
+
+
+class TestReadMany:
+    @pytest.fixture
+    def handler(self, grafana, session) -> AlertHandler:
+        for folder_title in ("f1", "f2", "empty"):
+            grafana.handle("POST", "folders", {}, {"title": folder_title})
+
+        handler = AlertHandler(session)
+        for folder_title, title in (("f1", "a"), ("f1", "b"), ("f2", "a")):
+            handler.write(LocalResource(local_object=make_alert(folder_title, title)))
+        grafana.requests.clear()
+        return handler
+
+    def uid(self, grafana, folder_title: str, title: str) -> str:
+        folder_uid = grafana.folder_uids[folder_title]
+        (rule,) = grafana.namespaces[folder_uid][title]["rules"]
+        return rule["grafana_alert"]["uid"]
+
+    def test_grouped_by_folder(self, handler, grafana):
+        resources = [
+            mapped("f1", "a", "unknown"),
+            mapped("f2", "a", self.uid(grafana, "f2", "a")),
+            mapped("f1", "b", self.uid(grafana, "f1", "b")),
+        ]
+
+        read = handler.read_many(resources)
+
+        # a request per folder, not per alert
+        assert grafana.requests == {NAMESPACE_READS: 2}
+        assert all(isinstance(resource, SyncedResource) for resource in read)
+        assert {
+            (r.local_object.folder_title, r.local_object.grafana_alert.title): (
+                r.remote_id
+            )
+            for r in read
+        } == {
+            ("f1", "a"): self.uid(grafana, "f1", "a"),
+            ("f1", "b"): self.uid(grafana, "f1", "b"),
+            ("f2", "a"): self.uid(grafana, "f2", "a"),
+        }
+        assert read[0].remote_object.folder_title == "f1"
+
+    def test_missing_rules(self, handler, grafana):
+        resources = [
+            mapped("f1", "missing", "unknown"),
+            mapped("empty", "a", "unknown"),
+            mapped("no folder", "a", "unknown"),
+        ]
+
+        read = handler.read_many(resources)
+
+        assert [type(resource) for resource in read] == [LocalResource] * 3
+        assert grafana.requests == {NAMESPACE_READS: 3}
+
+    def test_read_namespace(self, handler, grafana):
+        index = handler.read_namespace("f1")
+
+        assert index.groups.keys() == {"a", "b"}
+        assert index.by_uid.keys() == {
+            self.uid(grafana, "f1", "a"),
+            self.uid(grafana, "f1", "b"),
+        }
+        assert handler.read_namespace("empty").groups == {}
+        assert handler.read_namespace("no folder").groups == {}
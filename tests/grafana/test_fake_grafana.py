@@ -0,0 +1,136 @@
+import threading
+from http import HTTPStatus as Status
+
+import pytest
+from binds.grafana.fake import FakeGrafana, FakeGrafanaOptions, FakeGrafanaSession
+
+from tests.grafana.objects import make_alert
+
+GROUP = {
+    "name": "group",
+    "interval": "1m",
+    "rules": [
+        make_alert("folder", "alert").dict(by_alias=True, exclude={"folder_title"})
+    ],
+}
+
+
+@pytest.fixture
+def folder_uid(session) -> str:
+    response = session.post("folders", json={"title": "folder"})
+    assert response.status_code == Status.OK
+    return response.json()["uid"]
+
+
+class TestFolders:
+    def test_crud(self, session, folder_uid):
+        assert session.get(f"folders/{folder_uid}").json()["title"] == "folder"
+
+        response = session.put(
+            f"folders/{folder_uid}", json={"title": "renamed", "overwrite": True}
+        )
+        assert response.json()["title"] == "renamed"
+
+        assert session.delete(f"folders/{folder_uid}").status_code == Status.OK
+        assert session.get(f"folders/{folder_uid}").status_code == Status.NOT_FOUND
+
+    def test_title_conflict(self, session, folder_uid):
+        response = session.post("folders", json={"title": "folder"})
+        assert response.status_code == Status.CONFLICT
+
+    def test_delete_with_rules(self, session, folder_uid):
+        session.post("ruler/grafana/api/v1/rules/folder", json=GROUP)
+
+        response = session.delete(
+            f"folders/{folder_uid}", data={"forceDeleteRules": False}
+        )
+        assert response.status_code == Status.BAD_REQUEST
+
+
+class TestRuler:
+    def test_post_group(self, session, folder_uid):
+        response = session.post("ruler/grafana/api/v1/rules/folder", json=GROUP)
+        assert response.status_code == Status.ACCEPTED
+
+        group = session.get("ruler/grafana/api/v1/rules/folder/group").json()
+        (rule,) = group["rules"]
+        assert rule["grafana_alert"]["uid"]
+        assert rule["grafana_alert"]["namespace_uid"] == folder_uid
+
+        namespace = session.get("ruler/grafana/api/v1/rules/folder").json()
+        assert namespace == {"folder": [group]}
+
+    def test_update_keeps_uid(self, session, folder_uid):
+        session.post("ruler/grafana/api/v1/rules/folder", json=GROUP)
+        rule = session.get("ruler/grafana/api/v1/rules/folder/group").json()["rules"][0]
+
+        session.post(
+            "ruler/grafana/api/v1/rules/folder", json={**GROUP, "rules": [rule]}
+        )
+
+        (updated,) = session.get("ruler/grafana/api/v1/rules/folder/group").json()[
+            "rules"
+        ]
+        assert updated["grafana_alert"]["uid"] == rule["grafana_alert"]["uid"]
+        assert updated["grafana_alert"]["version"] == 2
+
+    def test_unknown_uid(self, session, folder_uid):
+        rule = {**GROUP["rules"][0]}
+        rule["grafana_alert"] = {**rule["grafana_alert"], "uid": "unknown"}
+
+        response = session.post(
+            "ruler/grafana/api/v1/rules/folder", json={**GROUP, "rules": [rule]}
+        )
+        assert response.status_code == Status.BAD_REQUEST
+
+    def test_title_unique_in_folder(self, session, folder_uid):
+        session.post("ruler/grafana/api/v1/rules/folder", json=GROUP)
+
+        response = session.post(
+            "ruler/grafana/api/v1/rules/folder", json={**GROUP, "name": "other"}
+        )
+        assert response.status_code == Status.CONFLICT
+
+    def test_delete_group(self, session, folder_uid, grafana):
+        session.post("ruler/grafana/api/v1/rules/folder", json=GROUP)
+
+        response = session.delete("ruler/grafana/api/v1/rules/folder/group")
+        assert response.status_code == Status.ACCEPTED
+        assert grafana.rule_locations == {}
+        assert session.get("ruler/grafana/api/v1/rules/folder").json() == {}
+
+    def test_requests_counted(self, session, folder_uid, grafana):
+        session.get("ruler/grafana/api/v1/rules/folder")
+
+        assert grafana.requests == {
+            "POST folders": 1,
+            "GET ruler/grafana/api/v1/rules/{namespace}": 1,
+        }
+
+
+class TestSimulation:
+    def test_errors(self):
+        session = FakeGrafanaSession(FakeGrafana(FakeGrafanaOptions(error_rate=1)))
+
+        response = session.post("folders", json={"title": "folder"})
+        assert response.status_code == Status.SERVICE_UNAVAILABLE
+        assert session.grafana.folders == {}
+
+    def test_write_lock_contention(self):
+        grafana = FakeGrafana(FakeGrafanaOptions(write_duration=0.2, lock_timeout=0.05))
+        statuses: list[int] = []
+
+        def create(title):
+            response = FakeGrafanaSession(grafana).post(
+                "folders", json={"title": title}
+            )
+            statuses.append(response.status_code)
+
+        threads = [threading.Thread(target=create, args=(t,)) for t in "ab"]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(statuses) == [Status.OK, Status.INTERNAL_SERVER_ERROR]
+        assert len(grafana.folders) == 1
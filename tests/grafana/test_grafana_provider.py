@@ -0,0 +1,365 @@
+import asyncio
+import threading
+from collections import Counter
+
+import pytest
+from binds.grafana.async_grafana_provider import AsyncGrafanaProvider
+from binds.grafana.client.alerting import NoDataState
+from binds.grafana.fake import FakeGrafana, FakeGrafanaOptions, FakeGrafanaSession
+from binds.grafana.grafana_provider import GrafanaProvider
+from binds.grafana.objects import Alert
+from binds.grafana.throttle import grafana_throttle
+from controller.index import ResourceIndex
+from controller.monitor import Monitor
+from controller.report import RunReport
+from controller.resource import LocalResource, ResourceOps
+from controller.throttle import AimdLimit, BackoffPolicy
+from requests import HTTPError, Session
+
+from tests.grafana.objects import make_objects
+
+PROVIDER_OPTIONS = [
+    pytest.param({}, id="singleton groups"),
+    pytest.param({"bulk_read": True}, id="bulk read"),
+    pytest.param({"group_alerts": True, "bulk_read": True}, id="grouped"),
+    pytest.param({"optimistic_writes": True}, id="optimistic"),
+    pytest.param(
+        {"group_alerts": True, "optimistic_writes": True, "verify_writes": True},
+        id="grouped optimistic",
+    ),
+]
+
+
+class ClosingSession(FakeGrafanaSession):
+    closed = False
+
+    def close(self) -> None:
+        self.closed = True
+        super().close()
+
+
+def remote_alerts(grafana) -> dict[str, dict[str, str]]:
+    """
+    Expression of every alert by folder title and alert title
+    """
+    alerts: dict[str, dict[str, str]] = {}
+    for folder_uid, groups in grafana.namespaces.items():
+        folder_title = grafana.folders[folder_uid]["title"]
+        for group in groups.values():
+            for rule in group["rules"]:
+                alert = rule["grafana_alert"]
+                alerts.setdefault(folder_title, {})[alert["title"]] = alert["data"][0][
+                    "model"
+                ]["expr"]
+    return alerts
+
+
+def tracked(state) -> dict[str, str]:
+    """
+    Remote ids of resources in the state by local id
+    """
+    with state:
+        return {
+            resource.local_id: resource.remote_id
+            for resource in state.get_untracked_resources_by_ids(set())
+        }
+
+
+def apply(monitor, objects, **kwargs) -> RunReport:
+    if any(isinstance(p, AsyncGrafanaProvider) for p in monitor._providers):
+        return asyncio.run(
+            monitor.apply_monitoring_state_async(objects, dry_run=False, **kwargs)
+        )
+    return monitor.apply_monitoring_state(objects, dry_run=False, **kwargs)
+
+
+class TestGrafanaProvider:
+    @pytest.fixture(params=PROVIDER_OPTIONS)
+    def provider(self, request, session):
+        return GrafanaProvider(session, **request.param)
+
+    @pytest.fixture
+    def monitor(self, provider, state):
+        return Monitor(providers=[provider], state=state)
+
+    def test_lifecycle(self, monitor, grafana, state):
+        apply(monitor, make_objects(2, 3))
+        assert remote_alerts(grafana) == {
+            f"folder{f}": {f"alert{a}": "up" for a in range(3)} for f in range(2)
+        }
+        assert len(tracked(state)) == 8
+
+        grafana.requests.clear()
+        apply(monitor, make_objects(2, 3))
+        assert all(request.startswith("GET") for request in grafana.requests)
+
+        apply(monitor, make_objects(2, 3, expr="down"))
+        assert remote_alerts(grafana) == {
+            f"folder{f}": {f"alert{a}": "down" for a in range(3)} for f in range(2)
+        }
+        uids = {uid for uid, _ in grafana.rule_locations.items()}
+        assert uids == set(tracked(state).values()) - set(grafana.folders)
+
+        apply(monitor, make_objects(1, 1, expr="down"))
+        assert remote_alerts(grafana) == {"folder0": {"alert0": "down"}}
+
+        apply(monitor, [])
+        assert grafana.folders == {}
+        assert tracked(state) == {}
+
+    def test_http_stats(self, monitor, provider, grafana):
+        apply(monitor, make_objects(2, 3))
+        grafana.requests.clear()
+
+        report = apply(monitor, make_objects(2, 3, expr="down"))
+
+        http_stats = report.providers[provider].http_stats
+        counts = {endpoint: stats.count for endpoint, stats in http_stats}
+        assert sum(counts.values()) == sum(grafana.requests.values())
+        assert counts.keys() <= {
+            "GET folders/{uid}",
+            "GET ruler/grafana/api/v1/rules/{folder}",
+            "GET ruler/grafana/api/v1/rules/{folder}/{group}",
+            "POST ruler/grafana/api/v1/rules/{folder}",
+        }
+        assert all(
+            status < 300 for _, stats in http_stats for status in stats.status_codes
+        )
+        assert all(stats.bytes_received for _, stats in http_stats)
+
+    def test_resume(self, monitor, provider, grafana, state, monkeypatch):
+        report_applied = provider.report_applied
+        reports = []
+
+        def fail_midway(synced=(), removed=()):
+            report_applied(synced, removed)
+            reports.append(synced)
+            if len(reports) == 3:
+                raise RuntimeError("killed")
+
+        monkeypatch.setattr(provider, "report_applied", fail_midway)
+        with pytest.raises(RuntimeError):
+            apply(monitor, make_objects(2, 3))
+        assert tracked(state)
+        monkeypatch.undo()
+
+        apply(monitor, make_objects(2, 3))
+
+        # objects created by the failed run are not created again
+        assert remote_alerts(grafana) == {
+            f"folder{f}": {f"alert{a}": "up" for a in range(3)} for f in range(2)
+        }
+        assert len(grafana.folders) == 2
+        assert len(grafana.rule_locations) == 6
+
+    def test_nested_change(self, monitor, grafana):
+        objects = make_objects(1, 1)
+        apply(monitor, objects)
+
+        objects[1].grafana_alert.no_data_state = NoDataState.OK
+        report = apply(monitor, objects, fast_plan=True)
+
+        assert report.counts[ResourceOps.UPDATE] == 1
+        (group,) = next(iter(grafana.namespaces.values())).values()
+        assert group["rules"][0]["grafana_alert"]["no_data_state"] == "OK"
+
+    def test_types_from_index(self, monitor, provider, monkeypatch):
+        group_by_type = ResourceIndex.group_by_type
+        grouped = []
+
+        def spy(index, resources):
+            result = group_by_type(index, resources)
+            grouped.append(set(result))
+            return result
+
+        monkeypatch.setattr(ResourceIndex, "group_by_type", spy)
+        apply(monitor, make_objects(1, 2))
+
+        assert {"Folder", "Alert"} in grouped
+        # the index is only set for the time of the run
+        assert provider._index is None
+
+        # without Monitor, types are derived from the resources
+        grouped.clear()
+        resources = [LocalResource(local_object=obj) for obj in make_objects(1, 1)]
+        assert provider.group_by_type(resources).keys() == {"Folder", "Alert"}
+        assert grouped == []
+
+
+def test_grouped_alerts_read_by_folder(session, grafana, state):
+    monitor = Monitor(
+        providers=[GrafanaProvider(session, group_alerts=True)], state=state
+    )
+    apply(monitor, make_objects(1, 5))
+    grafana.requests.clear()
+
+    apply(monitor, make_objects(1, 5))
+
+    assert grafana.requests["GET ruler/grafana/api/v1/rules/{namespace}"] == 1
+
+
+class TestOptimisticWrites:
+    NAMESPACE_READS = "GET ruler/grafana/api/v1/rules/{namespace}"
+    GROUP_READS = "GET ruler/grafana/api/v1/rules/{namespace}/{group}"
+    WRITES = "POST ruler/grafana/api/v1/rules/{namespace}"
+
+    @pytest.fixture(params=[False, True], ids=["written", "verified"])
+    def verify_writes(self, request):
+        return request.param
+
+    @pytest.fixture
+    def monitor(self, session, state, verify_writes):
+        provider = GrafanaProvider(
+            session, optimistic_writes=True, verify_writes=verify_writes
+        )
+        return Monitor(providers=[provider], state=state)
+
+    def test_created_read_back(self, monitor, grafana, state):
+        apply(monitor, make_objects(2, 3))
+
+        # uids assigned by Grafana are read with a request per folder
+        assert grafana.requests[self.NAMESPACE_READS] == 2
+        assert grafana.requests[self.WRITES] == 6
+        assert set(grafana.rule_locations) == set(tracked(state).values()) - set(
+            grafana.folders
+        )
+
+    def test_updated_read_back_if_verified(
+        self, monitor, grafana, state, verify_writes
+    ):
+        apply(monitor, make_objects(2, 3))
+        tracked_before = tracked(state)
+        grafana.requests.clear()
+
+        report = apply(monitor, make_objects(2, 3, expr="down"))
+
+        assert report.counts[ResourceOps.UPDATE] == 6
+        # alerts are read one by one to plan the run, not after writes
+        assert grafana.requests[self.GROUP_READS] == 6
+        assert grafana.requests[self.NAMESPACE_READS] == (2 if verify_writes else 0)
+        assert tracked(state) == tracked_before
+        assert remote_alerts(grafana) == {
+            f"folder{f}": {f"alert{a}": "down" for a in range(3)} for f in range(2)
+        }
+
+
+class TestConcurrentGrafanaProvider(TestGrafanaProvider):
+    @pytest.fixture(params=PROVIDER_OPTIONS)
+    def provider(self, request, session, grafana):
+        return GrafanaProvider(
+            session,
+            max_workers=4,
+            session_factory=lambda: FakeGrafanaSession(grafana),
+            **request.param,
+        )
+
+    def test_handlers_per_thread(self, grafana):
+        sessions: dict[int, ClosingSession] = {}
+
+        def session_factory():
+            session = ClosingSession(grafana)
+            sessions[threading.get_ident()] = session
+            return session
+
+        http_session = ClosingSession(grafana)
+        provider = GrafanaProvider(
+            http_session, max_workers=4, session_factory=session_factory
+        )
+        # every worker is busy at once, so each one takes a task
+        barrier = threading.Barrier(4)
+
+        def handler_client(_):
+            barrier.wait(timeout=5)
+            return threading.get_ident(), provider._get_handler(Alert).client
+
+        for _ in range(2):
+            clients = provider._map(handler_client, range(4))
+
+            assert len({thread for thread, _ in clients}) == 4
+            assert all(client is sessions[thread] for thread, client in clients)
+        # handlers of a thread are reused
+        assert len(sessions) == 4
+
+        provider.dispose()
+
+        assert all(session.closed for session in sessions.values())
+        assert not http_session.closed
+
+
+class TestSharedSessionGrafanaProvider(TestGrafanaProvider):
+    @pytest.fixture(params=PROVIDER_OPTIONS)
+    def provider(self, request, grafana):
+        return GrafanaProvider(
+            FakeGrafanaSession(grafana, pool_size=4),
+            max_workers=4,
+            **request.param,
+        )
+
+    def test_small_pool_rejected(self, grafana):
+        with pytest.raises(ValueError):
+            GrafanaProvider(FakeGrafanaSession(grafana, pool_size=2), max_workers=4)
+
+    def test_plain_session_rejected(self):
+        with pytest.raises(ValueError):
+            GrafanaProvider(Session(), max_workers=4)
+
+
+class TestAsyncGrafanaProvider(TestGrafanaProvider):
+    @pytest.fixture(params=PROVIDER_OPTIONS)
+    def provider(self, request, grafana):
+        httpx = pytest.importorskip("httpx")
+        from binds.grafana.fake.httpx_transport import AsyncFakeGrafanaTransport
+
+        client = httpx.AsyncClient(
+            base_url="http://grafana.fake/api/",
+            transport=AsyncFakeGrafanaTransport(grafana),
+        )
+        return AsyncGrafanaProvider(client, **request.param)
+
+
+class TestThrottledGrafanaProvider:
+    @pytest.fixture
+    def grafana(self) -> FakeGrafana:
+        # a sqlite backed Grafana under load: writes wait for the database lock
+        # and fail when it is held too long, some requests are rejected
+        return FakeGrafana(
+            FakeGrafanaOptions(
+                error_rate=0.2,
+                error_status=429,
+                retry_after=0,
+                write_duration=0.002,
+                lock_timeout=0.001,
+                seed=0,
+            )
+        )
+
+    def test_lifecycle(self, grafana, session, state):
+        provider = GrafanaProvider(
+            session,
+            max_workers=8,
+            throttle=grafana_throttle(
+                BackoffPolicy(retries=20, base_delay=0.001, max_delay=0.01),
+                AimdLimit(initial=8, maximum=8),
+            ),
+        )
+        monitor = Monitor(providers=[provider], state=state)
+
+        report = apply(monitor, make_objects(2, 10))
+
+        assert remote_alerts(grafana) == {
+            f"folder{f}": {f"alert{a}": "up" for a in range(10)} for f in range(2)
+        }
+        statuses = sum(
+            (stats.status_codes for _, stats in report.providers[provider].http_stats),
+            Counter(),
+        )
+        assert statuses[429] and statuses[500]
+
+        apply(monitor, [])
+        assert grafana.folders == {}
+
+    def test_without_throttle(self, grafana, session, state):
+        monitor = Monitor(providers=[GrafanaProvider(session)], state=state)
+
+        with pytest.raises(HTTPError):
+            apply(monitor, make_objects(2, 10))
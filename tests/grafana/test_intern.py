@@ -0,0 +1,120 @@
+import copy
+import gc
+import pickle
+
+import pytest
+from binds.grafana.client.alert_queries import PrometheusQuery
+from binds.grafana.client.alert_queries.classic_conditions import (
+    GT,
+    ClassicCondition,
+    Reducers,
+)
+from binds.grafana.client.alerting import AlertQuery
+from binds.grafana.client.intern import InternedDict, InternPool
+from binds.grafana.client.types import RelativeTimeRange
+from binds.grafana.handlers.alert import alert_to_singleton_group
+from binds.grafana.objects.alert import AlertGroup
+
+from tests.grafana.objects import make_alert
+
+
+def test_local_queries_shared():
+    first, second = make_alert("folder", "first"), make_alert("folder", "second")
+
+    assert first.grafana_alert.data[0] is second.grafana_alert.data[0]
+    assert make_alert("folder", "third", expr="down").grafana_alert.data[0] != (
+        first.grafana_alert.data[0]
+    )
+
+
+def test_parsed_queries_shared():
+    groups = [
+        AlertGroup.parse_raw(alert_to_singleton_group(make_alert("f", title)).json())
+        for title in ("first", "second")
+    ]
+
+    first, second = (group.rules[0].grafana_alert for group in groups)
+    assert first.data[0] is second.data[0]
+    assert first.data[0].relativeTimeRange is second.data[0].relativeTimeRange
+
+
+def test_labels_shared():
+    alert = make_alert("folder", "first").copy(update={"labels": None})
+    labeled = [
+        type(alert)(**{**alert.dict(), "labels": {"team": "core"}}) for _ in range(2)
+    ]
+
+    assert labeled[0].labels is labeled[1].labels
+    with pytest.raises(TypeError):
+        labeled[0].labels["team"] = "other"
+    # copies and pickles of alerts keep working
+    assert copy.deepcopy(labeled[0]) == labeled[0]
+    assert pickle.loads(pickle.dumps(labeled[0])) == labeled[0]
+
+
+@pytest.mark.parametrize(
+    "model, field, value",
+    [
+        (make_alert("folder", "first").grafana_alert.data[0], "refId", "B"),
+        (RelativeTimeRange(from_=600), "to", 60),
+        (PrometheusQuery(refId="A", expr="up"), "expr", "down"),
+        (GT(param=1), "param", 2),
+        (
+            ClassicCondition(reducer=Reducers.LAST, query="A", evaluator=GT(param=1)),
+            "query",
+            "B",
+        ),
+    ],
+)
+def test_interned_models_immutable(model, field, value):
+    with pytest.raises(TypeError):
+        setattr(model, field, value)
+
+    # a changed copy is made instead
+    changed = model.copy(update={field: value})
+    assert getattr(changed, field) == value
+    assert getattr(model, field) != value
+
+
+def test_alert_edited_by_assignment():
+    alert = make_alert("folder", "first")
+    alert = type(alert)(**{**alert.dict(), "labels": {"team": "core"}})
+    query = alert.grafana_alert.data[0]
+
+    with pytest.raises(TypeError):
+        alert.labels["team"] = "other"
+    with pytest.raises(TypeError):
+        query.model.expr = "down"
+
+    alert.labels = {**alert.labels, "team": "other"}
+    alert.grafana_alert.data = [
+        query.copy(update={"model": query.model.copy(update={"expr": "down"})})
+    ]
+    assert alert.labels == {"team": "other"}
+    assert alert.grafana_alert.data[0].model.expr == "down"
+    # the shared query of other alerts is left as it was
+    assert make_alert("folder", "second").grafana_alert.data[0].model.expr == "up"
+
+
+def test_types_kept_apart():
+    pool = InternPool()
+
+    assert pool.intern(InternedDict(value=1)) is not pool.intern(
+        InternedDict(value=1.0)
+    )
+    assert pool.intern(RelativeTimeRange(from_=1)) is pool.intern(
+        RelativeTimeRange(from_=1)
+    )
+
+
+def test_unused_values_released():
+    pool = InternPool()
+    pool.intern(
+        AlertQuery(
+            relativeTimeRange=RelativeTimeRange(from_=600),
+            model=PrometheusQuery(refId="A", expr="up"),
+        )
+    )
+    gc.collect()
+
+    assert len(pool) == 0
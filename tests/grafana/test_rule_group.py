@@ -0,0 +1,102 @@
+from typing import Optional
+
+from binds.grafana.handlers.alert import NamespaceIndex, alert_to_rule
+from binds.grafana.handlers.rule_group import optimistic_results, plan_folder_changes
+from binds.grafana.objects.alert import Alert, AlertGroup
+from controller.resource import LocalResource, ObsoleteResource, SyncedResource
+
+from tests.grafana.objects import make_alert
+
+
+def make_index(*rules: tuple[str, str, str]) -> NamespaceIndex:
+    """
+    :param rules: title, interval and uid of every rule
+    """
+    groups: dict[str, AlertGroup] = {}
+    for title, interval, uid in rules:
+        alert = make_alert("folder", title, interval=interval)
+        group = groups.setdefault(
+            interval,
+            AlertGroup(name=f"every {interval}", interval=interval, rules=[]),
+        )
+        group.rules.append(alert_to_rule(alert, uid))
+    return NamespaceIndex(groups.values())
+
+
+def synced(title: str, interval: str, uid: str) -> SyncedResource[Alert]:
+    alert = make_alert("folder", title, interval=interval)
+    return SyncedResource(local_object=alert, remote_id=uid, remote_object=alert)
+
+
+def obsolete(title: str, uid: str) -> ObsoleteResource[Alert]:
+    return ObsoleteResource(local_id=f"Alert.folder/{title}", remote_id=uid)
+
+
+def written_rules(groups) -> dict[str, Optional[list[tuple[str, Optional[str]]]]]:
+    """
+    Title and uid of rules of every written group, None for deleted groups
+    """
+    return {
+        name: [
+            (rule.grafana_alert.title, rule.grafana_alert.uid) for rule in group.rules
+        ]
+        if group is not None
+        else None
+        for name, group in groups.writes()
+    }
+
+
+def test_rule_moved_between_intervals():
+    index = make_index(("a", "1m", "uid1"), ("b", "1m", "uid2"))
+    moved = synced("a", "5m", "uid1")
+
+    groups = plan_folder_changes(index, [], [moved], [])
+
+    # the old group is written first, so the rule never exists twice
+    assert [name for name, _ in groups.writes()] == ["every 1m", "every 5m"]
+    # the moved rule is re-created in the group of its interval
+    assert written_rules(groups) == {
+        "every 1m": [("b", "uid2")],
+        "every 5m": [("a", None)],
+    }
+    assert optimistic_results(groups, [moved]) == []
+
+
+def test_last_rule_removed():
+    index = make_index(("a", "1m", "uid1"), ("b", "5m", "uid2"))
+
+    groups = plan_folder_changes(index, [], [], [obsolete("a", "uid1")])
+
+    assert written_rules(groups) == {"every 1m": None}
+
+
+def test_removed_twice():
+    index = make_index(("a", "1m", "uid1"))
+
+    groups = plan_folder_changes(index, [], [], [obsolete("b", "unknown")])
+
+    assert groups.writes() == []
+
+
+def test_created_rule_taken_over_by_title():
+    # written by an interrupted run, that did not record the uid
+    index = make_index(("a", "1m", "uid1"), ("b", "1m", "uid2"))
+    created = LocalResource(local_object=make_alert("folder", "a", expr="down"))
+
+    groups = plan_folder_changes(index, [created], [], [])
+
+    assert written_rules(groups) == {"every 1m": [("a", "uid1"), ("b", "uid2")]}
+    (_, group) = groups.writes()[0]
+    assert group.rules[0].grafana_alert.data[0].model.expr == "down"
+
+
+def test_updated_in_place():
+    index = make_index(("a", "1m", "uid1"), ("b", "5m", "uid2"))
+    updated = synced("a", "1m", "uid1")
+
+    groups = plan_folder_changes(index, [], [updated], [])
+
+    assert written_rules(groups) == {"every 1m": [("a", "uid1")]}
+    assert optimistic_results(groups, [updated]) == [
+        SyncedResource.from_mapped(updated, updated.local_object)
+    ]
@@ -0,0 +1,90 @@
+from typing import Any
+
+import pytest
+from binds.grafana.client.session import GrafanaSession, api_url
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter
+
+
+class RecordingAdapter(BaseAdapter):
+    def __init__(self):
+        super().__init__()
+        self.requests: list[tuple[PreparedRequest, dict[str, Any]]] = []
+
+    def send(self, request: PreparedRequest, **kwargs: Any) -> Response:
+        self.requests.append((request, kwargs))
+        response = Response()
+        response.status_code = 200
+        response.request = request
+        response._content = b"{}"
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.mark.parametrize(
+    "url",
+    ["http://grafana.local", "http://grafana.local/", "http://grafana.local/api/"],
+)
+def test_api_url(url):
+    assert api_url(url) == "http://grafana.local/api/"
+
+
+def test_api_url_with_path():
+    assert api_url("https://example.com/grafana") == "https://example.com/grafana/api/"
+
+
+class TestGrafanaSession:
+    @pytest.fixture
+    def adapter(self) -> RecordingAdapter:
+        return RecordingAdapter()
+
+    @pytest.fixture
+    def session(self, adapter) -> GrafanaSession:
+        session = GrafanaSession("http://grafana.local", token="secret", timeout=5)
+        session.mount("http://grafana.local/", adapter)
+        return session
+
+    def test_request(self, session, adapter):
+        session.get("folders/uid")
+
+        request, kwargs = adapter.requests[0]
+        assert request.url == "http://grafana.local/api/folders/uid"
+        assert request.headers["Authorization"] == "Bearer secret"
+        assert "gzip" in request.headers["Accept-Encoding"]
+        assert kwargs["timeout"] == 5
+
+    def test_timeout_override(self, session, adapter):
+        session.get("folders", timeout=60)
+
+        _, kwargs = adapter.requests[0]
+        assert kwargs["timeout"] == 60
+
+    def test_pool_size(self):
+        session = GrafanaSession("http://grafana.local", pool_size=32)
+
+        adapter = session.get_adapter("https://grafana.local/")
+        assert adapter._pool_maxsize == 32
+        assert adapter._pool_block
+
+    def test_invalid_pool_size(self):
+        with pytest.raises(ValueError):
+            GrafanaSession("http://grafana.local", pool_size=0)
+
+
+def test_async_grafana_client(grafana):
+    pytest.importorskip("httpx")
+    from binds.grafana.client.session import async_grafana_client
+    from binds.grafana.fake.httpx_transport import AsyncFakeGrafanaTransport
+
+    client = async_grafana_client(
+        "http://grafana.fake",
+        auth=("admin", "admin"),
+        timeout=(1, 10),
+        transport=AsyncFakeGrafanaTransport(grafana),
+    )
+
+    assert str(client.base_url) == "http://grafana.fake/api/"
+    assert client.timeout.connect == 1
+    assert client.timeout.read == 10
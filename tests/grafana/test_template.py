@@ -0,0 +1,82 @@
+import pytest
+from binds.grafana.objects import AlertTemplate
+from pydantic import ValidationError
+
+from tests.grafana.objects import make_alert
+
+
+@pytest.fixture
+def reference():
+    alert = make_alert("folder", "reference", expr="up")
+    alert.labels = {"team": "core"}
+    return alert
+
+
+@pytest.fixture
+def template(reference) -> AlertTemplate:
+    return AlertTemplate(reference, expr='up{job="$job"} < $threshold')
+
+
+def test_variant_equals_built_alert(reference):
+    variant = AlertTemplate(reference, expr="down").variant(
+        title="variant", folder_title="other", expr_params={}
+    )
+
+    expected = make_alert("other", "variant", expr="down")
+    expected.labels = {"team": "core"}
+    assert variant == expected
+    assert variant.content_hash() == expected.content_hash()
+
+
+def test_unchanged_parts_shared(reference, template):
+    variant = template.variant(title="variant", labels={"job": "api"})
+
+    assert variant.grafana_alert.data is reference.grafana_alert.data
+    assert variant.evaluation_interval is reference.evaluation_interval
+    assert variant.labels == {"team": "core", "job": "api"}
+    assert reference.grafana_alert.title == "reference"
+    assert reference.labels == {"team": "core"}
+
+
+def test_expr_replaced(reference, template):
+    variant = template.variant(expr_params={"job": "api", "threshold": 1})
+
+    [query] = variant.grafana_alert.data
+    assert query.model.expr == 'up{job="api"} < 1'
+    assert query.relativeTimeRange is reference.grafana_alert.data[0].relativeTimeRange
+    assert reference.grafana_alert.data[0].model.expr == "up"
+
+
+def test_changed_parts_validated(template):
+    with pytest.raises(ValidationError):
+        template.variant(title="")
+    with pytest.raises(ValidationError):
+        template.variant(labels={"job": ["api"]})
+
+
+def test_expr_required(reference):
+    with pytest.raises(ValueError):
+        AlertTemplate(reference).variant(expr_params={"job": "api"})
+    with pytest.raises(ValueError):
+        AlertTemplate(reference, expr="up", ref_id="missing")
+
+
+def test_expand(template):
+    variants = template.expand(
+        {"job": ["api", "db"], "threshold": [1, 2]},
+        title="$job below $threshold",
+        folder_title="$job",
+        labels={"job": "$job"},
+    )
+
+    assert not isinstance(variants, list)
+    variants = list(variants)
+    assert [(v.folder_title, v.grafana_alert.title) for v in variants] == [
+        ("api", "api below 1"),
+        ("api", "api below 2"),
+        ("db", "db below 1"),
+        ("db", "db below 2"),
+    ]
+    assert variants[-1].labels == {"team": "core", "job": "db"}
+    assert variants[-1].grafana_alert.data[0].model.expr == 'up{job="db"} < 2'
+    assert len({v.local_id for v in variants}) == 4
@@ -0,0 +1,28 @@
+import json
+
+import pytest
+from binds.grafana.handlers.alert import alert_to_singleton_group
+from controller import wire
+
+from tests.grafana.objects import make_alert
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(wire, "orjson", None)
+    elif wire.orjson is None:
+        pytest.skip("orjson is not installed")
+
+
+@pytest.mark.usefixtures("backend")
+def test_wire_json_compact():
+    group = alert_to_singleton_group(
+        make_alert("Folder", "Тревога", expr='up{job="api"} == 0'), uid="uid"
+    )
+    body = group.wire_json()
+
+    assert json.loads(body) == json.loads(group.json())
+    assert len(body) < len(group.json().encode())
+    assert b": " not in body and b", " not in body
+    assert "Тревога".encode() in body
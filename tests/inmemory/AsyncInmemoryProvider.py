@@ -0,0 +1,49 @@
+from typing import Collection, Iterable, Optional, Type
+
+from monitoring_as_code.controller.diff_utils import ResourceDiff
+from monitoring_as_code.controller.provider import CHECKPOINT, AsyncProvider, T
+from monitoring_as_code.controller.resource import (
+    LocalResource,
+    MappedResource,
+    ObsoleteResource,
+    SyncedResource,
+)
+from tests.inmemory.InmemoryObject import InmemoryObject
+from tests.inmemory.InmemoryProvider import InmemoryProvider
+
+
+class AsyncInmemoryProvider(AsyncProvider[InmemoryObject]):
+    def __init__(self, remote_objects: Iterable[InmemoryObject]):
+        self._provider = InmemoryProvider(remote_objects)
+        self.disposed = False
+
+    @property
+    def remote_state(self):
+        return self._provider.remote_state
+
+    @property
+    def operating_objects(self) -> Collection[Type[InmemoryObject]]:
+        return self._provider.operating_objects
+
+    async def sync_resources(
+        self, mapped_resources: Iterable[MappedResource[T]]
+    ) -> Iterable[SyncedResource[T] | ObsoleteResource[T]]:
+        return self._provider.sync_resources(mapped_resources)
+
+    def diff(self, resource: SyncedResource[T]) -> ResourceDiff:
+        return self._provider.diff(resource)
+
+    def set_checkpoint(self, checkpoint: Optional[CHECKPOINT]) -> None:
+        super().set_checkpoint(checkpoint)
+        self._provider.set_checkpoint(checkpoint)
+
+    async def apply_actions(
+        self,
+        to_create: Iterable[LocalResource[T]],
+        to_update: Iterable[SyncedResource[T]],
+        to_remove: Iterable[ObsoleteResource[T]],
+    ) -> list[SyncedResource[T]]:
+        return self._provider.apply_actions(to_create, to_update, to_remove)
+
+    async def dispose(self) -> None:
+        self.disposed = True
@@ -1,6 +1,6 @@
 from typing import Collection, Iterable, Type
 
-from monitoring_as_code.controller.diff_utils import RESOURCE_DIFF, calculate_diff
+from monitoring_as_code.controller.diff_utils import ResourceDiff, calculate_diff
 from monitoring_as_code.controller.provider import Provider, T
 from monitoring_as_code.controller.resource import (
     IdType,
@@ -51,7 +51,7 @@ class InmemoryProvider(Provider[InmemoryObject]):
                 )
         return rv
 
-    def diff(self, resource: SyncedResource[T]) -> RESOURCE_DIFF:
+    def diff(self, resource: SyncedResource[T]) -> ResourceDiff:
         return calculate_diff(resource.remote_object, resource.local_object)
 
     def apply_actions(
@@ -66,21 +66,23 @@ class InmemoryProvider(Provider[InmemoryObject]):
             self.remote_state.pop(
                 obsolete_resource.remote_id
             )  # probably make default None
+            self.report_applied(removed=[obsolete_resource])
 
         for synced_resource in to_update:
             self.remote_state[synced_resource.remote_id] = synced_resource.local_object
             synced.append(synced_resource)
+            self.report_applied(synced=[synced_resource])
 
         for local_resource in to_create:
             remote_id = self.generate_remote_id(local_resource.local_id)
 
             self.remote_state[remote_id] = local_resource.local_object
-            synced.append(
-                SyncedResource(
-                    local_object=local_resource.local_object,
-                    remote_id=remote_id,
-                    remote_object=local_resource.local_object,
-                )
+            synced_resource = SyncedResource(
+                local_object=local_resource.local_object,
+                remote_id=remote_id,
+                remote_object=local_resource.local_object,
             )
+            synced.append(synced_resource)
+            self.report_applied(synced=[synced_resource])
 
         return synced
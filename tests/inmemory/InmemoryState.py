@@ -1,3 +1,7 @@
+from typing import Optional
+
+from datetime import timedelta
+
 from monitoring_as_code.controller.state import RESOURCE_ID_MAPPING, State, StateData
 
 
@@ -8,8 +12,15 @@ class InmemoryState(State):
         *,
         save_state: bool,
         persist_untracked: bool,
+        checkpoint_every: Optional[int] = None,
+        checkpoint_interval: Optional[timedelta] = None,
     ):
-        super().__init__(save_state=save_state, persist_untracked=persist_untracked)
+        super().__init__(
+            save_state=save_state,
+            persist_untracked=persist_untracked,
+            checkpoint_every=checkpoint_every,
+            checkpoint_interval=checkpoint_interval,
+        )
         self._data.resources = saved_data
 
     @property
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# States import the controller as a top-level package
+sys.path.insert(0, str(Path(__file__).parents[2] / "monitoring_as_code"))
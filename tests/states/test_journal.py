@@ -0,0 +1,146 @@
+import json
+
+import pytest
+from controller.resource import ObsoleteResource, SyncedResource
+from controller.states import JournaledFileState
+
+from tests.inmemory.InmemoryObject import PrimitiveInmemoryObject
+
+
+def synced(key: str, name: str = "obj") -> SyncedResource:
+    obj = PrimitiveInmemoryObject(name=name, key=key)
+    return SyncedResource(
+        local_object=obj, remote_id=f"remote-{key}", remote_object=obj
+    )
+
+
+def removed(key: str) -> ObsoleteResource:
+    return ObsoleteResource(local_id=synced(key).local_id, remote_id=f"remote-{key}")
+
+
+def make_state(path, **kwargs) -> JournaledFileState:
+    return JournaledFileState(
+        path / "state.json", save_state=True, persist_untracked=False, **kwargs
+    )
+
+
+def load(path) -> JournaledFileState:
+    state = make_state(path)
+    with state:
+        return state
+
+
+def journal_records(state) -> list[dict]:
+    return [json.loads(line) for line in state.journal.read_text().splitlines()]
+
+
+class TestJournaledFileState:
+    @pytest.fixture
+    def state(self, tmp_path) -> JournaledFileState:
+        with make_state(tmp_path) as state:
+            state.update_state([synced("a"), synced("b")], [])
+        return state
+
+    def test_first_save_is_snapshot(self, state, tmp_path):
+        assert state.file.exists()
+        assert not state.journal.exists()
+        assert load(tmp_path)._data == state._data
+
+    def test_changes_appended(self, state, tmp_path):
+        with state:
+            state.update_state([synced("a"), synced("b", "new"), synced("c")], [])
+            state.update_state([], [removed("a"), removed("missing")])
+
+        # unchanged resources are not journaled
+        assert [(r["op"], r["id"]) for r in journal_records(state)] == [
+            ("set", synced("b").local_id),
+            ("set", synced("c").local_id),
+            ("delete", synced("a").local_id),
+        ]
+        assert load(tmp_path)._data == state._data
+
+    def test_verified_replayed(self, state, tmp_path):
+        with state:
+            state.mark_verified()
+
+        assert load(tmp_path)._data.verified_at == state._data.verified_at
+
+    def test_checkpoints_appended(self, tmp_path):
+        with make_state(tmp_path, checkpoint_every=1) as state:
+            for key in "abc":
+                state.checkpoint([synced(key)], [])
+            # saved by checkpoints before the exit
+            assert len(journal_records(state)) == 2
+            assert len(load(tmp_path)._data.resources) == 3
+
+    def test_incomplete_record_skipped(self, state, tmp_path):
+        with state:
+            state.update_state([synced("c")], [])
+        with state.journal.open("a") as f:
+            f.write('{"op":"set","id":')
+
+        assert load(tmp_path)._data == state._data
+
+    @pytest.mark.parametrize(
+        "tail",
+        ['{"op":"set","id":', '{"op":"delete","id":"x"}', ""],
+        ids=["incomplete", "unterminated", "empty"],
+    )
+    def test_appended_after_broken_tail(self, state, tmp_path, tail):
+        with state:
+            state.update_state([synced("c")], [])
+        with state.journal.open("a") as f:
+            f.write('{"op":"set","id":"d","remote_id":"remote-d","hash":"h"}\n')
+            f.write(tail)
+
+        with state:
+            state.update_state([synced("e")], [])
+
+        loaded = load(tmp_path)
+        assert loaded._data == state._data
+        assert {"d", synced("e").local_id} <= loaded._data.resources.keys()
+
+    def test_broken_tail_kept_on_load(self, state, tmp_path):
+        with state:
+            state.update_state([synced("c")], [])
+        with state.journal.open("a") as f:
+            f.write('{"op":"set","id":')
+        journal = state.journal.read_bytes()
+
+        with make_state(tmp_path) as loaded:
+            pass
+        with JournaledFileState(
+            state.file, save_state=False, persist_untracked=False
+        ) as loaded:
+            loaded.update_state([synced("d")], [])
+
+        assert state.journal.read_bytes() == journal
+        assert loaded._data.resources.keys() >= state._data.resources.keys()
+
+    def test_compaction(self, tmp_path):
+        with make_state(tmp_path, compact_threshold=1) as state:
+            state.update_state([synced("a")], [])
+
+        journal_sizes = []
+        for key in "bcdefgh":
+            with state:
+                state.update_state([synced(key)], [])
+            if not state.journal.exists():
+                break
+            journal_sizes.append(state.journal.stat().st_size)
+        else:
+            pytest.fail("journal was not compacted")
+
+        # changes were appended until the journal outgrew the snapshot
+        assert journal_sizes
+        assert load(tmp_path)._data == state._data
+
+    def test_replayed_after_compaction(self, state, tmp_path):
+        # a crash between the snapshot write and the journal removal
+        with state:
+            state.update_state([synced("c")], [removed("a")])
+        journal = state.journal.read_text()
+        state._compact()
+        state.journal.write_text(journal)
+
+        assert load(tmp_path)._data == state._data
@@ -0,0 +1,143 @@
+import sqlite3
+
+import pytest
+from controller.resource import LocalResource, ObsoleteResource, SyncedResource
+from controller.states import SqliteState
+
+from tests.inmemory.InmemoryObject import (
+    NestedPrimitiveInmemoryObject,
+    PrimitiveInmemoryObject,
+)
+
+
+def synced(key: str, name: str = "obj") -> SyncedResource:
+    obj = PrimitiveInmemoryObject(name=name, key=key)
+    return SyncedResource(
+        local_object=obj, remote_id=f"remote-{key}", remote_object=obj
+    )
+
+
+def make_state(path, **kwargs) -> SqliteState:
+    return SqliteState(
+        path / "state.sqlite", save_state=True, persist_untracked=False, **kwargs
+    )
+
+
+class TestSqliteState:
+    @pytest.fixture
+    def state(self, tmp_path) -> SqliteState:
+        with make_state(tmp_path) as state:
+            state.update_state([synced("a"), synced("b")], [])
+        return state
+
+    def test_fill_provider_id(self, state):
+        with state:
+            local, mapped = state.fill_provider_id(
+                [LocalResource(local_object=synced(key).local_object) for key in "abc"]
+            )
+
+        assert [r.local_id for r in local] == [synced("c").local_id]
+        assert {r.local_id: r.remote_id for r in mapped} == {
+            synced("a").local_id: "remote-a",
+            synced("b").local_id: "remote-b",
+        }
+
+    def test_filter_unchanged(self, state):
+        with state:
+            _, mapped = state.fill_provider_id(
+                [
+                    LocalResource(local_object=synced("a").local_object),
+                    LocalResource(local_object=synced("b", "new").local_object),
+                ]
+            )
+            changed, unchanged = state.filter_unchanged(mapped)
+
+        assert [r.local_id for r in changed] == [synced("b").local_id]
+        assert [r.local_id for r in unchanged] == [synced("a").local_id]
+
+    def test_untracked(self, state):
+        nested = NestedPrimitiveInmemoryObject(key="nested", str_list=[])
+        with state:
+            state.update_state(
+                [
+                    SyncedResource(
+                        local_object=nested, remote_id="n", remote_object=nested
+                    )
+                ],
+                [],
+            )
+            untracked = state.get_untracked_resources_by_ids({synced("a").local_id})
+            untracked_primitives = state.get_untracked_resources_by_ids(
+                {synced("a").local_id}, object_types={"PrimitiveInmemoryObject"}
+            )
+
+        assert {r.local_id for r in untracked} == {
+            synced("b").local_id,
+            f"NestedPrimitiveInmemoryObject.{nested.local_id}",
+        }
+        assert [r.local_id for r in untracked_primitives] == [synced("b").local_id]
+
+    def test_removed(self, state):
+        with state:
+            state.update_state(
+                [], [ObsoleteResource(local_id=synced("a").local_id, remote_id="")]
+            )
+        with state:
+            assert state.get_untracked_resources_by_ids(set()) == [
+                ObsoleteResource(local_id=synced("b").local_id, remote_id="remote-b")
+            ]
+
+    def test_verified_at_saved(self, state):
+        with state:
+            state.mark_verified()
+        verified_at = state._data.verified_at
+
+        with state:
+            assert state._data.verified_at == verified_at
+
+    def test_unsaved_changes_discarded(self, state):
+        with SqliteState(
+            state.file, save_state=False, persist_untracked=False
+        ) as unsaved:
+            unsaved.update_state([synced("c")], [])
+
+        with state:
+            assert len(state.get_untracked_resources_by_ids(set())) == 2
+
+    def test_checkpoints_committed(self, tmp_path):
+        with make_state(tmp_path, checkpoint_every=2) as state:
+            for key in "abc":
+                state.checkpoint([synced(key)], [])
+
+            # another connection sees only committed changes
+            with sqlite3.connect(state.file) as connection:
+                (count,) = connection.execute(
+                    "SELECT count(*) FROM resources"
+                ).fetchone()
+            assert count == 2
+
+    def test_exclusive(self, state):
+        with state:
+            with pytest.raises(sqlite3.OperationalError):
+                with SqliteState(
+                    state.file, save_state=True, persist_untracked=False, timeout=0
+                ):
+                    pass
+
+    @pytest.mark.parametrize("read_only, save_state", [(True, True), (False, False)])
+    def test_unsaved_not_exclusive(self, state, read_only, save_state):
+        unsaved = SqliteState(
+            state.file, save_state=save_state, persist_untracked=False
+        )
+        unsaved.read_only = read_only
+        with unsaved:
+            unsaved.fill_provider_id(
+                [LocalResource(local_object=synced("a").local_object)]
+            )
+
+            # another run can start writing
+            with sqlite3.connect(
+                state.file, timeout=0, isolation_level=None
+            ) as connection:
+                connection.execute("BEGIN IMMEDIATE")
+                connection.execute("ROLLBACK")
@@ -0,0 +1,110 @@
+import sys
+
+import pytest
+from loguru import logger
+
+from monitoring_as_code.controller.diff_utils import (
+    ROOT_PATH,
+    calculate_diff,
+    find_differences,
+    has_differences,
+    print_diff,
+)
+from tests.inmemory.InmemoryObject import (
+    NestedComposeInmemoryObject,
+    NestedPrimitiveInmemoryObject,
+    PrimitiveInmemoryObject,
+)
+
+COMPOSE_OBJ = NestedComposeInmemoryObject(
+    key="compose",
+    obj_list=[
+        PrimitiveInmemoryObject(name="foo", key="prim_foo"),
+        PrimitiveInmemoryObject(name="bar", key="prim_bar"),
+    ],
+)
+
+
+@pytest.mark.parametrize(
+    ["original", "changed", "exclude", "expected_paths"],
+    [
+        pytest.param(COMPOSE_OBJ, COMPOSE_OBJ.copy(deep=True), None, [], id="equal"),
+        pytest.param(None, COMPOSE_OBJ, None, [ROOT_PATH], id="created"),
+        pytest.param(
+            COMPOSE_OBJ,
+            COMPOSE_OBJ.copy(
+                update={
+                    "obj_list": [
+                        PrimitiveInmemoryObject(name="foo", key="prim_foo"),
+                        PrimitiveInmemoryObject(name="baz", key="prim_bar"),
+                    ]
+                }
+            ),
+            None,
+            ["obj_list[1].name"],
+            id="nested field",
+        ),
+        pytest.param(
+            NestedPrimitiveInmemoryObject(key="nested", str_list=["foo"]),
+            NestedPrimitiveInmemoryObject(key="nested", str_list=["foo", "bar"]),
+            None,
+            ["str_list[1]"],
+            id="list length",
+        ),
+        pytest.param(
+            PrimitiveInmemoryObject(name="foo", key="primitive"),
+            PrimitiveInmemoryObject(name="bar", key="changed"),
+            {"key"},
+            ["name"],
+            id="excluded field",
+        ),
+        pytest.param(
+            COMPOSE_OBJ,
+            COMPOSE_OBJ.copy(
+                update={
+                    "obj_list": [
+                        PrimitiveInmemoryObject(name="oof", key="oof"),
+                        PrimitiveInmemoryObject(name="rab", key="rab"),
+                    ]
+                }
+            ),
+            {"obj_list": {"__all__": {"key"}}},
+            ["obj_list[0].name", "obj_list[1].name"],
+            id="excluded nested field",
+        ),
+    ],
+)
+def test_find_differences(original, changed, exclude, expected_paths):
+    assert list(find_differences(original, changed, exclude)) == expected_paths
+    assert has_differences(original, changed, exclude) == bool(expected_paths)
+
+
+def test_no_text_diff_for_equal_objects():
+    assert list(calculate_diff(COMPOSE_OBJ, COMPOSE_OBJ.copy(deep=True))) == []
+
+
+@pytest.fixture
+def warning_logger():
+    logger.remove()
+    handler_id = logger.add(sys.stderr, level="WARNING")
+    yield
+    logger.remove(handler_id)
+    logger.add(sys.stderr)
+
+
+def test_diff_not_rendered_when_suppressed(warning_logger):
+    diff = calculate_diff(None, COMPOSE_OBJ)
+
+    print_diff("Diff for compose", diff)
+
+    assert diff
+    assert "lines" not in vars(diff)
+
+
+def test_diff_rendered_when_logged(caplog):
+    diff = calculate_diff(None, COMPOSE_OBJ)
+
+    print_diff("Diff for compose", diff)
+
+    assert "lines" in vars(diff)
+    assert '+  "key": "compose",' in caplog.text
@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+
+import gzip
+from datetime import timedelta
+from io import BytesIO
+
+import pytest
+from requests import PreparedRequest
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+from monitoring_as_code.controller.http_stats import (
+    LATENCY_BUCKETS,
+    HttpStats,
+    response_size,
+)
+
+
+def make_response(status_code=200, body=b"", content=b"", elapsed=0.01):
+    return SimpleNamespace(
+        status_code=status_code,
+        request=SimpleNamespace(body=body),
+        content=content,
+        elapsed=timedelta(seconds=elapsed),
+    )
+
+
+class TestHttpStats:
+    def test_record(self):
+        stats = HttpStats()
+
+        stats.record("get", "folders/{uid}", make_response(content=b"{}"), 0.02)
+        stats.record("GET", "folders/{uid}", make_response(404, elapsed=0.001), 0.003)
+        stats.record("POST", "folders", make_response(body='{"title": "f"}'), 20)
+
+        folder_stats = stats.endpoints["GET folders/{uid}"]
+        assert folder_stats.count == 2
+        assert folder_stats.status_codes == {200: 1, 404: 1}
+        assert folder_stats.bytes_received == 2
+        assert folder_stats.latency_max == pytest.approx(0.02)
+        assert folder_stats.mean_server_time == pytest.approx(0.0055)
+        assert folder_stats.latency_buckets[0] == 1
+        assert folder_stats.latency_buckets[LATENCY_BUCKETS.index(0.025)] == 1
+
+        create_stats = stats.endpoints["POST folders"]
+        assert create_stats.bytes_sent == len('{"title": "f"}')
+        assert create_stats.latency_buckets[-1] == 1
+
+    def test_record_error(self):
+        stats = HttpStats()
+
+        stats.record_error("GET", "folders/{uid}", 0.1)
+
+        assert stats.endpoints["GET folders/{uid}"].errors == 1
+        assert "errors x1" in stats.summary()
+
+    def test_take(self):
+        stats = HttpStats()
+        stats.record("GET", "folders/{uid}", make_response(), 0.01)
+
+        taken = stats.take()
+
+        assert not stats
+        assert [endpoint for endpoint, _ in taken] == ["GET folders/{uid}"]
+
+
+class TestResponseSize:
+    BODY = b'{"title": "folder"}' * 100
+
+    def test_requests_compressed(self):
+        compressed = gzip.compress(self.BODY)
+        raw = HTTPResponse(
+            body=BytesIO(compressed),
+            headers={"Content-Encoding": "gzip"},
+            status=200,
+            preload_content=False,
+        )
+        response = HTTPAdapter().build_response(PreparedRequest(), raw)
+
+        assert response.content == self.BODY
+        assert response_size(response) == len(compressed)
+
+    def test_httpx_compressed(self):
+        httpx = pytest.importorskip("httpx")
+        compressed = gzip.compress(self.BODY)
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(
+                200,
+                headers={"Content-Encoding": "gzip"},
+                stream=httpx.ByteStream(compressed),
+            )
+        )
+        response = httpx.Client(transport=transport).get("http://grafana/api/")
+
+        assert response.content == self.BODY
+        assert response_size(response) == len(compressed)
+
+    def test_content_length(self):
+        response = make_response(content=self.BODY)
+        response.headers = {"Content-Length": "10"}
+
+        assert response_size(response) == 10
@@ -1,11 +1,28 @@
 import textwrap
 from abc import ABC
 from copy import deepcopy
+from datetime import timedelta
 
 import pytest
 
+from monitoring_as_code.controller.exceptions import DuplicatedResourceException
 from monitoring_as_code.controller.monitor import Monitor
-from monitoring_as_code.controller.resource import generate_resource_local_id
+from monitoring_as_code.controller.obj import MonitoringObject
+from monitoring_as_code.controller.report import (
+    APPLY,
+    DIFF,
+    PREPARE,
+    STATE_LOAD,
+    STATE_SAVE,
+    STATE_UPDATE,
+    SYNC,
+    TOTAL,
+    RunReport,
+)
+from monitoring_as_code.controller.resource import (
+    ResourceOps,
+    generate_resource_local_id,
+)
 from monitoring_as_code.controller.state import RESOURCE_ID_MAPPING
 from tests.inmemory.InmemoryObject import (
     InmemoryObject,
@@ -17,6 +34,26 @@ from tests.inmemory.InmemoryProvider import InmemoryProvider
 from tests.inmemory.InmemoryState import InmemoryState
 from tests.utils import join_param_lists
 
+
+class DependentObject(MonitoringObject):
+    key: str
+    requires: str
+
+    @property
+    def local_id(self) -> str:
+        return self.key
+
+    @property
+    def dependencies(self) -> list[str]:
+        return [self.requires]
+
+
+class DependentObjectProvider(InmemoryProvider):
+    @property
+    def operating_objects(self):
+        return {DependentObject}
+
+
 OBJ_FIXTURE_PARAMS = [
     pytest.param(
         PrimitiveInmemoryObject(name="foo", key="primitive"),
@@ -191,7 +228,7 @@ class TestPersistUnchangedObject(TestDeleteObsoleteObject):
         )
 
         assert inmemory_provider.remote_state == initial_remote
-        assert inmemory_state.internal_state == initial_state
+        assert inmemory_state.internal_state.resources == initial_state.resources
 
 
 class TestUpdatePrimitiveObject(AbstractTest):
@@ -292,7 +329,7 @@ class TestUpdatePrimitiveObject(AbstractTest):
             monitoring_objects=[obj.copy(deep=True)], dry_run=False
         )
 
-        assert inmemory_state.internal_state == initial_state
+        assert inmemory_state.internal_state.resources == initial_state.resources
 
         remote_id = tuple(initial_state.resources.values())[0]
         assert inmemory_provider.remote_state[remote_id] == obj
@@ -303,3 +340,306 @@ class TestUpdatePrimitiveObject(AbstractTest):
         )
 
         assert expected_diff in caplog.text
+
+
+class TestFastPlan(AbstractTest):
+    @pytest.fixture
+    def obj(self) -> InmemoryObject:
+        return PrimitiveInmemoryObject(name="foo", key="primitive")
+
+    @pytest.fixture
+    def initial_remote_objects(self) -> list[InmemoryObject]:
+        # remote object was changed outside the monitor after the last apply
+        return [PrimitiveInmemoryObject(name="drifted", key="primitive")]
+
+    @pytest.fixture(name="inmemory_state")
+    def inmemory_state_fixture(self, initial_state_mapping, obj):
+        state = InmemoryState(
+            saved_data=initial_state_mapping,
+            save_state=True,
+            persist_untracked=False,
+        )
+        state.internal_state.fingerprints = {
+            generate_resource_local_id(obj): obj.content_hash()
+        }
+        return state
+
+    def test_fingerprint_saved(self, monitor, inmemory_state):
+        new_obj = PrimitiveInmemoryObject(name="bar", key="new")
+
+        monitor.apply_monitoring_state(monitoring_objects=[new_obj], dry_run=False)
+
+        assert inmemory_state.internal_state.fingerprints == {
+            generate_resource_local_id(new_obj): new_obj.content_hash()
+        }
+
+    def test_unchanged_not_read(self, obj, monitor, inmemory_provider):
+        monitor.apply_monitoring_state(
+            monitoring_objects=[obj.copy(deep=True)],
+            dry_run=False,
+            fast_plan=True,
+        )
+
+        assert list(inmemory_provider.remote_state.values()) == [
+            PrimitiveInmemoryObject(name="drifted", key="primitive")
+        ]
+
+    def test_changed_is_read(self, obj, monitor, inmemory_provider):
+        changed_obj = PrimitiveInmemoryObject(name="bar", key="primitive")
+
+        monitor.apply_monitoring_state(
+            monitoring_objects=[changed_obj],
+            dry_run=False,
+            fast_plan=True,
+        )
+
+        assert list(inmemory_provider.remote_state.values()) == [changed_obj]
+
+    def test_full_verify(self, obj, monitor, inmemory_provider, inmemory_state):
+        monitor.apply_monitoring_state(
+            monitoring_objects=[obj.copy(deep=True)],
+            dry_run=False,
+            fast_plan=True,
+            full_verify_interval=timedelta(hours=1),
+        )
+
+        assert list(inmemory_provider.remote_state.values()) == [obj]
+        assert inmemory_state.internal_state.verified_at is not None
+
+
+class TestChunkedApply(AbstractTest):
+    @pytest.fixture
+    def initial_remote_objects(self) -> list[InmemoryObject]:
+        return [
+            PrimitiveInmemoryObject(name="obsolete", key="obsolete"),
+            PrimitiveInmemoryObject(name="old", key="obj_0"),
+        ]
+
+    def test_run(self, monitor, inmemory_provider, inmemory_state):
+        objects = [
+            PrimitiveInmemoryObject(name=f"obj_{idx}", key=f"obj_{idx}")
+            for idx in range(5)
+        ]
+
+        monitor.apply_monitoring_state(
+            monitoring_objects=(obj.copy() for obj in objects),
+            dry_run=False,
+            chunk_size=2,
+        )
+
+        assert (
+            sorted(inmemory_provider.remote_state.values(), key=lambda o: o.key)
+            == objects
+        )
+        assert set(inmemory_state.internal_state.resources) == {
+            generate_resource_local_id(obj) for obj in objects
+        }
+
+
+class TestProviderDependencies(AbstractTest):
+    @pytest.fixture
+    def obj(self) -> InmemoryObject:
+        return PrimitiveInmemoryObject(name="foo", key="primitive")
+
+    @pytest.fixture
+    def dependent_provider(self) -> DependentObjectProvider:
+        return DependentObjectProvider(remote_objects=[])
+
+    def test_run(
+        self, obj, inmemory_provider, dependent_provider, inmemory_state, monkeypatch
+    ):
+        applied: list[str] = []
+
+        def record_apply(provider):
+            apply_actions = provider.apply_actions
+
+            def wrapper(**kwargs):
+                applied.append(type(provider).__name__)
+                return apply_actions(**kwargs)
+
+            monkeypatch.setattr(provider, "apply_actions", wrapper)
+
+        record_apply(inmemory_provider)
+        record_apply(dependent_provider)
+
+        # the dependent provider is registered first, but applied last
+        monitor = Monitor(
+            providers=[dependent_provider, inmemory_provider],
+            state=inmemory_state,
+        )
+        dependent = DependentObject(
+            key="dependent", requires=generate_resource_local_id(obj)
+        )
+        monitor.apply_monitoring_state(
+            monitoring_objects=[dependent, obj],
+            dry_run=False,
+        )
+
+        assert applied == ["InmemoryProvider", "DependentObjectProvider"]
+        assert list(dependent_provider.remote_state.values()) == [dependent]
+
+
+class TestRunReport(AbstractTest):
+    @pytest.fixture
+    def initial_remote_objects(self) -> list[InmemoryObject]:
+        return [
+            PrimitiveInmemoryObject(name="obsolete", key="obsolete"),
+            PrimitiveInmemoryObject(name="kept", key="kept"),
+            PrimitiveInmemoryObject(name="old", key="changed"),
+        ]
+
+    @pytest.fixture
+    def objects(self) -> list[InmemoryObject]:
+        return [
+            PrimitiveInmemoryObject(name="kept", key="kept"),
+            PrimitiveInmemoryObject(name="new", key="changed"),
+            PrimitiveInmemoryObject(name="new", key="created"),
+        ]
+
+    def test_run(self, monitor, objects, inmemory_provider):
+        report = monitor.apply_monitoring_state(
+            monitoring_objects=objects, dry_run=False
+        )
+
+        assert report.counts == {
+            ResourceOps.CREATE: 1,
+            ResourceOps.UPDATE: 1,
+            ResourceOps.SKIP: 1,
+            ResourceOps.DELETE: 1,
+        }
+        provider_report = report.providers[inmemory_provider]
+        assert provider_report.object_types.keys() == {"PrimitiveInmemoryObject"}
+        assert set(provider_report.timings) == {SYNC, DIFF, APPLY, STATE_UPDATE}
+        assert set(report.timings) == {STATE_LOAD, PREPARE, STATE_SAVE, TOTAL}
+        assert report.phase_timings[TOTAL] >= report.phase_timings[SYNC]
+
+    def test_dry_run(self, monitor, objects, inmemory_provider):
+        report = monitor.apply_monitoring_state(monitoring_objects=objects)
+
+        assert report.counts[ResourceOps.CREATE] == 1
+        assert APPLY not in report.providers[inmemory_provider].timings
+
+    def test_providers_of_same_class(self):
+        report = RunReport()
+        first, second = (InmemoryProvider(remote_objects=[]) for _ in range(2))
+        report.provider(first).count("type", ResourceOps.CREATE, 0.0)
+        report.provider(second).count("type", ResourceOps.SKIP, 0.0)
+
+        assert report.provider(first).counts == {ResourceOps.CREATE: 1}
+        assert report.counts == {ResourceOps.CREATE: 1, ResourceOps.SKIP: 1}
+
+    def test_failed_run(self, monitor, objects, inmemory_provider, monkeypatch):
+        def fail(**kwargs):
+            raise RuntimeError("apply failed")
+
+        monkeypatch.setattr(inmemory_provider, "apply_actions", fail)
+        report = RunReport()
+
+        with pytest.raises(RuntimeError):
+            monitor.apply_monitoring_state(
+                monitoring_objects=objects, dry_run=False, report=report
+            )
+
+        assert report.counts[ResourceOps.DELETE] == 1
+        assert STATE_SAVE in report.timings
+
+
+class SaveCountingState(InmemoryState):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.saved: list[set[str]] = []
+
+    def _save(self) -> None:
+        self.saved.append(set(self._data.resources))
+
+
+class FailingProvider(InmemoryProvider):
+    """
+    Fails after creating `fail_after` objects
+    """
+
+    def __init__(self, *args, fail_after: int, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fail_after = fail_after
+
+    def report_applied(self, synced=(), removed=()):
+        super().report_applied(synced, removed)
+        if len(self.remote_state) >= self.fail_after:
+            raise RuntimeError("apply failed")
+
+
+class TestCheckpoint(AbstractTest):
+    @pytest.fixture
+    def objects(self) -> list[InmemoryObject]:
+        return [
+            PrimitiveInmemoryObject(name=f"obj_{idx}", key=f"obj_{idx}")
+            for idx in range(5)
+        ]
+
+    @pytest.fixture(name="inmemory_state")
+    def inmemory_state_fixture(self, initial_state_mapping):
+        return SaveCountingState(
+            saved_data=initial_state_mapping,
+            save_state=True,
+            persist_untracked=False,
+            checkpoint_every=2,
+        )
+
+    @pytest.fixture(name="inmemory_provider")
+    def inmemory_provider_fixture(self, initial_remote_objects):
+        return FailingProvider(remote_objects=initial_remote_objects, fail_after=3)
+
+    def test_failed_run(self, monitor, objects, inmemory_state):
+        with pytest.raises(RuntimeError):
+            monitor.apply_monitoring_state(monitoring_objects=objects, dry_run=False)
+
+        created = {generate_resource_local_id(obj) for obj in objects[:3]}
+        # saved once two objects were created, then on exit
+        assert len(inmemory_state.saved) == 2
+        assert len(inmemory_state.saved[0]) == 2
+        assert inmemory_state.saved[-1] == created
+
+    def test_resume(self, monitor, objects, inmemory_provider, inmemory_state):
+        with pytest.raises(RuntimeError):
+            monitor.apply_monitoring_state(monitoring_objects=objects, dry_run=False)
+        inmemory_provider.fail_after = len(objects) + 1
+
+        report = monitor.apply_monitoring_state(
+            monitoring_objects=objects, dry_run=False
+        )
+
+        assert report.counts[ResourceOps.CREATE] == 2
+        assert report.counts[ResourceOps.SKIP] == 3
+        assert len(inmemory_provider.remote_state) == len(objects)
+
+    def test_checkpoint_unset(self, monitor, objects, inmemory_provider):
+        with pytest.raises(RuntimeError):
+            monitor.apply_monitoring_state(monitoring_objects=objects, dry_run=False)
+
+        assert inmemory_provider._checkpoint is None
+
+    def test_dry_run_not_saved(self, monitor, objects, inmemory_state):
+        monitor.apply_monitoring_state(monitoring_objects=objects, dry_run=True)
+
+        assert inmemory_state.saved == []
+        assert inmemory_state.saves
+
+
+class TestDuplicatedObjects(AbstractTest):
+    @pytest.fixture
+    def objects(self) -> list[InmemoryObject]:
+        return [
+            PrimitiveInmemoryObject(name="first", key="same"),
+            PrimitiveInmemoryObject(name="other", key="other"),
+            PrimitiveInmemoryObject(name="second", key="same"),
+        ]
+
+    @pytest.mark.parametrize("chunk_size", [None, 1])
+    def test_rejected(self, monitor, objects, inmemory_provider, chunk_size):
+        with pytest.raises(DuplicatedResourceException, match="same"):
+            monitor.apply_monitoring_state(
+                monitoring_objects=objects, dry_run=False, chunk_size=chunk_size
+            )
+
+        if chunk_size is None:
+            assert inmemory_provider.remote_state == {}
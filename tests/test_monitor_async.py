@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from monitoring_as_code.controller.exceptions import AsyncProviderInSyncRunException
+from monitoring_as_code.controller.monitor import Monitor
+from monitoring_as_code.controller.resource import (
+    ResourceOps,
+    generate_resource_local_id,
+)
+from tests.inmemory.AsyncInmemoryProvider import AsyncInmemoryProvider
+from tests.inmemory.InmemoryObject import PrimitiveInmemoryObject
+from tests.inmemory.InmemoryProvider import InmemoryProvider
+from tests.inmemory.InmemoryState import InmemoryState
+from tests.test_monitor import AbstractTest
+
+
+class AbstractAsyncTest(AbstractTest):
+    @pytest.fixture(name="inmemory_provider")
+    def inmemory_provider_fixture(self, initial_remote_objects):
+        return AsyncInmemoryProvider(remote_objects=initial_remote_objects)
+
+
+class TestCreateNewObjectAsync(AbstractAsyncTest):
+    def test_run(self, obj, monitor, inmemory_provider, inmemory_state):
+        asyncio.run(
+            monitor.apply_monitoring_state_async(
+                monitoring_objects=[obj], dry_run=False
+            )
+        )
+
+        local_id = generate_resource_local_id(obj)
+        expected_remote_id = InmemoryProvider.generate_remote_id(local_id)
+        assert inmemory_state.internal_state.resources == {local_id: expected_remote_id}
+        assert inmemory_provider.remote_state == {expected_remote_id: obj}
+        assert inmemory_provider.disposed
+
+    def test_sync_run_rejected(self, obj, monitor):
+        with pytest.raises(AsyncProviderInSyncRunException):
+            monitor.apply_monitoring_state(monitoring_objects=[obj], dry_run=False)
+
+
+class TestUpdateObjectAsync(AbstractAsyncTest):
+    @pytest.fixture
+    def initial_remote_objects(self, obj) -> list[PrimitiveInmemoryObject]:
+        return [obj.copy(deep=True)]
+
+    @pytest.fixture
+    def obj(self) -> PrimitiveInmemoryObject:
+        return PrimitiveInmemoryObject(name="foo", key="primitive")
+
+    def test_run(self, monitor, inmemory_provider, caplog):
+        updated = PrimitiveInmemoryObject(name="bar", key="primitive")
+
+        report = asyncio.run(
+            monitor.apply_monitoring_state_async(
+                monitoring_objects=[updated], dry_run=False
+            )
+        )
+
+        assert list(inmemory_provider.remote_state.values()) == [updated]
+        assert '-  "name": "foo"\n+  "name": "bar"' in caplog.text
+        assert report.providers[inmemory_provider].counts == {ResourceOps.UPDATE: 1}
+
+
+class TestDeleteObsoleteObjectAsync(AbstractAsyncTest):
+    @pytest.fixture
+    def initial_remote_objects(self, obj):
+        return [obj.copy(deep=True)]
+
+    def test_run(self, monitor, inmemory_provider, inmemory_state):
+        asyncio.run(
+            monitor.apply_monitoring_state_async(monitoring_objects=[], dry_run=False)
+        )
+
+        assert inmemory_provider.remote_state == {}
+        assert inmemory_state.internal_state.resources == {}
+
+
+class TestSyncProviderInAsyncRun(AbstractTest):
+    def test_run(self, obj, inmemory_provider, inmemory_state):
+        monitor = Monitor(providers=[inmemory_provider], state=inmemory_state)
+
+        asyncio.run(
+            monitor.apply_monitoring_state_async(
+                monitoring_objects=[obj], dry_run=False
+            )
+        )
+
+        assert list(inmemory_provider.remote_state.values()) == [obj]
@@ -0,0 +1,89 @@
+import pytest
+
+from monitoring_as_code.controller.diff_utils import calculate_diff, find_differences
+from monitoring_as_code.controller.monitor import Monitor
+from tests.inmemory.InmemoryObject import (
+    NestedComposeInmemoryObject,
+    PrimitiveInmemoryObject,
+)
+from tests.inmemory.InmemoryProvider import InmemoryProvider
+from tests.inmemory.InmemoryState import InmemoryState
+
+
+def make_obj(name: str = "foo") -> NestedComposeInmemoryObject:
+    return NestedComposeInmemoryObject(
+        key="compose",
+        obj_list=[PrimitiveInmemoryObject(name=name, key="prim")],
+    )
+
+
+class TestFrozenObject:
+    @pytest.fixture
+    def obj(self) -> NestedComposeInmemoryObject:
+        return make_obj().freeze()
+
+    def test_immutable(self, obj):
+        assert obj.frozen
+        with pytest.raises(TypeError):
+            obj.key = "other"
+
+    def test_serialization_cached(self, obj):
+        assert obj.json() is obj.json()
+        assert obj.json() == make_obj().json()
+        assert obj.content_hash() is obj.content_hash()
+        assert obj.content_hash() == make_obj().content_hash()
+        # non canonical json is not cached
+        assert obj.json(exclude={"key"}) != obj.json()
+
+    def test_copy_is_mutable(self, obj):
+        copied = obj.copy(update={"key": "other"})
+
+        assert not copied.frozen
+        copied.obj_list = []
+        assert copied.content_hash() != obj.content_hash()
+
+    def test_thaw(self, obj):
+        obj.content_hash()
+        obj.thaw()
+
+        assert not obj.frozen
+        obj.obj_list = []
+        assert obj.content_hash() != make_obj().content_hash()
+
+    def test_equality(self, obj):
+        assert obj == make_obj().freeze()
+        assert obj == make_obj()
+        assert obj != make_obj("bar").freeze()
+
+    def test_equal_objects_not_walked(self, obj, monkeypatch):
+        from monitoring_as_code.controller import diff_utils
+
+        def fail(*args):
+            raise AssertionError("objects compared field by field")
+
+        monkeypatch.setattr(diff_utils, "_iter_value_differences", fail)
+
+        assert list(find_differences(obj, make_obj().freeze())) == []
+        assert not calculate_diff(obj, make_obj().freeze(), exclude={"key"})
+
+
+def test_monitor_leaves_objects_mutable():
+    obj = make_obj()
+    provider = InmemoryProvider(remote_objects=[])
+    monitor = Monitor(
+        providers=[provider],
+        state=InmemoryState({}, save_state=True, persist_untracked=False),
+    )
+
+    monitor.apply_monitoring_state(monitoring_objects=[obj], dry_run=True)
+    assert not obj.frozen
+    monitor.apply_monitoring_state(monitoring_objects=[obj], dry_run=False)
+    assert not obj.frozen
+    monitor.apply_monitoring_state(
+        monitoring_objects=[obj], dry_run=False, chunk_size=1
+    )
+    assert not obj.frozen
+
+    # a change of a nested object is not hidden by content cached during a run
+    obj.obj_list[0].name = "changed"
+    assert obj.content_hash() != make_obj().content_hash()
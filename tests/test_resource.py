@@ -0,0 +1,123 @@
+import copy
+import pickle
+
+import pytest
+
+from monitoring_as_code.controller.resource import (
+    LocalResource,
+    MappedResource,
+    ObsoleteResource,
+    SyncedResource,
+)
+from tests.inmemory.InmemoryObject import PrimitiveInmemoryObject
+
+
+def make_obj(name: str = "foo") -> PrimitiveInmemoryObject:
+    return PrimitiveInmemoryObject(name=name, key="key")
+
+
+RESOURCES = [
+    pytest.param(lambda: LocalResource(local_object=make_obj()), id="local"),
+    pytest.param(
+        lambda: MappedResource(local_object=make_obj(), remote_id="remote"),
+        id="mapped",
+    ),
+    pytest.param(
+        lambda: SyncedResource(
+            local_object=make_obj(), remote_id="remote", remote_object=make_obj()
+        ),
+        id="synced",
+    ),
+    pytest.param(
+        lambda: ObsoleteResource(
+            local_id="PrimitiveInmemoryObject.key", remote_id="remote"
+        ),
+        id="obsolete",
+    ),
+]
+
+
+@pytest.mark.parametrize("make_resource", RESOURCES)
+class TestResource:
+    def test_immutable(self, make_resource):
+        resource = make_resource()
+
+        with pytest.raises(AttributeError):
+            resource.remote_id = "other"
+        with pytest.raises(AttributeError):
+            del resource.local_id
+        with pytest.raises(AttributeError):
+            resource.extra = "value"
+
+    def test_equality(self, make_resource):
+        resource = make_resource()
+
+        assert resource == make_resource()
+        assert resource != LocalResource(local_object=make_obj("bar"))
+        # objects inside are mutable, so resources are not hashable
+        with pytest.raises(TypeError):
+            hash(resource)
+
+    def test_pickle(self, make_resource):
+        resource = make_resource()
+        local_id = resource.local_id
+
+        for restored in (pickle.loads(pickle.dumps(resource)), copy.copy(resource)):
+            assert type(restored) is type(resource)
+            assert restored == resource
+            assert restored.local_id == local_id
+            assert restored.object_type_name == "PrimitiveInmemoryObject"
+
+
+def test_local_id_inherited():
+    local = LocalResource(local_object=make_obj())
+    assert local.local_id == "PrimitiveInmemoryObject.key"
+
+    mapped = MappedResource.from_local(local, "remote")
+    synced = SyncedResource.from_mapped(mapped, make_obj("remote"))
+
+    # computed once for the object
+    assert synced.local_id is mapped.local_id is local.local_id
+    assert synced == SyncedResource(
+        local_object=make_obj(), remote_id="remote", remote_object=make_obj("remote")
+    )
+
+
+def test_not_equal_across_types():
+    local = LocalResource(local_object=make_obj())
+    mapped = MappedResource(local_object=make_obj(), remote_id="remote")
+
+    assert local != mapped
+    assert mapped != SyncedResource(
+        local_object=make_obj(), remote_id="remote", remote_object=make_obj()
+    )
+
+
+def test_pattern_matching():
+    resources = [
+        SyncedResource(
+            local_object=make_obj(), remote_id="remote", remote_object=make_obj("bar")
+        ),
+        MappedResource(local_object=make_obj(), remote_id="remote"),
+        LocalResource(local_object=make_obj()),
+        ObsoleteResource(local_id="PrimitiveInmemoryObject.key", remote_id="remote"),
+    ]
+
+    matched = []
+    for resource in resources:
+        match resource:
+            case SyncedResource(local, remote_id, remote):
+                matched.append(("synced", local.name, remote_id, remote.name))
+            case MappedResource(local, remote_id):
+                matched.append(("mapped", local.name, remote_id))
+            case LocalResource(local):
+                matched.append(("local", local.name))
+            case ObsoleteResource(local_id, remote_id):
+                matched.append(("obsolete", local_id, remote_id))
+
+    assert matched == [
+        ("synced", "foo", "remote", "bar"),
+        ("mapped", "foo", "remote"),
+        ("local", "foo"),
+        ("obsolete", "PrimitiveInmemoryObject.key", "remote"),
+    ]
@@ -0,0 +1,140 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from monitoring_as_code.controller.exceptions import DependencyCycleException
+from monitoring_as_code.controller.scheduler import run_graph, run_graph_async
+
+DEPENDENCIES = {
+    "folder_a": [],
+    "folder_b": [],
+    "alert_a": ["folder_a"],
+    "alert_b": ["folder_b"],
+    "alert_c": ["folder_c"],  # not scheduled, considered done
+}
+
+
+def assert_dependencies_respected(order: list[str]) -> None:
+    assert set(order) == set(DEPENDENCIES)
+    for key, dependencies in DEPENDENCIES.items():
+        for dependency in dependencies:
+            if dependency in DEPENDENCIES:
+                assert order.index(dependency) < order.index(key)
+
+
+class TestRunGraph:
+    def test_serial(self):
+        order: list[str] = []
+        results = run_graph(
+            {key: lambda key=key: order.append(key) or key for key in DEPENDENCIES},
+            DEPENDENCIES,
+        )
+
+        assert_dependencies_respected(order)
+        assert results == {key: key for key in DEPENDENCIES}
+
+    def test_ready_branch_does_not_wait(self):
+        slow_folder_started = threading.Event()
+        release_slow_folder = threading.Event()
+        order: list[str] = []
+
+        def slow_folder():
+            slow_folder_started.set()
+            assert release_slow_folder.wait(timeout=5)
+            order.append("folder_b")
+
+        def task(key):
+            def run():
+                order.append(key)
+                if key == "alert_a":
+                    assert slow_folder_started.wait(timeout=5)
+                    release_slow_folder.set()
+
+            return run
+
+        tasks = {key: task(key) for key in DEPENDENCIES}
+        tasks["folder_b"] = slow_folder
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            run_graph(tasks, DEPENDENCIES, executor=executor)
+
+        # alert_a ran while folder_b was still in progress
+        assert order.index("alert_a") < order.index("folder_b")
+        assert_dependencies_respected(order)
+
+    def test_group_node(self):
+        order: list[str] = []
+        run_graph(
+            {
+                "alert": lambda: order.append("alert"),
+                "alerts_deleted": None,
+                "folder": lambda: order.append("folder"),
+            },
+            {"alerts_deleted": ["alert"], "folder": ["alerts_deleted"]},
+            executor=ThreadPoolExecutor(max_workers=2),
+        )
+
+        assert order == ["alert", "folder"]
+
+    def test_failure_stops_dependents(self):
+        order: list[str] = []
+
+        def fail():
+            raise RuntimeError("folder_a failed")
+
+        tasks = {key: lambda key=key: order.append(key) for key in DEPENDENCIES}
+        tasks["folder_a"] = fail
+
+        with pytest.raises(RuntimeError, match="folder_a failed"):
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                run_graph(tasks, DEPENDENCIES, executor=executor)
+
+        assert "alert_a" not in order
+
+    def test_cycle(self):
+        with pytest.raises(DependencyCycleException):
+            run_graph(
+                {"a": lambda: None, "b": lambda: None},
+                {"a": ["b"], "b": ["a"]},
+            )
+
+
+class TestRunGraphAsync:
+    def test_run(self):
+        order: list[str] = []
+
+        def task(key):
+            async def run():
+                await asyncio.sleep(0.01 if key == "folder_b" else 0)
+                order.append(key)
+                return key
+
+            return run
+
+        results = asyncio.run(
+            run_graph_async({key: task(key) for key in DEPENDENCIES}, DEPENDENCIES)
+        )
+
+        assert_dependencies_respected(order)
+        # folder_b is the slowest, alert_a did not wait for it
+        assert order.index("alert_a") < order.index("folder_b")
+        assert results == {key: key for key in DEPENDENCIES}
+
+    def test_limit(self):
+        running = 0
+        max_running = 0
+
+        async def task():
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0)
+            running -= 1
+
+        asyncio.run(
+            run_graph_async({idx: task for idx in range(10)}, {}, limit=3),
+        )
+
+        assert max_running == 3
@@ -0,0 +1,180 @@
+from types import SimpleNamespace
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from monitoring_as_code.controller import throttle as throttle_module
+from monitoring_as_code.controller.throttle import (
+    AdaptiveLimiter,
+    AimdLimit,
+    AsyncAdaptiveLimiter,
+    AsyncThrottle,
+    BackoffPolicy,
+    Throttle,
+    retry_after,
+)
+
+
+def make_response(status_code: int = 200, **headers: str):
+    return SimpleNamespace(status_code=status_code, headers=headers)
+
+
+class TestRetryAfter:
+    def test_seconds(self):
+        assert retry_after(make_response(429, **{"Retry-After": "3"})) == 3
+
+    def test_date(self):
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=60)
+        response = make_response(503, **{"Retry-After": format_datetime(retry_at)})
+
+        assert 55 < retry_after(response) <= 60
+
+    @pytest.mark.parametrize("value", [None, "soon"])
+    def test_missing(self, value):
+        headers = {} if value is None else {"Retry-After": value}
+        assert retry_after(make_response(503, **headers)) is None
+
+
+class TestBackoffPolicy:
+    def test_jitter(self):
+        policy = BackoffPolicy(base_delay=1, multiplier=2, max_delay=5)
+
+        delays = [policy.delay(3, make_response(503)) for _ in range(100)]
+
+        assert all(0 <= delay <= 5 for delay in delays)
+        assert len(set(delays)) > 1
+
+    def test_retry_after_honoured(self):
+        policy = BackoffPolicy(max_delay=5)
+
+        assert policy.delay(0, make_response(429, **{"Retry-After": "2"})) == 2
+        assert policy.delay(0, make_response(429, **{"Retry-After": "60"})) == 5
+
+
+class TestAimdLimit:
+    def test_additive_increase(self):
+        limit = AimdLimit(initial=2, maximum=3)
+
+        for _ in range(10):
+            limit.finish(limit.start(), overloaded=False, latency=0.1)
+
+        assert limit.limit == 3
+
+    def test_slow_responses_do_not_increase(self):
+        limit = AimdLimit(initial=2, latency_threshold=1)
+
+        limit.finish(limit.start(), overloaded=False, latency=2)
+
+        assert limit.limit == 2
+
+    def test_single_cut_per_burst(self):
+        limit = AimdLimit(initial=8)
+        generations = [limit.start() for _ in range(4)]
+
+        for generation in generations:
+            limit.finish(generation, overloaded=True, latency=0.1)
+
+        assert limit.limit == 4
+        assert limit.in_flight == 0
+
+        limit.finish(limit.start(), overloaded=True, latency=0.1)
+        assert limit.limit == 2
+
+    def test_minimum(self):
+        limit = AimdLimit(initial=1)
+
+        limit.finish(limit.start(), overloaded=True, latency=0.1)
+
+        assert limit.limit == 1
+
+
+class TestThrottle:
+    @pytest.fixture(autouse=True)
+    def sleeps(self, monkeypatch) -> list[float]:
+        sleeps: list[float] = []
+        monkeypatch.setattr(throttle_module.time, "sleep", sleeps.append)
+        return sleeps
+
+    def test_retries(self, sleeps):
+        responses = iter(
+            [make_response(503), make_response(429, **{"Retry-After": "1"})]
+            + [make_response(200)]
+        )
+        limiter = AdaptiveLimiter(AimdLimit(initial=4))
+
+        response = Throttle(limiter=limiter).send("POST", lambda: next(responses))
+
+        assert response.status_code == 200
+        assert len(sleeps) == 2
+        assert sleeps[1] == 1
+        assert limiter.limit.limit < 4
+        assert limiter.limit.in_flight == 0
+
+    def test_retries_exhausted(self, sleeps):
+        throttle = Throttle(BackoffPolicy(retries=2))
+
+        response = throttle.send("GET", lambda: make_response(503))
+
+        assert response.status_code == 503
+        assert len(sleeps) == 2
+
+    @pytest.mark.parametrize(
+        "method, status_code, retried",
+        [
+            ("GET", 502, True),
+            ("DELETE", 504, True),
+            ("POST", 502, False),
+            ("POST", 504, False),
+            ("POST", 503, True),
+            ("PATCH", 429, True),
+        ],
+    )
+    def test_only_safe_retries(self, sleeps, method, status_code, retried):
+        responses = iter([make_response(status_code), make_response(200)])
+
+        response = Throttle().send(method, lambda: next(responses))
+
+        assert (response.status_code == 200) is retried
+        assert len(sleeps) == int(retried)
+
+    def test_reads_not_limited(self):
+        limiter = AdaptiveLimiter(AimdLimit(initial=1))
+        limiter.acquire()
+
+        # would block, if reads were limited
+        response = Throttle(limiter=limiter).send("GET", make_response)
+
+        assert response.status_code == 200
+
+    def test_failed_request_released(self):
+        limiter = AdaptiveLimiter(AimdLimit(initial=2))
+
+        def fail():
+            raise ConnectionError()
+
+        with pytest.raises(ConnectionError):
+            Throttle(limiter=limiter).send("POST", fail)
+
+        assert limiter.limit.in_flight == 0
+        assert limiter.limit.limit == 1
+
+
+class TestAsyncThrottle:
+    def test_retries(self, monkeypatch):
+        async def no_sleep(delay):
+            pass
+
+        monkeypatch.setattr(throttle_module.asyncio, "sleep", no_sleep)
+        responses = iter([make_response(503), make_response(200)])
+
+        async def send():
+            return next(responses)
+
+        limiter = AsyncAdaptiveLimiter(AimdLimit(initial=2))
+        response = asyncio.run(AsyncThrottle(limiter=limiter).send("PUT", send))
+
+        assert response.status_code == 200
+        assert limiter.limit.in_flight == 0